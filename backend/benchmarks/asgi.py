@@ -0,0 +1,70 @@
+"""Minimal in-process HTTP client for benchmarks: drives an ASGI app directly,
+so measurements include routing, validation and encoding but no sockets."""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+from encoding import dumps
+
+async def request(
+    app,
+    method: str,
+    path: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    headers: Optional[Dict[str, str]] = None,
+    content: Union[bytes, List[bytes], None] = None,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """One request; returns status, response headers and the full body.
+
+    ``content`` is a raw body, or a list of chunks sent as separate messages.
+    """
+    route, _, query = path.partition("?")
+    if params:
+        query = "&".join(q for q in (query, urlencode(params)) if q)
+    body = b"" if json is None else dumps(json)
+    chunks_in = [content] if isinstance(content, bytes) else list(content or [body])
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if json is not None:
+        raw_headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": route,
+        "raw_path": route.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    out_headers: Dict[str, str] = {}
+    chunks = []
+    finished = asyncio.Event()
+
+    async def receive():
+        if chunks_in:
+            chunk = chunks_in.pop(0)
+            return {"type": "http.request", "body": chunk, "more_body": bool(chunks_in)}
+        # Streaming responses listen for a disconnect; only report one once done.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            out_headers.update({k.decode(): v.decode() for k, v in message["headers"]})
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return status, out_headers, b"".join(chunks)
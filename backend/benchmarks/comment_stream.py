@@ -0,0 +1,117 @@
+"""Idle cost and fan-out latency of GET /comments/stream/{book_id}.
+
+Runs the app in-process over ASGI against the configured MongoDB, opens
+``--streams`` server-sent event streams spread over ``--books`` books (plus
+``--hot`` on one book, ``--slow`` of which never drain), then posts comments to
+the hot book and reports memory per idle stream, publish-to-delivery latency
+and how many slow listeners were evicted:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.comment_stream --streams 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+COLLECTION = "bench_comment_stream"
+
+class _Stream:
+    """One in-process SSE client; ``slow`` ones block on every write."""
+
+    def __init__(self, app, path: str, *, slow: bool = False):
+        self.arrivals: List[float] = []
+        self._gone = asyncio.Event()
+        self._slow = slow
+        self.task = asyncio.create_task(app(self._scope(path), self._receive, self._send))
+
+    @staticmethod
+    def _scope(path: str):
+        return {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"accept", b"text/event-stream"), (b"accept-encoding", b"gzip")],
+            "client": ("127.0.0.1", 0),
+            "server": ("bench", 80),
+        }
+
+    async def _receive(self):
+        await self._gone.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message):
+        if message["type"] != "http.response.body":
+            return
+        body = message.get("body", b"")
+        if body.startswith(b"event: created"):
+            self.arrivals.append(time.perf_counter())
+        if self._slow:
+            await self._gone.wait()
+
+    async def close(self):
+        self._gone.set()
+        await self.task
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--streams", type=int, default=2000, help="idle streams, spread over --books")
+    ap.add_argument("--books", type=int, default=500)
+    ap.add_argument("--hot", type=int, default=200, help="streams on the book being commented on")
+    ap.add_argument("--slow", type=int, default=5, help="hot streams that never drain")
+    ap.add_argument("--comments", type=int, default=200)
+    args = ap.parse_args()
+
+    os.environ["MONGO_COMMENTS"] = COLLECTION
+    os.environ["SIMILAR_INDEX_PATH"] = ""
+    import main as api
+
+    async with api.app.router.lifespan_context(api.app):
+        try:
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            idle = [_Stream(api.app, f"/comments/stream/idle{i % args.books}") for i in range(args.streams)]
+            await asyncio.sleep(0.2)
+            per_stream = (tracemalloc.get_traced_memory()[0] - before) / max(args.streams, 1)
+            tracemalloc.stop()
+            print(f"{args.streams:,} idle streams over {args.books:,} books: {per_stream / 1024:.1f} KiB each")
+
+            hot = [_Stream(api.app, "/comments/stream/hot", slow=i < args.slow) for i in range(args.hot)]
+            await asyncio.sleep(0.1)
+            sent: List[float] = []
+            for i in range(args.comments):
+                sent.append(time.perf_counter())
+                payload = {"username": "bench", "book_id": "hot", "comment": f"comment {i}", "date_and_time": "now"}
+                await api.comments.create_comment(api.CommentCreate(**payload))
+                await asyncio.sleep(0)
+            await asyncio.sleep(0.2)
+
+            fast = [s for s in hot if not s._slow]
+            latencies = sorted(
+                arrived - sent[i] for s in fast for i, arrived in enumerate(s.arrivals[: len(sent)])
+            )
+            complete = sum(len(s.arrivals) == args.comments for s in fast)
+            if latencies:
+                print(
+                    f"{args.comments} comments to {len(fast)} live listeners: {complete} got all, "
+                    f"p50 {statistics.median(latencies) * 1e3:.2f} ms, p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms"
+                )
+            # A slow client stays blocked in its write, so count evictions at the hub.
+            print(f"slow listeners evicted: {api.comments.live_stats()['evicted']}/{args.slow}")
+            print("hub:", api.comments.live_stats())
+
+            await asyncio.gather(*(s.close() for s in idle + hot))
+            print("after disconnect:", api.comments.live_stats()["subscribers"], "subscribers")
+        finally:
+            await api.pool.collection(COLLECTION).drop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
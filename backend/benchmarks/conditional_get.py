@@ -0,0 +1,109 @@
+"""Bytes and latency of re-fetching an unchanged catalogue page.
+
+Runs the app in-process over ASGI (no sockets) against the configured MongoDB,
+seeds a scratch books collection, then fetches one GET /books page as:
+
+  plain        no compression, no validator (what the SPA did on every load)
+  gzip         Accept-Encoding: gzip
+  revalidated  If-None-Match with the page's ETag, answered with a 304
+
+and reports body bytes, latency and the MongoDB commands each request issued:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.conditional_get --books 2000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Dict
+
+from pymongo import monitoring
+
+from benchmarks.asgi import request
+
+COLLECTION = "bench_conditional"
+
+class _Counter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands: Counter = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def _scenario(app, counter: _Counter, label: str, path: str, headers: Dict[str, str], repeat: int):
+    samples = []
+    counter.commands.clear()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, _, body = await request(app, "GET", path, headers=headers)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    commands = sum(counter.commands.values()) / repeat
+    print(
+        f"{label:<12} {status}  {len(body):>8,} B  p50 {statistics.median(samples) * 1e3:6.2f} ms"
+        f"  p99 {samples[int(len(samples) * 0.99)] * 1e3:6.2f} ms  {commands:.1f} mongo cmd/req"
+    )
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=100)
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--no-cache", action="store_true", help="CACHE_BACKEND=none, so 200s always query MongoDB")
+    args = ap.parse_args()
+
+    # Configure the app before importing it: scratch collection, no snapshot file.
+    os.environ["MONGO_COLLECTION"] = COLLECTION
+    os.environ["SIMILAR_INDEX_PATH"] = ""
+    counter = _Counter()
+    monitoring.register(counter)
+    if args.no_cache:
+        os.environ["CACHE_BACKEND"] = "none"
+    import main as api
+    from managers.books_manager import LIST_VERSION
+
+    async with api.app.router.lifespan_context(api.app):
+        coll = api.pool.collection(COLLECTION)
+        await coll.delete_many({})
+        await coll.insert_many([
+            {
+                "username": f"user{i % 300}",
+                "title": f"Book {i}",
+                "author": f"Author {i % 700}",
+                "year": 1900 + i % 125,
+                "genre": "Fiction",
+                "image": f"https://covers.example.com/{i}.jpg",
+                "review": "A thoughtful review. " * 40,
+                "views": i,
+                "comment_count": 0,
+            }
+            for i in range(args.books)
+        ])
+        await api.cache.bump(LIST_VERSION)  # the direct insert bypassed BooksManager
+        try:
+            path = f"/books?limit={args.limit}"
+            _, headers, _ = await request(api.app, "GET", path, headers={"accept-encoding": "identity"})
+            etag = headers.get("etag", "")
+            print(
+                f"GET {path} over {args.books:,} books, {args.repeat} requests each, "
+                f"cache {api.CACHE_BACKEND if not args.no_cache else 'none'}, ETag {etag}"
+            )
+            await _scenario(api.app, counter, "plain", path, {"accept-encoding": "identity"}, args.repeat)
+            await _scenario(api.app, counter, "gzip", path, {"accept-encoding": "gzip"}, args.repeat)
+            await _scenario(
+                api.app, counter, "revalidated", path,
+                {"accept-encoding": "gzip", "if-none-match": etag}, args.repeat,
+            )
+        finally:
+            await coll.drop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,198 @@
+"""Seeded synthetic catalogue for benchmarks: users, books and comments.
+
+The same ``--seed`` and sizes always produce the same documents, so results
+from different commits are measured against identical data. Review lengths
+are log-normal (most a paragraph or two, a long tail of essays), and both a
+book's comment count and its popularity follow a Zipf law: a few books take
+most of the comments, most have none or one.
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.datagen --users 1000 --books 20000
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List
+
+from bson import ObjectId
+
+from databases.mongo import MongoPool
+from security import hash_password
+
+PASSWORD = "benchmark-password"
+
+GENRES = [
+    "Fantasy", "Science Fiction", "Mystery", "Romance", "Historical", "Horror",
+    "Biography", "Poetry", "Thriller", "Non-fiction", "Young Adult", "Classics",
+]
+WORDS = (
+    "the a of and to in dragon empire winter garden river shadow machine letters "
+    "harbor silence orchard memory storm lantern glass mountain kingdom tide ember "
+    "whisper archive voyage spiral meadow citadel compass hollow frontier canyon "
+    "signal character plot pacing ending prose chapter author world beautiful slow "
+    "gripping predictable moving clever dense brilliant uneven quiet haunting"
+).split()
+SURNAMES = "Ashdown Blackwood Carver Dunmore Ellery Fairfax Greaves Holloway Ingram Jessop Kestrel Lowell".split()
+FIRST = "Ada Ben Clara Dev Elif Farah Gus Hana Ivo June Kai Lena Milo Nora Omar Pia".split()
+
+# Zipf exponent for comment counts and book popularity
+ZIPF_S = 1.1
+
+class Dataset:
+    """Documents for one (seed, sizes) combination, generated on demand.
+
+    ``popular`` lists book ids most-commented first; workloads draw "hot"
+    books from its head with ``pick_book``.
+    """
+
+    def __init__(
+        self,
+        *,
+        seed: int = 42,
+        users: int = 1000,
+        books: int = 10000,
+        max_comments: int = 2000,
+        password_hash: str = "",
+    ):
+        self.seed = seed
+        self.n_users = users
+        self.n_books = books
+        self.max_comments = max_comments
+        self.password_hash = password_hash
+        rng = random.Random(seed)
+        self.epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.usernames = [f"reader{i:05d}" for i in range(users)]
+        # Deterministic ids whose embedded timestamps advance a minute per book.
+        start = int(self.epoch.timestamp())
+        self.book_ids = [ObjectId(f"{start + 60 * i:08x}{i:016x}") for i in range(books)]
+        # Rank 1 is the most commented book; ranks are shuffled across ids.
+        ranks = list(range(1, books + 1))
+        rng.shuffle(ranks)
+        self.comment_counts = [int(max_comments / r ** ZIPF_S) for r in ranks]
+        by_rank = sorted(range(books), key=lambda i: ranks[i])
+        self.popular = [str(self.book_ids[i]) for i in by_rank]
+        self._cum_weights = list(accumulate(1 / r ** ZIPF_S for r in range(1, books + 1)))
+
+    def pick_book(self, rng: random.Random) -> str:
+        """A book id, Zipf-weighted toward the popular ones."""
+        return rng.choices(self.popular, cum_weights=self._cum_weights)[0]
+
+    def profiles(self) -> Iterator[Dict[str, Any]]:
+        for username in self.usernames:
+            yield {"username": username, "google_auth_id": None, "password_hash": self.password_hash}
+
+    def books(self) -> Iterator[Dict[str, Any]]:
+        rng = random.Random(self.seed + 1)
+        for i, oid in enumerate(self.book_ids):
+            words = max(5, int(rng.lognormvariate(math.log(120), 0.8)))
+            yield {
+                "_id": oid,
+                "username": rng.choice(self.usernames),
+                "title": " ".join(rng.choice(WORDS[4:]).capitalize() for _ in range(rng.randint(1, 4))),
+                "author": f"{rng.choice(FIRST)} {rng.choice(SURNAMES)}",
+                "year": rng.randint(1850, 2024),
+                "genre": rng.choice(GENRES),
+                "image": f"https://covers.example.com/{i}.jpg" if rng.random() < 0.7 else None,
+                "review": " ".join(rng.choice(WORDS) for _ in range(words)),
+                "views": rng.randint(0, 50) + self.comment_counts[i] * rng.randint(5, 40),
+                "comment_count": self.comment_counts[i],
+            }
+
+    def comments(self) -> Iterator[Dict[str, Any]]:
+        rng = random.Random(self.seed + 2)
+        for oid, count in zip(self.book_ids, self.comment_counts):
+            created = self.epoch + timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+            for _ in range(count):
+                created += timedelta(seconds=rng.randint(1, 3600))
+                yield {
+                    "book_id": str(oid),
+                    "username": rng.choice(self.usernames),
+                    "comment": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 60))),
+                    "date_and_time": created.strftime("%m/%d/%Y %H:%M"),
+                    "created_at": created,
+                }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "seed": self.seed,
+            "users": self.n_users,
+            "books": self.n_books,
+            "comments": sum(self.comment_counts),
+            "max_comments": self.max_comments,
+        }
+
+async def _insert(pool: MongoPool, collection: str, docs: Iterator[Dict[str, Any]], batch_size: int) -> int:
+    coll = pool.collection(collection)
+    await coll.drop()
+    n = 0
+    batch: List[Dict[str, Any]] = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await coll.insert_many(batch, ordered=False)
+            n += len(batch)
+            batch = []
+    if batch:
+        await coll.insert_many(batch, ordered=False)
+        n += len(batch)
+    return n
+
+async def seed(
+    pool: MongoPool,
+    data: Dataset,
+    *,
+    books: str = "books",
+    profiles: str = "profiles",
+    comments: str = "comments",
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    """Replace the three collections with ``data``; returns documents written."""
+    return {
+        "profiles": await _insert(pool, profiles, data.profiles(), batch_size),
+        "books": await _insert(pool, books, data.books(), batch_size),
+        "comments": await _insert(pool, comments, data.comments(), batch_size),
+    }
+
+def add_arguments(ap: argparse.ArgumentParser):
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--users", type=int, default=1000)
+    ap.add_argument("--books", type=int, default=10000)
+    ap.add_argument("--max-comments", type=int, default=2000, help="comments on the most commented book")
+
+def from_arguments(args: argparse.Namespace) -> Dataset:
+    # One bcrypt hash shared by every seeded user; hashing each would dominate seeding.
+    return Dataset(
+        seed=args.seed,
+        users=args.users,
+        books=args.books,
+        max_comments=args.max_comments,
+        password_hash=hash_password(PASSWORD),
+    )
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb_bench"))
+    add_arguments(ap)
+    args = ap.parse_args()
+
+    data = from_arguments(args)
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    try:
+        written = await seed(
+            pool,
+            data,
+            books=os.environ.get("MONGO_COLLECTION", "books"),
+            profiles=os.environ.get("MONGO_PROFILES", "profiles"),
+            comments=os.environ.get("MONGO_COMMENTS", "comments"),
+        )
+        print(f"seeded {args.db}: {written}; every user's password is {PASSWORD!r}")
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""Latency of unrelated requests while a burst of logins is verified.
+
+Runs the app in-process over ASGI against the configured MongoDB. While
+``--logins`` concurrent POST /profiles/login are in flight, ``--readers``
+clients loop over GET /books and GET /comments/by-book/{id}, and their p50
+and p99 are reported: first with no logins, then with bcrypt verified inline
+on the event loop (the old behaviour), then on the bounded PasswordHasher
+pool:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.hashing_latency --logins 64 --workers 4
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+
+from benchmarks.asgi import request
+
+COLLECTIONS = {
+    "MONGO_COLLECTION": "bench_hash_books",
+    "MONGO_PROFILES": "bench_hash_profiles",
+    "MONGO_COMMENTS": "bench_hash_comments",
+}
+PASSWORD = "correct horse"
+
+class _InlineHasher:
+    """Verifies on the event loop, as logins did before the worker pool."""
+
+    def __init__(self, verify):
+        self._verify = verify
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return self._verify(plain, hashed)
+
+def _pct(samples: List[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+async def _reader(app, paths: Dict[str, str], stop: asyncio.Event, samples: Dict[str, List[float]]):
+    routes = list(paths.items())
+    i = 0
+    while not stop.is_set():
+        route, path = routes[i % len(routes)]
+        i += 1
+        start = time.perf_counter()
+        await request(app, "GET", path)
+        samples[route].append((time.perf_counter() - start) * 1000)
+
+async def _run(api, label: str, paths: Dict[str, str], args):
+    samples: Dict[str, List[float]] = {route: [] for route in paths}
+    stop = asyncio.Event()
+    readers = [asyncio.create_task(_reader(api.app, paths, stop, samples)) for _ in range(args.readers)]
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+    if args.logins and label != "idle":
+        for _ in range(args.rounds):
+            results = await asyncio.gather(*(
+                request(api.app, "POST", "/profiles/login", json={"username": "hasher", "password": PASSWORD})
+                for _ in range(args.logins)
+            ))
+            statuses.update(status for status, _, _ in results)
+    else:
+        await asyncio.sleep(args.idle)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await asyncio.gather(*readers)
+
+    logins = " ".join(f"{k}x{v}" for k, v in sorted(statuses.items())) or "none"
+    print(f"{label}: {elapsed:.2f}s, logins [{logins}]")
+    for route, ms in samples.items():
+        if ms:
+            print(
+                f"  GET {route:<26} n={len(ms):>6}  p50 {statistics.median(ms):8.2f} ms"
+                f"  p99 {_pct(ms, 0.99):8.2f} ms  max {max(ms):8.2f} ms"
+            )
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--logins", type=int, default=64, help="concurrent logins per round")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--readers", type=int, default=8, help="clients reading /books and comments meanwhile")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--max-pending", type=int, default=256)
+    ap.add_argument("--idle", type=float, default=2.0, help="seconds of the no-login baseline")
+    args = ap.parse_args()
+
+    os.environ.update(COLLECTIONS)
+    os.environ["SIMILAR_INDEX_PATH"] = ""
+    os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    os.environ["PASSWORD_HASH_MAX_PENDING"] = str(args.max_pending)
+    import main as api
+    from models.books_model import BookCreate
+    from models.comment_model import CommentCreate
+    from models.profile_model import ProfileCreate
+    from security import verify_password
+
+    async with api.app.router.lifespan_context(api.app):
+        try:
+            await api.profiles.create_profile(ProfileCreate(username="hasher", password=PASSWORD))
+            book = await api.books.create_book(BookCreate(username="hasher", title="Read during logins"))
+            for i in range(20):
+                await api.comments.create_comment(
+                    CommentCreate(book_id=book.id, username="hasher", comment=f"comment {i}", date_and_time="now")
+                )
+            paths = {"/books": "/books?limit=24", "/comments/by-book/{id}": f"/comments/by-book/{book.id}?limit=20"}
+
+            await _run(api, "idle", paths, args)
+            pooled = api.profiles._hasher
+            api.profiles._hasher = _InlineHasher(verify_password)
+            try:
+                await _run(api, "inline", paths, args)
+            finally:
+                api.profiles._hasher = pooled
+            await _run(api, "pool", paths, args)
+        finally:
+            for name in COLLECTIONS.values():
+                await api.pool.collection(name).drop()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Text-index search vs the substring (regex) scan behind GET /books?q=.
+
+Seeds a scratch collection with synthetic reviews, then times the first page
+of each query both ways. Needs a reachable MongoDB (mongomock has no $text):
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.search --books 200000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+from databases.mongo import MongoPool
+from managers.books_manager import BooksManager
+from models.books_model import BookQuery
+
+COLLECTION = "bench_search"
+
+WORDS = (
+    "dragon empire winter garden river shadow machine letters harbor silence "
+    "orchard memory storm lantern glass mountain kingdom tide ember whisper "
+    "archive voyage spiral meadow citadel compass hollow frontier canyon signal"
+).split()
+
+QUERIES = ["dragon", "winter garden", "lantern", "citadel compass", "xylophone"]
+
+def _review(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 400)))
+
+async def _seed(pool: MongoPool, n: int, seed: int):
+    rng = random.Random(seed)
+    coll = pool.collection(COLLECTION)
+    batch = []
+    for i in range(n):
+        batch.append({
+            "username": f"user{rng.randrange(5000)}",
+            "title": " ".join(rng.sample(WORDS, 3)).title(),
+            "author": f"Author {rng.randrange(20000)}",
+            "year": rng.randint(1800, 2025),
+            "genre": rng.choice(["Fiction", "Fantasy", "History", "Poetry"]),
+            "review": _review(rng),
+            "views": 0,
+        })
+        if len(batch) == 5000:
+            await coll.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await coll.insert_many(batch, ordered=False)
+
+async def _time(fn, query: BookQuery, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn(query)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb_bench"))
+    ap.add_argument("--books", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    # No cache: every call goes to MongoDB.
+    books = BooksManager(pool, COLLECTION)
+    await books.connect()
+    try:
+        await pool.collection(COLLECTION).drop()
+        await books.ensure_indexes()
+        start = time.perf_counter()
+        await _seed(pool, args.books, args.seed)
+        print(f"seeded {args.books:,} books in {time.perf_counter() - start:.1f}s")
+        for q in QUERIES:
+            query = BookQuery(q=q, limit=24)
+            text = await _time(books.search_books_raw, query, args.repeat)
+            scan = await _time(books.query_books_raw, query, args.repeat)
+            print(f"{q!r:<20} text {text * 1000:8.1f} ms   regex {scan * 1000:8.1f} ms")
+    finally:
+        await pool.collection(COLLECTION).drop()
+        await books.close()
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+"""Per-document cost of the strict vs fast book summary output paths.
+
+strict: BookSummary.model_validate per doc, then FastAPI-style re-validation
+        of List[BookSummary] (response_model) and JSON encoding.
+fast:   _to_dict per doc and a single encode with encoding.dumps (orjson
+        when installed).
+
+    python -m benchmarks.serialization --books 20000
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+import encoding
+from managers.books_manager import SUMMARY_FIELDS, _to_dict, _to_summary
+from models.books_model import BookSummary
+
+def _docs(n: int):
+    return [
+        {
+            "id": str(ObjectId()),
+            "username": f"user{i % 500}",
+            "title": f"Book {i}",
+            "author": f"Author {i % 2000}",
+            "year": 1900 + i % 120,
+            "genre": "Fiction",
+            "image": None,
+            "review": "A thoughtful review. " * 40,
+            "views": i % 1000,
+        }
+        for i in range(n)
+    ]
+
+def _strict(docs) -> bytes:
+    adapter = TypeAdapter(List[BookSummary])
+    models = [_to_summary(d) for d in docs]
+    validated = adapter.validate_python([m.model_dump() for m in models])
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+def _fast(docs) -> bytes:
+    return encoding.dumps([_to_dict(d, SUMMARY_FIELDS) for d in docs])
+
+def _time(fn, docs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(docs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=20_000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    docs = _docs(args.books)
+    assert json.loads(_strict(docs[:50])) == json.loads(_fast(docs[:50]))
+    encoder = "orjson" if encoding.orjson is not None else "json"
+    for label, fn in (("strict", _strict), (f"fast/{encoder}", _fast)):
+        best = _time(fn, docs, args.repeat)
+        print(f"{label:<12} {best * 1e6 / args.books:6.2f} us/doc  ({best * 1000:.1f} ms for {args.books:,})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Memory, build time and lookup latency of the similar-books TF-IDF index.
+
+Builds a SimilarIndex from synthetic books, then times lookups, single-book
+updates, a merge and a snapshot save/load round trip. No database needed:
+
+    python -m benchmarks.similar --books 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from managers.similar_index import SimilarIndex
+
+GENRES = ["Fiction", "Fantasy", "History", "Poetry", "Science", "Mystery", "Romance", "Biography"]
+
+def _vocabulary(rng: random.Random, n: int):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(n)]
+
+def _books(n: int, seed: int):
+    rng = random.Random(seed)
+    words = _vocabulary(rng, 30_000)
+    # Zipf-ish word choice, like real text: a few very common words, a long tail.
+    weights = [1 / (i + 1) for i in range(len(words))]
+    authors = [f"{rng.choice(words).title()} {rng.choice(words).title()}" for _ in range(n // 5 or 1)]
+    for i in range(n):
+        yield {
+            "id": f"{i:024x}",
+            "title": " ".join(rng.choices(words, weights, k=rng.randint(2, 5))).title(),
+            "author": rng.choice(authors),
+            "genre": rng.choice(GENRES),
+            "review": " ".join(rng.choices(words, weights, k=rng.randint(30, 200))),
+        }
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    return statistics.median(samples) * 1e3, samples[int(len(samples) * 0.99)] * 1e3
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=100_000)
+    ap.add_argument("--lookups", type=int, default=500)
+    ap.add_argument("--updates", type=int, default=2000)
+    ap.add_argument("--limit", type=int, default=10)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    docs = list(_books(args.books, args.seed))
+    index = SimilarIndex(max_pending=args.updates + 1)
+    start = time.perf_counter()
+    index.add_many(docs)
+    index.merge()
+    print(f"{args.books:,} books built in {time.perf_counter() - start:.1f}s")
+    stats = index.stats()
+    print(f"{stats['terms']:,} terms, {stats['nnz']:,} non-zeros, {index.memory_bytes() / 2**20:.1f} MiB of arrays")
+
+    rng = random.Random(args.seed + 1)
+    samples = []
+    for doc in rng.sample(docs, args.lookups):
+        t = time.perf_counter()
+        index.similar(doc, args.limit, exclude=doc["id"])
+        samples.append(time.perf_counter() - t)
+    p50, p99 = _percentiles(samples)
+    print(f"lookup: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+    index.ready = True
+    rewritten = []
+    start = time.perf_counter()
+    for doc in rng.sample(docs, args.updates):
+        after = {**doc, "review": doc["review"] + " " + rng.choice(docs)["title"]}
+        index.apply(doc, after)
+        rewritten.append(after)
+    print(f"update: {(time.perf_counter() - start) / args.updates * 1e6:.0f} us each ({args.updates:,} pending)")
+
+    samples = []
+    for doc in rng.sample(rewritten, min(args.lookups, len(rewritten))):
+        t = time.perf_counter()
+        index.similar(doc, args.limit, exclude=doc["id"])
+        samples.append(time.perf_counter() - t)
+    p50, p99 = _percentiles(samples)
+    print(f"lookup with pending rows: p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+
+    start = time.perf_counter()
+    index.merge()
+    print(f"merge: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "similar_index.npz")
+        start = time.perf_counter()
+        index.save(path)
+        saved = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = SimilarIndex.load(path)
+        print(
+            f"snapshot: {os.path.getsize(path) / 2**20:.1f} MiB, "
+            f"save {saved * 1e3:.0f} ms, load {(time.perf_counter() - start) * 1e3:.0f} ms"
+        )
+        doc = rewritten[0]
+        assert loaded.similar(doc, args.limit, exclude=doc["id"]) == index.similar(doc, args.limit, exclude=doc["id"])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Peak memory and time-to-first-byte: buffered list vs streamed JSON.
+
+Feeds synthetic book documents (shaped like Mongo._serialize output) through
+the old list-building path and through streaming.stream_documents' encoders.
+No database needed:
+
+    python -m benchmarks.streaming_memory --books 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Any, AsyncIterator, Dict
+
+from bson import ObjectId
+
+from managers.books_manager import _to_out
+from streaming import _json_array, _ndjson
+
+def _doc(i: int) -> Dict[str, Any]:
+    return {
+        "id": str(ObjectId()),
+        "username": f"user{i % 500}",
+        "title": f"Book {i}",
+        "author": f"Author {i % 2000}",
+        "year": 1900 + i % 120,
+        "genre": "Fiction",
+        "image": None,
+        "review": "A thoughtful review. " * 40,
+        "views": i % 1000,
+    }
+
+async def _source(n: int) -> AsyncIterator[Dict[str, Any]]:
+    for i in range(n):
+        yield _doc(i)
+        if i % 500 == 0:
+            await asyncio.sleep(0)  # a cursor yields to the loop between batches
+
+async def _out_dicts(n: int) -> AsyncIterator[Dict[str, Any]]:
+    async for d in _source(n):
+        yield _to_out(d).model_dump()
+
+async def _buffered(n: int) -> float:
+    start = time.perf_counter()
+    docs = [d async for d in _source(n)]
+    models = [_to_out(d) for d in docs]
+    body = json.dumps([m.model_dump() for m in models]).encode("utf-8")
+    first_byte = time.perf_counter() - start
+    del body
+    return first_byte
+
+async def _streamed(n: int, encoder, batch_size: int) -> float:
+    start = time.perf_counter()
+    first_byte = None
+    async for chunk in encoder(_out_dicts(n), batch_size):
+        if first_byte is None:
+            first_byte = time.perf_counter() - start
+    return first_byte or 0.0
+
+async def _measure(label: str, coro_fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ttfb = await coro_fn()
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<12} peak={peak / 1e6:8.1f} MB  ttfb={ttfb * 1000:8.1f} ms  total={total:6.2f} s")
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--books", type=int, default=100_000)
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+    print(f"{args.books:,} books, batch size {args.batch_size}")
+    await _measure("list", lambda: _buffered(args.books))
+    await _measure("json-array", lambda: _streamed(args.books, _json_array, args.batch_size))
+    await _measure("ndjson", lambda: _streamed(args.books, _ndjson, args.batch_size))
+
+if __name__ == "__main__":
+    asyncio.run(main())
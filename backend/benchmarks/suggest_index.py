@@ -0,0 +1,58 @@
+"""Memory and lookup latency of the in-memory autocomplete index.
+
+Builds a PrefixIndex from synthetic author-like names and reports its size per
+100k distinct values and the latency of prefix lookups. No database needed:
+
+    python -m benchmarks.suggest_index --values 100000
+"""
+import argparse
+import random
+import statistics
+import string
+import time
+
+from managers.suggest_index import PrefixIndex
+
+def _names(n: int, seed: int):
+    rng = random.Random(seed)
+    seen = set()
+    while len(seen) < n:
+        first = rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+        last = rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+        seen.add(f"{first} {last}")
+    return list(seen)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--values", type=int, default=100_000)
+    ap.add_argument("--lookups", type=int, default=10_000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    names = _names(args.values, args.seed)
+    start = time.perf_counter()
+    index = PrefixIndex.from_counts({name: 1 for name in names})
+    build = time.perf_counter() - start
+    size = index.memory_bytes()
+    print(f"{len(index):,} values built in {build:.2f}s")
+    start = time.perf_counter()
+    for name in names[:1000]:
+        index.remove(name)
+        index.add(name)
+    print(f"remove+add: {(time.perf_counter() - start) * 1e3:.2f} us each")
+    print(f"{size / 2**20:.1f} MiB total, {size * 100_000 / len(index) / 2**20:.1f} MiB per 100k values")
+
+    rng = random.Random(args.seed + 1)
+    for plen in (1, 2, 3):
+        samples = []
+        for _ in range(args.lookups):
+            prefix = rng.choice(names)[:plen]
+            t = time.perf_counter()
+            index.suggest(prefix, 10)
+            samples.append(time.perf_counter() - t)
+        samples.sort()
+        p99 = samples[int(len(samples) * 0.99)]
+        print(f"prefix len {plen}: p50 {statistics.median(samples) * 1e6:.1f} us  p99 {p99 * 1e6:.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""MongoDB load of a thundering herd on one book, its comments and its author.
+
+Fires ``--concurrency`` identical reads per round, arriving over ``--spread``
+milliseconds, at get_book, list_comments_by_book and get_profile, with read
+coalescing off and then on, and reports the MongoDB commands, underlying
+queries and latency of each. The book cache is disabled so every book read
+is a miss, as right after the entry expires or is invalidated:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.thundering_herd --concurrency 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import Counter
+from typing import Awaitable, Callable, List
+
+from pymongo import monitoring
+
+from databases.mongo import MongoPool
+from managers.books_manager import BooksManager
+from managers.comment_manager import CommentsManager
+from managers.profile_manager import ProfilesManager
+from models.books_model import BookCreate
+from models.comment_model import CommentCreate
+from models.profile_model import ProfileCreate
+
+class _Counter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands: Counter = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def _herd(read: Callable[[], Awaitable[object]], concurrency: int, spread: float) -> List[float]:
+    async def one() -> float:
+        await asyncio.sleep(random.uniform(0, spread))
+        start = time.perf_counter()
+        await read()
+        return time.perf_counter() - start
+
+    return list(await asyncio.gather(*(one() for _ in range(concurrency))))
+
+async def _run(pool: MongoPool, counter: _Counter, coalesce: bool, args) -> None:
+    books = BooksManager(pool, "bench_herd_books", view_mode="buffered", coalesce=coalesce)
+    comments = CommentsManager(pool, "bench_herd_comments", books=books, coalesce=coalesce)
+    profiles = ProfilesManager(pool, "bench_herd_profiles", coalesce=coalesce)
+    for m in (books, comments, profiles):
+        await m.connect()
+    try:
+        book = await books.create_book(BookCreate(username="herd", title="Linked from somewhere"))
+        await profiles.create_profile(ProfileCreate(username="herd", password="password1"))
+        for i in range(args.comments):
+            await comments.create_comment(
+                CommentCreate(book_id=book.id, username=f"reader{i}", comment="Agreed!", date_and_time="now")
+            )
+        print(f"read coalescing {'on' if coalesce else 'off'}:")
+        scenarios = [
+            ("get_book", lambda: books.get_book(book.id), books.coalescing_stats),
+            ("comments_by_book", lambda: comments.list_comments_by_book(book.id, limit=20), comments.coalescing_stats),
+            ("get_profile", lambda: profiles.get_profile("herd"), profiles.coalescing_stats),
+        ]
+        for label, read, stats in scenarios:
+            counter.commands.clear()
+            started = stats()["started"]
+            samples: List[float] = []
+            for _ in range(args.rounds):
+                samples += await _herd(read, args.concurrency, args.spread / 1000)
+            samples.sort()
+            requests = args.rounds * args.concurrency
+            print(
+                f"  {label:<17} {requests:>6} reads  {stats()['started'] - started:>6} queries"
+                f"  {sum(counter.commands.values()):>6} mongo cmds"
+                f"  p50 {statistics.median(samples) * 1e3:7.2f} ms  p99 {samples[int(len(samples) * 0.99)] * 1e3:7.2f} ms"
+            )
+    finally:
+        for name in ("bench_herd_books", "bench_herd_comments", "bench_herd_profiles"):
+            await pool.collection(name).drop()
+        for m in (books, comments, profiles):
+            await m.close()
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb_bench"))
+    ap.add_argument("--concurrency", type=int, default=500)
+    ap.add_argument("--rounds", type=int, default=5)
+    ap.add_argument("--spread", type=float, default=20.0, help="arrival window per round, ms")
+    ap.add_argument("--comments", type=int, default=50)
+    args = ap.parse_args()
+
+    counter = _Counter()
+    pool = MongoPool(args.uri, args.db, event_listeners=[counter])
+    await pool.connect()
+    try:
+        for coalesce in (False, True):
+            await _run(pool, counter, coalesce, args)
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Hot-key read throughput of GET /books/{id} with direct vs buffered views.
+
+Drives BooksManager.increment_and_get for one book from many concurrent
+tasks, which is what a linked review sees. Needs a reachable MongoDB:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.view_counter --seconds 5
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from databases.mongo import MongoPool, to_object_id
+from managers.books_manager import BooksManager
+from models.books_model import BookCreate
+
+async def _drive(manager: BooksManager, book_id: str, concurrency: int, seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    done = 0
+
+    async def worker():
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await manager.increment_and_get(book_id)
+            done += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+async def _run(pool: MongoPool, collection: str, mode: str, args) -> None:
+    manager = BooksManager(pool, collection, view_mode=mode, view_flush_interval=args.flush_interval)
+    await manager.connect()
+    try:
+        book = await manager.create_book(BookCreate(username="bench", title="Hot review", review="x" * 2000))
+        reads = await _drive(manager, book.id, args.concurrency, args.seconds)
+    finally:
+        await manager.close()
+    stored = await pool.collection(collection).find_one({"_id": to_object_id(book.id)})
+    print(
+        f"{mode:>8}: {reads / args.seconds:,.0f} reads/s "
+        f"({reads} reads, persisted views={stored.get('views') if stored else None})"
+    )
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb_bench"))
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--flush-interval", type=float, default=1.0)
+    args = ap.parse_args()
+
+    pool = MongoPool(args.uri, args.db, max_pool_size=max(args.concurrency, 10))
+    await pool.connect()
+    collection = "bench_view_counter"
+    try:
+        for mode in ("direct", "buffered"):
+            await pool.collection(collection).drop()
+            await _run(pool, collection, mode, args)
+    finally:
+        await pool.collection(collection).drop()
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
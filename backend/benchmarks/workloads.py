@@ -0,0 +1,328 @@
+"""Scripted workloads against main.app: latency, throughput and MongoDB ops.
+
+Seeds a deterministic catalogue (see benchmarks.datagen), starts the app
+in-process and drives each scenario over ASGI with ``--concurrency``
+concurrent clients:
+
+  browse   GET /books pages: plain, by genre, by year or views, next pages
+  detail   GET /books/{id}/detail on Zipf-popular books
+  comment  POST /comments on Zipf-popular books
+  login    bursts of ``--login-burst`` concurrent POST /profiles/login
+  search   GET /books/search (GET /books?q= on --backend memory, which has no $text)
+
+Each scenario reports throughput, p50/p95/p99 latency, status codes and the
+MongoDB commands issued. Results are also written as JSON, and --compare
+prints the change against an earlier run:
+
+    MONGO_URI=mongodb://localhost:27017 python -m benchmarks.workloads --out before.json
+    python -m benchmarks.workloads --compare before.json
+
+``--backend memory`` runs against mongomock-motor (``pip install
+mongomock-motor``) instead of a mongod. Its timings say nothing about MongoDB,
+but op counts and app-side costs are comparable between runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+from benchmarks import datagen
+from benchmarks.asgi import request
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SEARCH_TERMS = ["dragon", "winter garden", "lantern", "citadel compass", "haunting prose", "storm", "memory"]
+
+# Motor collection methods counted as one command each on --backend memory
+_MEMORY_COMMANDS = [
+    "find", "find_one", "aggregate", "count_documents", "distinct", "insert_one", "insert_many",
+    "update_one", "update_many", "replace_one", "delete_one", "delete_many", "find_one_and_update",
+    "find_one_and_delete", "find_one_and_replace", "bulk_write", "create_indexes",
+]
+
+class _Ops(monitoring.CommandListener):
+    """MongoDB commands by name; fed by pymongo, or by the stand-in's methods."""
+
+    def __init__(self):
+        self.commands: Counter = Counter()
+
+    def started(self, event):
+        self.commands[event.command_name] += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+def _use_memory_backend(ops: _Ops):
+    try:
+        import mongomock_motor
+    except ImportError:
+        raise SystemExit("--backend memory needs the mongomock-motor package")
+    import databases.mongo as mongo
+
+    # One in-memory server for every MongoPool, so the app sees the seeded data.
+    client = mongomock_motor.AsyncMongoMockClient(tz_aware=True)
+    mongo.AsyncIOMotorClient = lambda uri, **options: client
+    collection = mongomock_motor.AsyncMongoMockCollection
+    for name in _MEMORY_COMMANDS:
+        def counted(self, *args, _name=name, _method=getattr(collection, name), **kwargs):
+            ops.commands[_name] += 1
+            return _method(self, *args, **kwargs)
+        setattr(collection, name, counted)
+
+class _Context:
+    def __init__(self, app, data: datagen.Dataset, backend: str):
+        self.app = app
+        self.data = data
+        self.backend = backend
+        self.cursors: Deque[Tuple[Dict[str, Any], str]] = deque(maxlen=256)
+
+Scenario = Callable[[_Context, random.Random], Awaitable[int]]
+
+async def _browse(ctx: _Context, rng: random.Random) -> int:
+    if ctx.cursors and rng.random() < 0.3:
+        params, cursor = ctx.cursors.popleft()
+        params = {**params, "cursor": cursor}
+    else:
+        params = {"limit": 24}
+        roll = rng.random()
+        if roll < 0.25:
+            params["genre"] = rng.choice(datagen.GENRES)
+        elif roll < 0.4:
+            params.update(sort=rng.choice(["year", "views"]), order="desc")
+    status, _, body = await request(ctx.app, "GET", "/books", params=params)
+    if status == 200:
+        next_cursor = json.loads(body).get("next_cursor")
+        if next_cursor:
+            ctx.cursors.append(({k: v for k, v in params.items() if k != "cursor"}, next_cursor))
+    return status
+
+async def _detail(ctx: _Context, rng: random.Random) -> int:
+    status, _, _ = await request(ctx.app, "GET", f"/books/{ctx.data.pick_book(rng)}/detail")
+    return status
+
+async def _comment(ctx: _Context, rng: random.Random) -> int:
+    payload = {
+        "username": rng.choice(ctx.data.usernames),
+        "book_id": ctx.data.pick_book(rng),
+        "comment": " ".join(rng.choice(datagen.WORDS) for _ in range(rng.randint(3, 40))),
+        "date_and_time": datetime.now(timezone.utc).strftime("%m/%d/%Y %H:%M"),
+    }
+    status, _, _ = await request(ctx.app, "POST", "/comments", json=payload)
+    return status
+
+async def _login(ctx: _Context, rng: random.Random) -> int:
+    payload = {"username": rng.choice(ctx.data.usernames), "password": datagen.PASSWORD}
+    status, _, _ = await request(ctx.app, "POST", "/profiles/login", json=payload)
+    return status
+
+async def _search(ctx: _Context, rng: random.Random) -> int:
+    path = "/books/search" if ctx.backend == "mongod" else "/books"
+    status, _, _ = await request(ctx.app, "GET", path, params={"q": rng.choice(SEARCH_TERMS), "limit": 24})
+    return status
+
+SCENARIOS: Dict[str, Scenario] = {
+    "browse": _browse,
+    "detail": _detail,
+    "comment": _comment,
+    "login": _login,
+    "search": _search,
+}
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+async def _drive(ctx: _Context, scenario: Scenario, n: int, concurrency: int, rng: random.Random):
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = n
+
+    async def client():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            status = await scenario(ctx, rng)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, statuses
+
+async def _run_scenario(
+    ctx: _Context, name: str, ops: _Ops, *, requests: int, concurrency: int, warmup: int, seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(f"{seed}:{name}")
+    if warmup:
+        await _drive(ctx, SCENARIOS[name], warmup, concurrency, rng)
+    ops.commands.clear()
+    start = time.perf_counter()
+    latencies, statuses = await _drive(ctx, SCENARIOS[name], requests, concurrency, rng)
+    elapsed = time.perf_counter() - start
+    commands = dict(ops.commands)
+    latencies.sort()
+    total_ops = sum(commands.values())
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 0.50) * 1e3, 3),
+            "p95": round(_percentile(latencies, 0.95) * 1e3, 3),
+            "p99": round(_percentile(latencies, 0.99) * 1e3, 3),
+            "mean": round(sum(latencies) / len(latencies) * 1e3, 3) if latencies else 0.0,
+            "max": round(latencies[-1] * 1e3, 3) if latencies else 0.0,
+        },
+        "status": {str(k): v for k, v in sorted(statuses.items())},
+        "errors": sum(v for k, v in statuses.items() if k >= 400),
+        "mongo": {
+            "commands": total_ops,
+            "per_request": round(total_ops / requests, 2) if requests else 0.0,
+            "by_command": dict(sorted(commands.items())),
+        },
+    }
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__),
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _app_config(api) -> Dict[str, Any]:
+    # Module-level settings that shape performance; connection strings left out.
+    return {
+        k: v for k, v in sorted(vars(api).items())
+        if k.isupper() and isinstance(v, (str, int, float)) and "URI" not in k and "URL" not in k
+    }
+
+def _print(name: str, r: Dict[str, Any]):
+    lat = r["latency_ms"]
+    status = " ".join(f"{k}x{v}" for k, v in r["status"].items())
+    print(
+        f"{name:<8} {r['throughput_rps']:>8.1f} req/s  p50 {lat['p50']:>8.2f}  p95 {lat['p95']:>8.2f}"
+        f"  p99 {lat['p99']:>8.2f} ms  {r['mongo']['per_request']:>6.2f} mongo/req  [{status}]"
+    )
+
+def _compare(current: Dict[str, Any], path: str):
+    with open(path) as f:
+        before = json.load(f)
+    print(f"\nvs {path} ({before['meta'].get('commit') or '?'}, {before['meta'].get('backend')}):")
+
+    def delta(new: float, old: float) -> str:
+        return f"{(new - old) / old * 100:+6.1f}%" if old else "     n/a"
+
+    for name, r in current["scenarios"].items():
+        old = before.get("scenarios", {}).get(name)
+        if not old:
+            continue
+        print(
+            f"{name:<8} req/s {delta(r['throughput_rps'], old['throughput_rps'])}"
+            + "".join(f"  {q} {delta(r['latency_ms'][q], old['latency_ms'][q])}" for q in ("p50", "p95", "p99"))
+            + f"  mongo/req {delta(r['mongo']['per_request'], old['mongo']['per_request'])}"
+        )
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backend", choices=["mongod", "memory"], default="mongod")
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default="booksdb_bench", help="scratch database; its collections are replaced")
+    datagen.add_arguments(ap)
+    ap.add_argument("--scenarios", default=",".join(SCENARIOS))
+    ap.add_argument("--requests", type=int, default=2000, help="per scenario")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--warmup", type=int, default=50)
+    ap.add_argument("--login-burst", type=int, default=64, help="concurrent logins in the login scenario")
+    ap.add_argument("--login-requests", type=int, default=256)
+    ap.add_argument("--label", default="")
+    ap.add_argument("--out", help="JSON results path (default benchmarks/results/<commit>-<backend>.json)")
+    ap.add_argument("--compare", help="earlier results JSON to diff against")
+    args = ap.parse_args()
+
+    names = [n.strip() for n in args.scenarios.split(",") if n.strip()]
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"unknown scenario(s): {', '.join(unknown)}")
+
+    ops = _Ops()
+    if args.backend == "memory":
+        _use_memory_backend(ops)
+    else:
+        monitoring.register(ops)
+
+    # Configure the app before importing it: scratch database, no index snapshot.
+    os.environ["MONGO_URI"] = args.uri
+    os.environ["MONGO_DB_NAME"] = args.db
+    os.environ["SIMILAR_INDEX_PATH"] = ""
+    import main as api
+    from databases.mongo import MongoPool
+
+    data = datagen.from_arguments(args)
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    try:
+        seeded_at = time.perf_counter()
+        written = await datagen.seed(
+            pool, data, books=api.BOOKS_COLLECTION, profiles=api.PROFILES_COLLECTION, comments=api.COMMENTS_COLLECTION
+        )
+        print(f"seeded {written} in {time.perf_counter() - seeded_at:.1f}s")
+    finally:
+        await pool.close()
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "label": args.label,
+            "commit": _git_commit(),
+            "backend": args.backend,
+            "dataset": data.summary(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "scenarios": {},
+    }
+    async with api.app.router.lifespan_context(api.app):
+        results["meta"]["config"] = _app_config(api)
+        ctx = _Context(api.app, data, args.backend)
+        for name in names:
+            login = name == "login"
+            r = await _run_scenario(
+                ctx,
+                name,
+                ops,
+                requests=args.login_requests if login else args.requests,
+                concurrency=args.login_burst if login else args.concurrency,
+                warmup=0 if login else args.warmup,
+                seed=args.seed,
+            )
+            results["scenarios"][name] = r
+            _print(name, r)
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{results['meta']['commit'] or 'results'}-{args.backend}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {out}")
+    if args.compare:
+        _compare(results, args.compare)
+
+if __name__ == "__main__":
+    asyncio.run(main())
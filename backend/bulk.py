@@ -0,0 +1,83 @@
+"""NDJSON bulk import/export straight against MongoDB, bypassing HTTP.
+
+Same validation, chunking and error report as POST /books/import and
+POST /comments/import; export writes the same rows GET /<kind>/export streams.
+
+    python -m bulk import books books.ndjson --chunk-size 2000
+    python -m bulk import comments comments.ndjson
+    python -m bulk export books > books.ndjson
+
+Connection settings come from the same MONGO_* variables as the API. Caches
+and autocomplete indexes in a running API process are not notified; restart it
+after a large import.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import AsyncIterator, BinaryIO
+
+from databases.mongo import MongoPool
+from encoding import dumps
+from managers.books_manager import BooksManager
+from managers.bulk_io import iter_lines
+from managers.comment_manager import CommentsManager
+
+READ_SIZE = 1 << 16
+
+async def _read_chunks(f: BinaryIO) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(f.read, READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+async def main():
+    ap = argparse.ArgumentParser(prog="python -m bulk")
+    ap.add_argument("action", choices=["import", "export"])
+    ap.add_argument("kind", choices=["books", "comments"])
+    ap.add_argument("path", nargs="?", default="-", help="NDJSON file, or - for stdin/stdout")
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb"))
+    ap.add_argument("--chunk-size", type=int, default=int(os.environ.get("IMPORT_CHUNK_SIZE", "1000")))
+    ap.add_argument("--max-line-bytes", type=int, default=int(os.environ.get("IMPORT_MAX_LINE_BYTES", str(1 << 20))))
+    args = ap.parse_args()
+
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    books = BooksManager(pool, os.environ.get("MONGO_COLLECTION", "books"))
+    comments = CommentsManager(pool, os.environ.get("MONGO_COMMENTS", "comments"), books=books)
+    await books.connect()
+    await comments.connect()
+    try:
+        if args.action == "import":
+            f = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+            try:
+                lines = iter_lines(_read_chunks(f), max_line_bytes=args.max_line_bytes)
+                if args.kind == "books":
+                    report = await books.import_books(lines, chunk_size=args.chunk_size)
+                else:
+                    report = await comments.import_comments(lines, chunk_size=args.chunk_size)
+            finally:
+                if f is not sys.stdin.buffer:
+                    f.close()
+            print(json.dumps(report, indent=2))
+            if report["failed"]:
+                raise SystemExit(1)
+        else:
+            out = sys.stdout.buffer if args.path == "-" else open(args.path, "wb")
+            try:
+                docs = books.export_books() if args.kind == "books" else comments.export_comments()
+                async for doc in docs:
+                    out.write(dumps(doc) + b"\n")
+            finally:
+                if out is not sys.stdout.buffer:
+                    out.close()
+    finally:
+        await comments.close()
+        await books.close()
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,55 @@
+import logging
+from typing import Any, Sequence
+from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # optional: COMPRESSION=br falls back to gzip without it
+    BrotliMiddleware = None
+
+log = logging.getLogger(__name__)
+
+class _Compress:
+    """Runs ``compressor`` except for paths under ``skip_paths``."""
+
+    def __init__(self, app: ASGIApp, *, compressor: Any, skip_paths: Sequence[str], **options: Any):
+        self.app = app
+        self.compressed = compressor(app, **options)
+        self.skip_paths = tuple(skip_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and self.skip_paths and scope["path"].startswith(self.skip_paths):
+            await self.app(scope, receive, send)
+        else:
+            await self.compressed(scope, receive, send)
+
+def add_compression(
+    app: FastAPI, mode: str, *, minimum_size: int = 1024, level: int = 6, skip_paths: Sequence[str] = ()
+):
+    """Compress response bodies of at least ``minimum_size`` bytes.
+
+    ``mode`` is "gzip", "br" (brotli for clients that accept it, gzip for the
+    rest; needs the brotli-asgi package) or "off". Smaller bodies, 304s and
+    responses that already carry a Content-Encoding pass through untouched.
+    Paths under ``skip_paths`` are never compressed: the compressors buffer
+    output, which would hold back server-sent events.
+    """
+    if mode == "off":
+        return
+    if mode == "br":
+        if BrotliMiddleware is not None:
+            app.add_middleware(
+                _Compress,
+                compressor=BrotliMiddleware,
+                skip_paths=skip_paths,
+                quality=level,
+                minimum_size=minimum_size,
+                gzip_fallback=True,
+            )
+            return
+        log.warning("COMPRESSION=br needs the 'brotli-asgi' package; using gzip")
+    app.add_middleware(
+        _Compress, compressor=GZipMiddleware, skip_paths=skip_paths, minimum_size=minimum_size, compresslevel=level
+    )
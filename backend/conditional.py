@@ -0,0 +1,37 @@
+from typing import Any
+from fastapi import Request
+from fastapi.responses import Response
+
+# Clients must revalidate on every use; a matching ETag makes that a bodyless 304.
+CACHE_CONTROL = "no-cache"
+
+def weak_etag(epoch: str, *versions: int) -> str:
+    """ETag for a representation that changes only when one of ``versions`` is bumped.
+
+    ``epoch`` identifies where the counters live (see Cache.epoch) so a tag
+    minted against one process's counters never validates against another's.
+    Weak, because the gzip/brotli encodings of a body share its tag.
+    """
+    return 'W/"%s-%s"' % (epoch, "-".join(str(v) for v in versions))
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match lists ``etag`` (weak comparison) or ``*``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+def with_etag(result: Any, response: Response, etag: str) -> Any:
+    """Attach ``etag`` to a route's result, whether it returns a Response or a model."""
+    target = result if isinstance(result, Response) else response
+    target.headers["ETag"] = etag
+    target.headers["Cache-Control"] = CACHE_CONTROL
+    return result
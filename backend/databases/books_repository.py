@@ -1,11 +1,47 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from bson import ObjectId
-from databases.mongo import Mongo, to_object_id
-from pymongo import ReturnDocument
+from databases.mongo import Mongo, MongoPool, to_object_id
+from databases.pagination import keyset_filter
+from pymongo import ASCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+from pymongo.collation import Collation, CollationStrength
+from pymongo.errors import BulkWriteError
+
+# Case-insensitive matching/sorting for the paged list. Queries only use an
+# index whose collation matches, so every index the list relies on declares it.
+BOOKS_COLLATION = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
+def _keyset_query(
+    filter_doc: Dict[str, Any],
+    sort_field: str,
+    direction: int,
+    after: Optional[Tuple[Any, ObjectId]],
+) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+    if after is not None:
+        seek = keyset_filter(sort_field, direction, *after)
+        filter_doc = {"$and": [filter_doc, seek]} if filter_doc else seek
+    sort = [("_id", direction)] if sort_field == "_id" else [(sort_field, direction), ("_id", direction)]
+    return filter_doc, sort
 
 class BooksRepository:
-    def __init__(self, uri: str, db_name: str, collection: str):
-        self._mongo = Mongo(uri, db_name, collection)
+    INDEXES = [
+        IndexModel([("username", ASCENDING)], name="username"),
+        IndexModel([("username", ASCENDING), ("_id", ASCENDING)], name="username_ci", collation=BOOKS_COLLATION),
+        IndexModel([("author", ASCENDING), ("_id", ASCENDING)], name="author_ci", collation=BOOKS_COLLATION),
+        IndexModel([("genre", ASCENDING), ("_id", ASCENDING)], name="genre_ci", collation=BOOKS_COLLATION),
+        IndexModel([("title", ASCENDING), ("_id", ASCENDING)], name="title_ci", collation=BOOKS_COLLATION),
+        IndexModel([("year", ASCENDING), ("_id", ASCENDING)], name="year_ci", collation=BOOKS_COLLATION),
+        IndexModel([("views", ASCENDING), ("_id", ASCENDING)], name="views_ci", collation=BOOKS_COLLATION),
+        # Text indexes only support the simple collation; search queries pass none.
+        IndexModel(
+            [("title", TEXT), ("author", TEXT), ("username", TEXT), ("review", TEXT)],
+            name="books_text",
+            weights={"title": 10, "author": 5, "username": 3, "review": 1},
+            default_language="english",
+        ),
+    ]
+
+    def __init__(self, pool: MongoPool, collection: str):
+        self._mongo = Mongo(pool, collection)
 
     async def connect(self):
         await self._mongo.connect()
@@ -13,8 +49,109 @@ class BooksRepository:
     async def close(self):
         await self._mongo.close()
 
-    async def find_all(self) -> List[Dict[str, Any]]:
-        return await self._mongo.find_all()
+    async def ensure_indexes(self) -> List[str]:
+        return await self._mongo.ensure_indexes(self.INDEXES)
+
+    async def find_page(
+        self,
+        filter_doc: Dict[str, Any],
+        *,
+        sort_field: str,
+        direction: int,
+        limit: int,
+        after: Optional[Tuple[Any, ObjectId]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """One page of books ordered by (sort_field, _id), starting after a cursor."""
+        filter_doc, sort = _keyset_query(filter_doc, sort_field, direction, after)
+        return await self._mongo.find_sorted(
+            filter_doc, sort, limit, collation=BOOKS_COLLATION, projection=projection
+        )
+
+    async def search_page(
+        self,
+        text: str,
+        filter_doc: Dict[str, Any],
+        *,
+        limit: int,
+        after: Optional[Tuple[float, ObjectId]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        """One page of text-index matches ordered by (relevance, _id), best first.
+
+        Each document carries its ``score``; the page cursor is (score, _id).
+        """
+        score = {"$meta": "textScore"}
+        pipeline: List[Dict[str, Any]] = [{"$match": {"$text": {"$search": text}, **filter_doc}}]
+        if projection:
+            pipeline.append({"$project": {**projection, "score": score}})
+        else:
+            pipeline.append({"$addFields": {"score": score}})
+        if after is not None:
+            pipeline.append({"$match": keyset_filter("score", -1, *after)})
+        pipeline += [{"$sort": {"score": -1, "_id": -1}}, {"$limit": limit}]
+        return await self._mongo.aggregate(pipeline)
+
+    async def value_counts(self, field: str) -> List[Dict[str, Any]]:
+        """``{"value", "n"}`` for every distinct value of ``field``, grouped server-side."""
+        return await self._mongo.aggregate([
+            {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+            {"$project": {"_id": 0, "value": "$_id", "n": 1}},
+        ])
+
+    async def facets(self, filter_doc: Dict[str, Any], *, limit: int) -> Dict[str, Any]:
+        """Value counts for the filterable fields, year range and cover split of
+        the matching books, in one $facet aggregation."""
+        def top(field: str) -> List[Dict[str, Any]]:
+            return [
+                {"$match": {field: {"$nin": [None, ""]}}},
+                {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+                {"$sort": {"n": -1, "_id": 1}},
+                {"$limit": limit},
+            ]
+        pipeline = [
+            {"$match": filter_doc},
+            {"$facet": {
+                "author": top("author"),
+                "genre": top("genre"),
+                "username": top("username"),
+                "year": [{"$group": {"_id": None, "min": {"$min": "$year"}, "max": {"$max": "$year"}}}],
+                # Missing, null and "" all sort at or below "".
+                "cover": [{"$group": {"_id": {"$gt": ["$image", ""]}, "n": {"$sum": 1}}}],
+                "total": [{"$count": "n"}],
+            }},
+        ]
+        rows = await self._mongo.aggregate(pipeline, collation=BOOKS_COLLATION)
+        return rows[0] if rows else {}
+
+    def iter_query(
+        self,
+        filter_doc: Dict[str, Any],
+        *,
+        sort_field: str,
+        direction: int,
+        after: Optional[Tuple[Any, ObjectId]] = None,
+        batch_size: int = 500,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Every matching book in (sort_field, _id) order, streamed from the cursor."""
+        filter_doc, sort = _keyset_query(filter_doc, sort_field, direction, after)
+        return self._mongo.iter_find(
+            filter_doc, sort=sort, batch_size=batch_size, collation=BOOKS_COLLATION, projection=projection
+        )
+
+    async def find_many_by_id(
+        self, book_ids: List[str], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self._mongo.find_in("_id", [to_object_id(i) for i in book_ids], projection)
+
+    async def insert_many(self, docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        return await self._mongo.insert_many(docs, ordered=False)
+
+    def iter_all(
+        self, *, batch_size: int = 500, projection: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        return self._mongo.iter_find({}, sort=[("_id", ASCENDING)], batch_size=batch_size, projection=projection)
 
     async def find_one(self, book_id: str) -> Optional[Dict[str, Any]]:
         oid: ObjectId = to_object_id(book_id)
@@ -31,8 +168,15 @@ class BooksRepository:
         oid: ObjectId = to_object_id(book_id)
         return await self._mongo.delete_one(oid)
 
-    async def find_by_user(self, username: str) -> List[Dict[str, Any]]:
-        return await self._mongo.find_many({"username": username})
+    async def find_by_user(self, username: str, projection: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        return await self._mongo.find_many({"username": username}, projection)
+
+    async def find_ids_by_user(self, username: str, *, before: ObjectId, limit: int) -> List[str]:
+        """Ids of up to ``limit`` of the user's books with an _id below ``before``."""
+        docs = await self._mongo.find_sorted(
+            {"username": username, "_id": {"$lt": before}}, [("_id", ASCENDING)], limit, projection={"_id": 1}
+        )
+        return [d["id"] for d in docs]
 
     async def find_one_and_inc_views(self, book_id: str) -> Optional[Dict[str, Any]]:
         """Atomically increment views and return updated doc."""
@@ -44,7 +188,50 @@ class BooksRepository:
         )
         return doc
 
+    async def inc_comment_count(self, book_id: str, delta: int) -> Optional[Dict[str, Any]]:
+        """Adjust the denormalized comment count; returns the updated book."""
+        oid: ObjectId = to_object_id(book_id)
+        return await self._mongo.find_one_and_update(
+            {"_id": oid},
+            {"$inc": {"comment_count": delta}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def bulk_inc_comment_count(self, deltas: Dict[str, int]) -> None:
+        ops = [
+            UpdateOne({"_id": to_object_id(book_id)}, {"$inc": {"comment_count": n}})
+            for book_id, n in deltas.items()
+            if n
+        ]
+        await self._mongo.bulk_write(ops, ordered=False)
+
+    async def bulk_inc_views(self, deltas: Dict[str, int]) -> List[str]:
+        """Apply buffered view counts as one unordered bulk_write; returns the
+        ids whose update the server rejected (every other one was applied)."""
+        ids = [book_id for book_id, n in deltas.items() if n]
+        ops = [UpdateOne({"_id": to_object_id(book_id)}, {"$inc": {"views": deltas[book_id]}}) for book_id in ids]
+        try:
+            await self._mongo.bulk_write(ops, ordered=False)
+        except BulkWriteError as exc:
+            return [ids[e["index"]] for e in exc.details.get("writeErrors", [])]
+        return []
+
     async def update_fields(self, book_id: str, fields: dict) -> Optional[Dict[str, Any]]:
+        """$set fields and return the document as it was *before* the update.
+
+        Callers that need the new state merge ``fields`` onto it locally; having
+        the old values lets them invalidate anything keyed on them.
+        """
         oid: ObjectId = to_object_id(book_id)
         fields.pop("views", None)
-        return await self._mongo.update_one(oid, fields)
+        fields.pop("comment_count", None)
+        return await self._mongo.find_one_and_update(
+            {"_id": oid},
+            {"$set": fields},
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    async def delete_returning(self, book_id: str) -> Optional[Dict[str, Any]]:
+        """Delete a book and return the removed document."""
+        oid: ObjectId = to_object_id(book_id)
+        return await self._mongo.find_one_and_delete({"_id": oid})
@@ -1,7 +1,10 @@
 # ===== databases/comments_repository.py =====
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 from bson import ObjectId
-from databases.mongo import Mongo, to_object_id
+from databases.mongo import Mongo, MongoPool, to_object_id
+from databases.pagination import keyset_filter
+from pymongo import ASCENDING, IndexModel
 
 def _serialize(doc: Dict[str, Any]) -> Dict[str, Any]:
     if not doc:
@@ -13,8 +16,16 @@ def _serialize(doc: Dict[str, Any]) -> Dict[str, Any]:
     return d
 
 class CommentsRepository:
-    def __init__(self, uri: str, db_name: str, collection: str = "comments"):
-        self._mongo = Mongo(uri, db_name, collection)
+    # Threads page on (created_at, _id); both directions walk the same index.
+    INDEXES = [
+        IndexModel([("book_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="book_id_created_at"),
+        IndexModel([("username", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)], name="username_created_at"),
+    ]
+    # Superseded indexes on the client-supplied date string; see migrations/.
+    LEGACY_INDEXES = ["book_id_date_and_time", "username_date_and_time"]
+
+    def __init__(self, pool: MongoPool, collection: str = "comments"):
+        self._mongo = Mongo(pool, collection)
 
     async def connect(self):
         await self._mongo.connect()
@@ -22,9 +33,21 @@ class CommentsRepository:
     async def close(self):
         await self._mongo.close()
 
+    async def ensure_indexes(self) -> List[str]:
+        return await self._mongo.ensure_indexes(self.INDEXES)
+
     async def find_all(self) -> List[Dict[str, Any]]:
         return await self._mongo.find_all()
 
+    async def insert_many(self, docs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        return await self._mongo.insert_many(docs, ordered=False)
+
+    def iter_all(self, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        return self._mongo.iter_find({}, sort=[("_id", ASCENDING)], batch_size=batch_size)
+
+    async def find_many_by_id(self, comment_ids: List[str]) -> List[Dict[str, Any]]:
+        return await self._mongo.find_in("_id", [to_object_id(i) for i in comment_ids])
+
     async def find_one(self, comment_id: str) -> Optional[Dict[str, Any]]:
         oid: ObjectId = to_object_id(comment_id)
         return await self._mongo.find_one(oid)
@@ -40,31 +63,84 @@ class CommentsRepository:
         oid: ObjectId = to_object_id(comment_id)
         return await self._mongo.delete_one(oid)
 
-    async def find_by_book(self, book_id: str, *, limit: int = 100, skip: int = 0, newest_first: bool = True) -> List[Dict[str, Any]]:
-        assert self._mongo.collection is not None
-        sort_dir = -1 if newest_first else 1
-        cursor = (
-            self._mongo.collection
-            .find({"book_id": book_id})
-            .sort("date_and_time", sort_dir)
-            .skip(skip)
-            .limit(limit)
+    async def delete_returning(self, comment_id: str) -> Optional[Dict[str, Any]]:
+        oid: ObjectId = to_object_id(comment_id)
+        return await self._mongo.find_one_and_delete({"_id": oid})
+
+    async def delete_batch_by_book(self, book_id: str, *, limit: int) -> int:
+        return len(await self._mongo.delete_batch({"book_id": book_id}, limit=limit))
+
+    async def delete_batch_by_user(
+        self, username: str, *, created_before: datetime, limit: int
+    ) -> List[Dict[str, Any]]:
+        """Delete up to ``limit`` of the user's comments created no later than
+        ``created_before`` (or undated) and return their ``book_id``s."""
+        return await self._mongo.delete_batch(
+            {"username": username, "created_at": {"$not": {"$gt": created_before}}},
+            limit=limit,
+            projection={"book_id": 1},
         )
-        return [_serialize(doc) async for doc in cursor]
 
+    @staticmethod
+    def _thread_query(
+        field: str, value: str, newest_first: bool, after: Optional[Tuple[Optional[datetime], ObjectId]]
+    ) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+        direction = -1 if newest_first else 1
+        filter_doc: Dict[str, Any] = {field: value}
+        if after is not None:
+            filter_doc = {"$and": [filter_doc, keyset_filter("created_at", direction, *after)]}
+        return filter_doc, [("created_at", direction), ("_id", direction)]
 
-    async def find_by_user(self, username: str, *, limit: int = 100, skip: int = 0, newest_first: bool = True) -> List[Dict[str, Any]]:
-        assert self._mongo.collection is not None
-        sort_dir = -1 if newest_first else 1
-        cursor = (
-            self._mongo.collection
-            .find({"username": username})
-            .sort("date_and_time", sort_dir)
-            .skip(skip)
-            .limit(limit)
+    async def find_by_book(
+        self,
+        book_id: str,
+        *,
+        limit: int = 100,
+        after: Optional[Tuple[Optional[datetime], ObjectId]] = None,
+        newest_first: bool = True,
+    ) -> List[Dict[str, Any]]:
+        filter_doc, sort = self._thread_query("book_id", book_id, newest_first, after)
+        return await self._mongo.find_sorted(filter_doc, sort, limit)
+
+    async def find_by_user(
+        self,
+        username: str,
+        *,
+        limit: int = 100,
+        after: Optional[Tuple[Optional[datetime], ObjectId]] = None,
+        newest_first: bool = True,
+    ) -> List[Dict[str, Any]]:
+        filter_doc, sort = self._thread_query("username", username, newest_first, after)
+        return await self._mongo.find_sorted(filter_doc, sort, limit)
+
+    def iter_by_user(
+        self,
+        username: str,
+        *,
+        limit: int = 0,
+        after: Optional[Tuple[Optional[datetime], ObjectId]] = None,
+        newest_first: bool = True,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        filter_doc, sort = self._thread_query("username", username, newest_first, after)
+        return self._mongo.iter_find(filter_doc, sort=sort, limit=limit, batch_size=batch_size)
+
+    def watch(self, *, resume_after: Optional[Dict[str, Any]] = None, max_await_ms: int = 1000):
+        """Inserts and deletes, with the deleted document's pre-image when the
+        collection records them (see enable_pre_images)."""
+        return self._mongo.watch(
+            [{"$match": {"operationType": {"$in": ["insert", "delete"]}}}],
+            full_document_before_change="whenAvailable",
+            resume_after=resume_after,
+            max_await_time_ms=max_await_ms,
         )
-        return [_serialize(doc) async for doc in cursor]
-    
+
+    async def enable_pre_images(self):
+        """Record pre-images so delete events carry book_id (MongoDB 6.0+)."""
+        assert self._mongo.collection is not None
+        coll = self._mongo.collection
+        await coll.database.command("collMod", coll.name, changeStreamPreAndPostImages={"enabled": True})
+
     async def delete_by_book(self, book_id: str) -> int:
         assert self._mongo.collection is not None
         res = await self._mongo.collection.delete_many({"book_id": book_id})
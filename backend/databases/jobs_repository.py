@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from databases.mongo import Mongo, MongoPool, to_object_id
+from pymongo import ASCENDING, IndexModel, ReturnDocument
+
+ACTIVE = ["pending", "running"]
+
+class JobsRepository:
+    """Background job records. Each one is also the tombstone of what it is
+    deleting, so unfinished work is found again after a restart."""
+
+    INDEXES = [
+        IndexModel([("status", ASCENDING), ("lease_until", ASCENDING)], name="status_lease"),
+    ]
+
+    def __init__(self, pool: MongoPool, collection: str = "jobs"):
+        self._mongo = Mongo(pool, collection)
+
+    async def connect(self):
+        await self._mongo.connect()
+
+    async def close(self):
+        await self._mongo.close()
+
+    async def ensure_indexes(self) -> List[str]:
+        return await self._mongo.ensure_indexes(self.INDEXES)
+
+    async def create(self, kind: str, target: str, now: datetime) -> Dict[str, Any]:
+        """Record a job as "staged": no worker claims it until ``activate``."""
+        return await self._mongo.insert_one({
+            "kind": kind,
+            "target": target,
+            "status": "staged",
+            "deleted": {},
+            "attempts": 0,
+            "error": None,
+            "owner": None,
+            "lease_until": None,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+        })
+
+    async def activate(self, job_id: str, now: datetime) -> Optional[Dict[str, Any]]:
+        """Make a staged job claimable; returns it as it now stands."""
+        return await self._mongo.find_one_and_update(
+            {"_id": to_object_id(job_id), "status": "staged"},
+            {"$set": {"status": "pending", "updated_at": now}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def discard(self, job_id: str) -> bool:
+        return await self._mongo.delete_one(to_object_id(job_id))
+
+    async def find_one(self, job_id: str) -> Optional[Dict[str, Any]]:
+        oid: ObjectId = to_object_id(job_id)
+        return await self._mongo.find_one(oid)
+
+    async def claim(self, owner: str, now: datetime, lease_until: datetime) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest active job nobody holds a live lease on."""
+        return await self._mongo.find_one_and_update(
+            {"status": {"$in": ACTIVE}, "$or": [{"lease_until": None}, {"lease_until": {"$lt": now}}]},
+            {
+                "$set": {"status": "running", "owner": owner, "lease_until": lease_until, "updated_at": now},
+                "$inc": {"attempts": 1},
+            },
+            return_document=ReturnDocument.AFTER,
+            sort=[("_id", ASCENDING)],
+        )
+
+    async def progress(
+        self, job_id: str, owner: str, deleted: Dict[str, int], now: datetime, lease_until: datetime
+    ) -> bool:
+        """Record one batch and extend the lease; False if another worker took the job over."""
+        update: Dict[str, Any] = {"$set": {"updated_at": now, "lease_until": lease_until}}
+        inc = {f"deleted.{k}": n for k, n in deleted.items() if n}
+        if inc:
+            update["$inc"] = inc
+        doc = await self._mongo.find_one_and_update({"_id": to_object_id(job_id), "owner": owner}, update)
+        return doc is not None
+
+    async def release(
+        self, job_id: str, owner: str, now: datetime, *, retry_at: Optional[datetime] = None, error: Optional[str] = None
+    ):
+        """Give a job back unfinished: on shutdown (resumed at once by the next
+        worker) or after an error (retried from ``retry_at``)."""
+        await self._mongo.find_one_and_update(
+            {"_id": to_object_id(job_id), "owner": owner},
+            {"$set": {"status": "pending", "owner": None, "lease_until": retry_at, "error": error, "updated_at": now}},
+        )
+
+    async def finish(self, job_id: str, owner: str, now: datetime, *, error: Optional[str] = None):
+        await self._mongo.find_one_and_update(
+            {"_id": to_object_id(job_id), "owner": owner},
+            {
+                "$set": {
+                    "status": "failed" if error else "done",
+                    "error": error,
+                    "lease_until": None,
+                    "updated_at": now,
+                    "finished_at": now,
+                }
+            },
+        )
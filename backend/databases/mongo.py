@@ -1,7 +1,16 @@
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+import asyncio
+from collections import defaultdict
+from motor.motor_asyncio import (
+    AsyncIOMotorChangeStream,
+    AsyncIOMotorClient,
+    AsyncIOMotorCollection,
+    AsyncIOMotorDatabase,
+)
 from bson import ObjectId
-from typing import Any, Dict, List
-from pymongo import ReturnDocument
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pymongo import IndexModel, ReturnDocument, monitoring
+from pymongo.errors import BulkWriteError
+from pymongo.collation import Collation
 
 def _serialize(doc: Dict[str, Any]) -> Dict[str, Any]:
     if not doc:
@@ -17,32 +26,200 @@ def _serialize(doc: Dict[str, Any]) -> Dict[str, Any]:
 def to_object_id(id_str: str) -> ObjectId:
     return ObjectId(id_str)
 
-class Mongo:
-    def __init__(self, uri: str, db_name: str, collection: str):
+class _PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events per server address."""
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def _bump(self, event, key: str, delta: int = 1):
+        self._stats[f"{event.address[0]}:{event.address[1]}"][key] += delta
+
+    def pool_created(self, event): self._bump(event, "pools_created")
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): self._bump(event, "pools_cleared")
+    def pool_closed(self, event): pass
+
+    def connection_created(self, event):
+        self._bump(event, "connections_created")
+        self._bump(event, "open")
+
+    def connection_ready(self, event): pass
+
+    def connection_closed(self, event):
+        self._bump(event, "connections_closed")
+        self._bump(event, "open", -1)
+
+    def connection_check_out_started(self, event):
+        self._bump(event, "waiting")
+
+    def connection_check_out_failed(self, event):
+        self._bump(event, "waiting", -1)
+        self._bump(event, "checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._bump(event, "waiting", -1)
+        self._bump(event, "in_use")
+        self._bump(event, "checkouts")
+
+    def connection_checked_in(self, event):
+        self._bump(event, "in_use", -1)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {addr: dict(counts) for addr, counts in self._stats.items()}
+
+class MongoPool:
+    """One Motor client (and connection pool) shared by every repository."""
+
+    def __init__(
+        self,
+        uri: str,
+        db_name: str,
+        *,
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        wait_queue_timeout_ms: Optional[int] = None,
+        compressors: Optional[str] = None,
+        event_listeners: Optional[List[Any]] = None,
+    ):
         self._uri = uri
         self._db_name = db_name
-        self._collection_name = collection
+        self._max_pool_size = max_pool_size
+        self._min_pool_size = min_pool_size
+        self._wait_queue_timeout_ms = wait_queue_timeout_ms
+        self._compressors = compressors or None
+        self._listener = _PoolStatsListener()
+        self._extra_listeners = list(event_listeners or [])
         self.client: AsyncIOMotorClient | None = None
-        self.collection: AsyncIOMotorCollection | None = None
+        self.db: AsyncIOMotorDatabase | None = None
 
     async def connect(self):
-        self.client = AsyncIOMotorClient(self._uri)
-        db = self.client[self._db_name]
-        self.collection = db[self._collection_name]
+        if self.client is not None:
+            return
+        options: Dict[str, Any] = {
+            "maxPoolSize": self._max_pool_size,
+            "minPoolSize": self._min_pool_size,
+            "event_listeners": [self._listener, *self._extra_listeners],
+            # Stored dates are UTC; return them timezone-aware so they serialize with an offset.
+            "tz_aware": True,
+        }
+        if self._wait_queue_timeout_ms:
+            options["waitQueueTimeoutMS"] = self._wait_queue_timeout_ms
+        if self._compressors:
+            options["compressors"] = self._compressors
+        self.client = AsyncIOMotorClient(self._uri, **options)
+        self.db = self.client[self._db_name]
+
+    async def warm(self):
+        """Open up to min_pool_size connections before the first request arrives."""
+        assert self.db is not None
+        await self.db.command("ping")
+        if self._min_pool_size > 1:
+            await asyncio.gather(*(self.db.command("ping") for _ in range(self._min_pool_size)))
+
+    def collection(self, name: str) -> AsyncIOMotorCollection:
+        assert self.db is not None, "MongoPool.connect() must be awaited first"
+        return self.db[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_pool_size": self._max_pool_size,
+            "min_pool_size": self._min_pool_size,
+            "wait_queue_timeout_ms": self._wait_queue_timeout_ms,
+            "compressors": self._compressors,
+            "servers": self._listener.snapshot(),
+        }
 
     async def close(self):
         if self.client:
             self.client.close()
+            self.client = None
+            self.db = None
+
+class Mongo:
+    def __init__(self, pool: MongoPool, collection: str):
+        self._pool = pool
+        self._collection_name = collection
+        self.collection: AsyncIOMotorCollection | None = None
+
+    async def connect(self):
+        self.collection = self._pool.collection(self._collection_name)
+
+    async def close(self):
+        # The client belongs to the shared pool; it is closed once at shutdown.
+        self.collection = None
+
+    async def ensure_indexes(self, indexes: List[IndexModel]) -> List[str]:
+        """Create declared indexes; a no-op for ones that already exist."""
+        assert self.collection is not None
+        if not indexes:
+            return []
+        return await self.collection.create_indexes(indexes)
 
     async def find_all(self) -> List[Dict[str, Any]]:
         assert self.collection is not None
         cursor = self.collection.find({})
         return [_serialize(doc) async for doc in cursor]
 
-    async def find_many(self, filter_doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+    async def find_many(
+        self, filter_doc: Dict[str, Any], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """Added to support BooksRepository.find_by_user."""
         assert self.collection is not None
-        cursor = self.collection.find(filter_doc)
+        cursor = self.collection.find(filter_doc, projection)
+        return [_serialize(doc) async for doc in cursor]
+
+    async def find_in(
+        self, field: str, values: List[Any], projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Every document whose ``field`` is one of ``values``, in one $in query."""
+        assert self.collection is not None
+        if not values:
+            return []
+        cursor = self.collection.find({field: {"$in": values}}, projection)
+        return [_serialize(doc) async for doc in cursor]
+
+    async def iter_find(
+        self,
+        filter_doc: Dict[str, Any],
+        *,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        skip: int = 0,
+        limit: int = 0,
+        batch_size: int = 500,
+        collation: Optional[Collation] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield documents straight off the cursor, one server batch at a time."""
+        assert self.collection is not None
+        cursor = self.collection.find(filter_doc, projection, collation=collation, batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        async for doc in cursor:
+            yield _serialize(doc)
+
+    async def find_sorted(
+        self,
+        filter_doc: Dict[str, Any],
+        sort: List[Tuple[str, int]],
+        limit: int,
+        *,
+        collation: Optional[Collation] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> List[Dict[str, Any]]:
+        assert self.collection is not None
+        cursor = self.collection.find(filter_doc, projection, collation=collation).sort(sort).limit(limit)
+        return [_serialize(doc) async for doc in cursor]
+
+    async def aggregate(
+        self, pipeline: List[Dict[str, Any]], *, collation: Optional[Collation] = None
+    ) -> List[Dict[str, Any]]:
+        assert self.collection is not None
+        cursor = self.collection.aggregate(pipeline, collation=collation)
         return [_serialize(doc) async for doc in cursor]
 
     async def find_one(self, oid: ObjectId):
@@ -50,17 +227,49 @@ class Mongo:
         doc = await self.collection.find_one({"_id": oid})
         return _serialize(doc) if doc else None
 
+    async def find_one_by(self, filter_doc: Dict[str, Any]):
+        assert self.collection is not None
+        doc = await self.collection.find_one(filter_doc)
+        return _serialize(doc) if doc else None
+
     async def insert_one(self, data: Dict[str, Any]):
         assert self.collection is not None
-        res = await self.collection.insert_one(data)
-        doc = await self.collection.find_one({"_id": res.inserted_id})
+        doc = dict(data)
+        res = await self.collection.insert_one(doc)
+        # The stored document is exactly what we sent plus its _id; no re-read needed.
+        doc["_id"] = res.inserted_id
         return _serialize(doc)
 
+    async def insert_many(
+        self, docs: List[Dict[str, Any]], *, ordered: bool = False
+    ) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]]]:
+        """Insert a chunk; returns the stored documents and ``(index, message)``
+        for each one the server rejected. Unordered writes carry on past errors."""
+        assert self.collection is not None
+        if not docs:
+            return [], []
+        docs = [dict(d) for d in docs]
+        failures: List[Tuple[int, str]] = []
+        try:
+            await self.collection.insert_many(docs, ordered=ordered)
+        except BulkWriteError as exc:
+            failures = [(e["index"], e.get("errmsg", "write error")) for e in exc.details.get("writeErrors", [])]
+            if ordered and failures:
+                # Everything after the first failure was not attempted.
+                first = failures[0][0]
+                failures += [(i, "not attempted") for i in range(first + 1, len(docs))]
+        failed = {i for i, _ in failures}
+        stored = [_serialize(d) for i, d in enumerate(docs) if i not in failed]
+        return stored, failures
+
     async def update_one(self, oid: ObjectId, data: Dict[str, Any]):
         """$set wrapper for plain field updates."""
         assert self.collection is not None
-        await self.collection.update_one({"_id": oid}, {"$set": data})
-        doc = await self.collection.find_one({"_id": oid})
+        doc = await self.collection.find_one_and_update(
+            {"_id": oid},
+            {"$set": data},
+            return_document=ReturnDocument.AFTER,
+        )
         return _serialize(doc) if doc else None
 
     async def delete_one(self, oid: ObjectId) -> bool:
@@ -68,21 +277,56 @@ class Mongo:
         res = await self.collection.delete_one({"_id": oid})
         return res.deleted_count == 1
 
+    async def delete_one_by(self, filter_doc: Dict[str, Any]) -> bool:
+        assert self.collection is not None
+        res = await self.collection.delete_one(filter_doc)
+        return res.deleted_count == 1
+
+    async def find_one_and_delete(self, filter_doc: Dict[str, Any]):
+        assert self.collection is not None
+        doc = await self.collection.find_one_and_delete(filter_doc)
+        return _serialize(doc) if doc else None
+
+    async def delete_batch(
+        self, filter_doc: Dict[str, Any], *, limit: int, projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
+        """Delete at most ``limit`` matching documents and return them, projected.
+        Bounds each delete_many for long-running cleanups."""
+        assert self.collection is not None
+        cursor = self.collection.find(filter_doc, projection or {"_id": 1}).limit(limit)
+        docs = [doc async for doc in cursor]
+        if docs:
+            await self.collection.delete_many({"_id": {"$in": [d["_id"] for d in docs]}})
+        return [_serialize(doc) for doc in docs]
+
+    async def bulk_write(self, operations: List[Any], *, ordered: bool = False):
+        assert self.collection is not None
+        if not operations:
+            return None
+        return await self.collection.bulk_write(operations, ordered=ordered)
+
     async def find_one_and_update(
         self,
         filter_doc: Dict[str, Any],
         update_doc: Dict[str, Any],
         *,
         return_document: ReturnDocument = ReturnDocument.AFTER,
+        sort: Optional[List[Tuple[str, int]]] = None,
     ):
         assert self.collection is not None
         doc = await self.collection.find_one_and_update(
             filter_doc,
             update_doc,                      
             return_document=return_document, 
+            sort=sort,
         )
         return _serialize(doc) if doc else None
 
+    def watch(self, pipeline: List[Dict[str, Any]], **options: Any) -> AsyncIOMotorChangeStream:
+        """Change stream over this collection; use as ``async with``."""
+        assert self.collection is not None
+        return self.collection.watch(pipeline, **options)
+
     async def inc_views(self, oid: ObjectId):
         """Convenience helper: increment views and return post-increment doc."""
         return await self.find_one_and_update(
@@ -0,0 +1,41 @@
+import base64
+import binascii
+from typing import Any, Dict, Tuple
+from bson import ObjectId, json_util
+from bson.errors import BSONError
+
+class InvalidCursorError(ValueError):
+    """Raised when a client-supplied page cursor cannot be decoded."""
+
+def encode_cursor(value: Any, oid: ObjectId) -> str:
+    """Opaque token for the last row of a page, keyed on (sort value, _id)."""
+    raw = json_util.dumps([value, oid]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[Any, ObjectId]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        value, oid = json_util.loads(base64.urlsafe_b64decode(padded).decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, BSONError):
+        raise InvalidCursorError("Invalid cursor")
+    if not isinstance(oid, ObjectId):
+        raise InvalidCursorError("Invalid cursor")
+    return value, oid
+
+def keyset_filter(field: str, direction: int, value: Any, oid: ObjectId) -> Dict[str, Any]:
+    """Match rows strictly after (value, oid) in a (field, _id) sort.
+
+    MongoDB sorts null/missing before every other value and range operators do
+    not match across types, so nulls need their own branches.
+    """
+    op = "$gt" if direction > 0 else "$lt"
+    if field == "_id":
+        return {"_id": {op: oid}}
+    if value is None:
+        if direction > 0:
+            return {"$or": [{field: {"$ne": None}}, {field: None, "_id": {op: oid}}]}
+        return {field: None, "_id": {op: oid}}
+    after = [{field: {op: value}}, {field: value, "_id": {op: oid}}]
+    if direction < 0:
+        after.append({field: None})
+    return {"$or": after}
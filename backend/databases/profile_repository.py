@@ -1,10 +1,15 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from bson import ObjectId
-from databases.mongo import Mongo, to_object_id
+from databases.mongo import Mongo, MongoPool, to_object_id
+from pymongo import ASCENDING, IndexModel, ReturnDocument
 
 class ProfilesRepository:
-    def __init__(self, uri: str, db_name: str, collection: str = "profiles"):
-        self._mongo = Mongo(uri, db_name, collection)
+    INDEXES = [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ]
+
+    def __init__(self, pool: MongoPool, collection: str = "profiles"):
+        self._mongo = Mongo(pool, collection)
 
     async def connect(self):
         await self._mongo.connect()
@@ -12,8 +17,11 @@ class ProfilesRepository:
     async def close(self):
         await self._mongo.close()
 
-    async def find_all(self) -> List[Dict[str, Any]]:
-        return await self._mongo.find_all()
+    async def ensure_indexes(self) -> List[str]:
+        return await self._mongo.ensure_indexes(self.INDEXES)
+
+    def iter_all(self, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        return self._mongo.iter_find({}, batch_size=batch_size)
 
     async def find_one(self, profile_id: str) -> Optional[Dict[str, Any]]:
         oid: ObjectId = to_object_id(profile_id)
@@ -30,23 +38,18 @@ class ProfilesRepository:
         oid: ObjectId = to_object_id(profile_id)
         return await self._mongo.delete_one(oid)
 
+    async def find_by_usernames(self, usernames: List[str]) -> List[Dict[str, Any]]:
+        return await self._mongo.find_in("username", usernames)
+
     async def find_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        docs = await self._mongo.find_all()
-        for d in docs:
-            if d.get("username") == username:
-                return d
-        return None
+        return await self._mongo.find_one_by({"username": username})
 
     async def update_by_username(self, username: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        doc = await self.find_by_username(username)
-        if not doc:
-            return None
-        _id = doc.get("_id") or doc.get("id")
-        return await self.update_one(str(_id), data)
+        return await self._mongo.find_one_and_update(
+            {"username": username},
+            {"$set": data},
+            return_document=ReturnDocument.AFTER,
+        )
 
     async def delete_by_username(self, username: str) -> bool:
-        doc = await self.find_by_username(username)
-        if not doc:
-            return False
-        _id = doc.get("_id") or doc.get("id")
-        return await self.delete_one(str(_id))
+        return await self._mongo.delete_one_by({"username": username})
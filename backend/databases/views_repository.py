@@ -0,0 +1,55 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from databases.mongo import Mongo, MongoPool
+from pymongo import ASCENDING, IndexModel, UpdateOne
+
+class BookViewsRepository:
+    """Per-book view counts in fixed time buckets, for time-decayed trending.
+
+    One document per (book_id, bucket start); buckets older than the TTL are
+    removed by MongoDB.
+    """
+
+    def __init__(self, pool: MongoPool, collection: str = "book_view_buckets", *, ttl_seconds: int = 7 * 86400):
+        self._mongo = Mongo(pool, collection)
+        self.INDEXES = [
+            IndexModel([("book_id", ASCENDING), ("bucket", ASCENDING)], name="book_id_bucket", unique=True),
+            IndexModel([("bucket", ASCENDING)], name="bucket_ttl", expireAfterSeconds=ttl_seconds),
+        ]
+
+    async def connect(self):
+        await self._mongo.connect()
+
+    async def close(self):
+        await self._mongo.close()
+
+    async def ensure_indexes(self) -> List[str]:
+        return await self._mongo.ensure_indexes(self.INDEXES)
+
+    async def bulk_add(self, deltas: Dict[Tuple[str, datetime], int]) -> None:
+        """Upsert-$inc each (book_id, bucket) count as one unordered bulk_write."""
+        ops = [
+            UpdateOne({"book_id": book_id, "bucket": bucket}, {"$inc": {"n": n}}, upsert=True)
+            for (book_id, bucket), n in deltas.items()
+            if n
+        ]
+        await self._mongo.bulk_write(ops, ordered=False)
+
+    async def delete_by_book(self, book_id: str) -> int:
+        assert self._mongo.collection is not None
+        res = await self._mongo.collection.delete_many({"book_id": book_id})
+        return res.deleted_count
+
+    async def top_scores(
+        self, *, since: datetime, now: datetime, half_life_seconds: float, limit: int
+    ) -> List[Dict[str, Any]]:
+        """``{"id", "score"}`` for the highest-scoring books, where each bucket's
+        views decay by half every ``half_life_seconds``."""
+        age_ms = {"$subtract": [now, "$bucket"]}
+        decay = {"$pow": [0.5, {"$divide": [age_ms, half_life_seconds * 1000]}]}
+        return await self._mongo.aggregate([
+            {"$match": {"bucket": {"$gte": since}}},
+            {"$group": {"_id": "$book_id", "score": {"$sum": {"$multiply": ["$n", decay]}}}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$limit": limit},
+        ])
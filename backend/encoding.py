@@ -0,0 +1,22 @@
+import json
+from typing import Any
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+def dumps(obj: Any) -> bytes:
+    """Encode trusted, already-plain data (dicts/lists of JSON types) to bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """JSON response that skips FastAPI's jsonable_encoder/response_model pass."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
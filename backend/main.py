@@ -1,16 +1,41 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from fastapi.responses import JSONResponse
+from typing import List, Literal, Optional
+import asyncio
+import logging
 import os
+import time
 
-from managers.books_manager import BooksManager
-from models.books_model import BookCreate, BookUpdate, BookOut
+from databases.mongo import MongoPool
+from databases.pagination import InvalidCursorError, decode_cursor
+from security import HashingBusyError, PasswordHasher
+from streaming import stream_documents, stream_events, stream_ndjson, wants_ndjson
+from encoding import FastJSONResponse
+from compression import add_compression
+from metrics import CONTENT_TYPE_LATEST, Metrics
+from conditional import if_none_match, not_modified, weak_etag, with_etag
+from managers.bulk_io import iter_lines
+from managers.cache import Cache, build_cache
 
-from managers.profile_manager import ProfilesManager
-from models.profile_model import ProfileCreate, ProfileUpdate, ProfileOut
+from managers.books_manager import BooksManager, InvalidFieldsError
+from models.books_model import BookBatch, BookCreate, BookDetail, BookUpdate, BookOut, BookFacets, BookPage, BookQuery, BookSummary, Suggestion
 
+from managers.profile_manager import ProfilesManager, UsernameTakenError
+from models.profile_model import ProfileBatch, ProfileCreate, ProfileUpdate, ProfileOut
+
+from managers.comment_hub import CommentHub, HubFullError
 from managers.comment_manager import CommentsManager
-from models.comment_model import CommentCreate, CommentOut
+from models.comment_model import CommentBatch, CommentCreate, CommentOut, CommentPage
+
+from models.batch_model import BatchIds, BatchUsernames, ImportReport
+
+from managers.cascade import CascadeDeleter
+from models.job_model import JobOut
+
+# Application log level (DEBUG, INFO, WARNING, ...); debug records cost nothing below it
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "WARNING").upper()
+logging.basicConfig(level=LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
 
 app = FastAPI(title="Books & Profiles API")
 
@@ -22,45 +47,441 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Bodies of at least COMPRESSION_MIN_SIZE bytes are compressed ("gzip", "br" or "off")
+COMPRESSION = os.environ.get("COMPRESSION", "gzip")
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.environ.get("COMPRESSION_LEVEL", "6"))
+add_compression(
+    app, COMPRESSION, minimum_size=COMPRESSION_MIN_SIZE, level=COMPRESSION_LEVEL, skip_paths=("/comments/stream/",)
+)
+
+# Prometheus metrics at /metrics ("on" | "off"); added last so its timings cover compression
+METRICS = os.environ.get("METRICS", "on")
+METRICS_LOOP_LAG_INTERVAL = float(os.environ.get("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+metrics = Metrics(lag_interval=METRICS_LOOP_LAG_INTERVAL) if METRICS == "on" else None
+if metrics:
+    metrics.instrument(app)
+
+# View and comment counts change without a version bump; book list ETags also roll over
+# every LIST_ETAG_WINDOW seconds so revalidated lists never lag further behind.
+LIST_ETAG_WINDOW = float(os.environ.get("LIST_ETAG_WINDOW", "60"))
+
 MONGO_URI = os.environ.get("MONGO_URI", "mongodb://mongo:27017")
 DB_NAME = os.environ.get("MONGO_DB_NAME", "booksdb")
 BOOKS_COLLECTION = os.environ.get("MONGO_COLLECTION", "books")
 PROFILES_COLLECTION = os.environ.get("MONGO_PROFILES", "profiles")
 COMMENTS_COLLECTION = os.environ.get("MONGO_COMMENTS", "comments")  
+JOBS_COLLECTION = os.environ.get("MONGO_JOBS", "jobs")
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", "0")) or None
+MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS", "")
+
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_EXECUTOR = os.environ.get("PASSWORD_HASH_EXECUTOR", "thread")
+
+BOOKS_PAGE_DEFAULT = int(os.environ.get("BOOKS_PAGE_DEFAULT", "24"))
+BOOKS_PAGE_MAX = int(os.environ.get("BOOKS_PAGE_MAX", "100"))
+
+BOOK_VIEWS_MODE = os.environ.get("BOOK_VIEWS_MODE", "direct")
+BOOK_VIEWS_FLUSH_INTERVAL = float(os.environ.get("BOOK_VIEWS_FLUSH_INTERVAL", "2.0"))
+BOOK_VIEWS_MAX_BUFFERED = int(os.environ.get("BOOK_VIEWS_MAX_BUFFERED", "1000"))
+
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_TTL = float(os.environ.get("CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "10000"))
+
+# "on": concurrent reads of the same book, profile or comment page share one query
+READ_COALESCING = os.environ.get("READ_COALESCING", "on")
+
+# "fast" encodes trusted list data directly; "strict" re-validates through response_model
+BOOKS_OUTPUT_MODE = os.environ.get("BOOKS_OUTPUT_MODE", "fast")
+STREAM_BATCH_SIZE = int(os.environ.get("STREAM_BATCH_SIZE", "500"))
+
+COMMENTS_PAGE_DEFAULT = int(os.environ.get("COMMENTS_PAGE_DEFAULT", "100"))
+COMMENTS_PAGE_MAX = int(os.environ.get("COMMENTS_PAGE_MAX", "500"))
+
+BATCH_MAX_IDS = int(os.environ.get("BATCH_MAX_IDS", "200"))
+
+IMPORT_CHUNK_SIZE = int(os.environ.get("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_LINE_BYTES = int(os.environ.get("IMPORT_MAX_LINE_BYTES", str(1 << 20)))
+
+SUGGEST_LIMIT_MAX = int(os.environ.get("SUGGEST_LIMIT_MAX", "50"))
+BOOKS_FACETS_LIMIT = int(os.environ.get("BOOKS_FACETS_LIMIT", "50"))
+
+RECOMMENDED_LIMIT_MAX = int(os.environ.get("RECOMMENDED_LIMIT_MAX", "100"))
+TRENDING_INTERVAL = float(os.environ.get("TRENDING_INTERVAL", "60"))
+TRENDING_HALF_LIFE_HOURS = float(os.environ.get("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_WINDOW_HOURS = float(os.environ.get("TRENDING_WINDOW_HOURS", "72"))
 
+SIMILAR_INDEX_PATH = os.environ.get("SIMILAR_INDEX_PATH", "similar_index.npz")
+SIMILAR_INDEX_MAX_AGE = float(os.environ.get("SIMILAR_INDEX_MAX_AGE", "86400"))
+SIMILAR_MAX_PENDING = int(os.environ.get("SIMILAR_MAX_PENDING", "2000"))
+SIMILAR_LIMIT_MAX = int(os.environ.get("SIMILAR_LIMIT_MAX", "50"))
+
+# Cascade deletes run in the background, CASCADE_BATCH_SIZE documents per delete
+CASCADE_BATCH_SIZE = int(os.environ.get("CASCADE_BATCH_SIZE", "500"))
+CASCADE_BATCH_PAUSE = float(os.environ.get("CASCADE_BATCH_PAUSE", "0.05"))
+CASCADE_LEASE_SECONDS = float(os.environ.get("CASCADE_LEASE_SECONDS", "60"))
+JOBS_POLL_INTERVAL = float(os.environ.get("JOBS_POLL_INTERVAL", "5"))
+
+# Live comment streams: "local" fans out this process's writes, "changestream"
+# every worker's (needs a replica set). Listeners more than
+# COMMENT_STREAM_MAX_QUEUE events behind are disconnected.
+COMMENT_STREAM_SOURCE = os.environ.get("COMMENT_STREAM_SOURCE", "local")
+COMMENT_STREAM_MAX_QUEUE = int(os.environ.get("COMMENT_STREAM_MAX_QUEUE", "100"))
+COMMENT_STREAM_MAX_SUBSCRIBERS = int(os.environ.get("COMMENT_STREAM_MAX_SUBSCRIBERS", "10000"))
+COMMENT_STREAM_HEARTBEAT = float(os.environ.get("COMMENT_STREAM_HEARTBEAT", "15"))
+
+pool: MongoPool | None = None
+cache: Cache | None = None
+hasher: PasswordHasher | None = None
 books: BooksManager | None = None
 profiles: ProfilesManager | None = None
 comments: CommentsManager | None = None 
+jobs: CascadeDeleter | None = None
 
 @app.on_event("startup")
 async def _startup():
-    global books, profiles, comments
-    books = BooksManager(MONGO_URI, DB_NAME, BOOKS_COLLECTION)
-    profiles = ProfilesManager(MONGO_URI, DB_NAME, PROFILES_COLLECTION)
-    comments = CommentsManager(MONGO_URI, DB_NAME, COMMENTS_COLLECTION)
+    global pool, cache, hasher, books, profiles, comments, jobs
+    pool = MongoPool(
+        MONGO_URI,
+        DB_NAME,
+        max_pool_size=MONGO_MAX_POOL_SIZE,
+        min_pool_size=MONGO_MIN_POOL_SIZE,
+        wait_queue_timeout_ms=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        compressors=MONGO_COMPRESSORS,
+        event_listeners=[metrics.mongo] if metrics else None,
+    )
+    await pool.connect()
+    await pool.warm()
+    cache = build_cache(
+        CACHE_BACKEND,
+        redis_url=CACHE_REDIS_URL,
+        max_entries=CACHE_MAX_ENTRIES,
+        ttl=CACHE_TTL,
+    )
+    hasher = PasswordHasher(
+        workers=PASSWORD_HASH_WORKERS,
+        max_pending=PASSWORD_HASH_MAX_PENDING,
+        use_processes=PASSWORD_HASH_EXECUTOR == "process",
+    )
+    books = BooksManager(
+        pool,
+        BOOKS_COLLECTION,
+        view_mode=BOOK_VIEWS_MODE,
+        view_flush_interval=BOOK_VIEWS_FLUSH_INTERVAL,
+        view_max_buffered=BOOK_VIEWS_MAX_BUFFERED,
+        cache=cache,
+        strict_output=BOOKS_OUTPUT_MODE == "strict",
+        facet_limit=BOOKS_FACETS_LIMIT,
+        trending_interval=TRENDING_INTERVAL,
+        trending_half_life_hours=TRENDING_HALF_LIFE_HOURS,
+        trending_window_hours=TRENDING_WINDOW_HOURS,
+        trending_max_items=RECOMMENDED_LIMIT_MAX,
+        similar_max_pending=SIMILAR_MAX_PENDING,
+        coalesce=READ_COALESCING == "on",
+    )
+    profiles = ProfilesManager(pool, PROFILES_COLLECTION, hasher=hasher, coalesce=READ_COALESCING == "on")
+    comments = CommentsManager(
+        pool,
+        COMMENTS_COLLECTION,
+        books=books,
+        cache=cache,
+        hub=CommentHub(max_queue=COMMENT_STREAM_MAX_QUEUE, max_subscribers=COMMENT_STREAM_MAX_SUBSCRIBERS),
+        watch_changes=COMMENT_STREAM_SOURCE == "changestream",
+        coalesce=READ_COALESCING == "on",
+    )
+    jobs = CascadeDeleter(
+        pool,
+        JOBS_COLLECTION,
+        books=books,
+        profiles=profiles,
+        comments=comments,
+        batch_size=CASCADE_BATCH_SIZE,
+        pause=CASCADE_BATCH_PAUSE,
+        lease_seconds=CASCADE_LEASE_SECONDS,
+        poll_interval=JOBS_POLL_INTERVAL,
+    )
     await books.connect()
     await profiles.connect()
     await comments.connect()
+    await jobs.connect()
+    await books.ensure_indexes()
+    await profiles.ensure_indexes()
+    await comments.ensure_indexes()
+    await jobs.ensure_indexes()
+    await books.build_suggestions()
+    await books.build_similar(SIMILAR_INDEX_PATH or None, max_age=SIMILAR_INDEX_MAX_AGE)
+    # Resumes any cascade delete left unfinished by a previous process.
+    jobs.start()
+    if metrics:
+        metrics.add_stats("pool", pool.stats)
+        metrics.add_stats("pool", lambda: pool.stats()["servers"], label="server")
+        metrics.add_stats("cache", books.cache_stats)
+        metrics.add_stats("password_hash", hasher.stats)
+        metrics.add_stats("comment_stream", comments.live_stats)
+        metrics.add_stats(
+            "coalescing",
+            lambda: {
+                "books": books.coalescing_stats(),
+                "comments": comments.coalescing_stats(),
+                "profiles": profiles.coalescing_stats(),
+            },
+            label="manager",
+        )
+        metrics.start()
 
 @app.on_event("shutdown")
 async def _shutdown():
+    if metrics:
+        await metrics.stop()
+    if jobs:
+        await jobs.close()
     if books:
         await books.close()
     if profiles:
         await profiles.close()
     if comments:
         await comments.close()
+    if hasher:
+        hasher.shutdown()
+    if cache:
+        await cache.close()
+    if pool:
+        await pool.close()
+
+@app.exception_handler(HashingBusyError)
+async def _hashing_busy(request: Request, exc: HashingBusyError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent sign-ins, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 @app.get("/ping")
 async def ping():
     return {"message": "pong"}
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/stats/pool")
+async def pool_stats():
+    assert pool is not None
+    return pool.stats()
+
+@app.get("/stats/suggest")
+async def suggest_stats():
+    assert books is not None
+    return books.suggest_stats()
+
+@app.get("/stats/trending")
+async def trending_stats():
+    assert books is not None
+    return books.trending_stats()
+
+@app.get("/stats/similar")
+async def similar_stats():
+    assert books is not None
+    return books.similar_stats()
+
+@app.get("/stats/comment-stream")
+async def comment_stream_stats():
+    assert comments is not None
+    return comments.live_stats()
+
+@app.get("/stats/coalescing")
+async def coalescing_stats():
+    assert books is not None and profiles is not None and comments is not None
+    return {
+        "books": books.coalescing_stats(),
+        "comments": comments.coalescing_stats(),
+        "profiles": profiles.coalescing_stats(),
+    }
+
+@app.get("/stats/cache")
+async def cache_stats():
+    assert books is not None
+    return books.cache_stats()
+
+def _check_batch(keys: List[str]):
+    if len(keys) > BATCH_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_IDS} ids per batch")
+
 # ----- Books -----
 
-@app.get("/books", response_model=List[BookOut])
-async def list_books():
+async def _books_etag() -> str:
+    assert cache is not None and books is not None
+    return weak_etag(cache.epoch, await books.list_version(), int(time.time() // LIST_ETAG_WINDOW))
+
+async def _comments_etag() -> str:
+    assert cache is not None and comments is not None
+    return weak_etag(cache.epoch, await comments.version())
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    if not fields:
+        return None
+    return [f.strip() for f in fields.split(",") if f.strip()]
+
+@app.get("/books", response_model=BookPage, response_model_exclude_unset=True)
+async def list_books(
+    request: Request,
+    response: Response,
+    q: Optional[str] = None,
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    username: Optional[str] = None,
+    year_min: Optional[int] = Query(None, ge=0),
+    year_max: Optional[int] = Query(None, ge=0),
+    has_cover: Optional[bool] = None,
+    sort: Literal["created", "title", "year", "views"] = "created",
+    order: Literal["asc", "desc"] = "asc",
+    limit: int = Query(BOOKS_PAGE_DEFAULT, ge=1, le=BOOKS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+):
+    """One page of book summaries, or with ?stream=true / Accept: application/x-ndjson
+    every matching book streamed as a JSON array or NDJSON.
+
+    ``fields`` is a comma-separated subset of the summary fields; review text
+    is only served by GET /books/{book_id}. Pages carry an ETag; a matching
+    If-None-Match gets a 304 without touching MongoDB.
+    """
+    assert books is not None
+    streaming = stream or wants_ndjson(request)
+    if not streaming:
+        etag = await _books_etag()
+        if if_none_match(request, etag):
+            return not_modified(etag)
+    query = BookQuery(
+        q=q, author=author, genre=genre, username=username,
+        year_min=year_min, year_max=year_max, has_cover=has_cover,
+        sort=sort, order=order, limit=limit, cursor=cursor, fields=_parse_fields(fields),
+    )
+    try:
+        if streaming:
+            # Fail with 400/422 before the response starts streaming.
+            if cursor:
+                decode_cursor(cursor)
+            books.check_fields(query.fields)
+            return stream_documents(request, books.iter_books(query, batch_size=STREAM_BATCH_SIZE), batch_size=STREAM_BATCH_SIZE)
+        if BOOKS_OUTPUT_MODE == "strict":
+            return with_etag(await books.query_books(query), response, etag)
+        return with_etag(FastJSONResponse(await books.query_books_raw(query)), response, etag)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+@app.get("/books/search", response_model=BookPage, response_model_exclude_unset=True)
+async def search_books(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    username: Optional[str] = None,
+    year_min: Optional[int] = Query(None, ge=0),
+    year_max: Optional[int] = Query(None, ge=0),
+    has_cover: Optional[bool] = None,
+    limit: int = Query(BOOKS_PAGE_DEFAULT, ge=1, le=BOOKS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    """Book summaries matching ``q`` through the text index, best match first.
+    Filters compare case-insensitively, as on /books."""
+    assert books is not None
+    etag = await _books_etag()
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    query = BookQuery(
+        q=q, author=author, genre=genre, username=username,
+        year_min=year_min, year_max=year_max, has_cover=has_cover,
+        limit=limit, cursor=cursor, fields=_parse_fields(fields),
+    )
+    try:
+        if BOOKS_OUTPUT_MODE == "strict":
+            return with_etag(await books.search_books(query), response, etag)
+        return with_etag(FastJSONResponse(await books.search_books_raw(query)), response, etag)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+@app.get("/books/facets", response_model=BookFacets)
+async def book_facets(
+    request: Request,
+    response: Response,
+    q: Optional[str] = None,
+    author: Optional[str] = None,
+    genre: Optional[str] = None,
+    username: Optional[str] = None,
+    year_min: Optional[int] = Query(None, ge=0),
+    year_max: Optional[int] = Query(None, ge=0),
+    has_cover: Optional[bool] = None,
+):
+    """Filter sidebar counts for the books matching the same filters as GET /books."""
+    assert books is not None and cache is not None
+    etag = weak_etag(cache.epoch, await books.facets_version())
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    query = BookQuery(
+        q=q, author=author, genre=genre, username=username,
+        year_min=year_min, year_max=year_max, has_cover=has_cover,
+    )
+    if BOOKS_OUTPUT_MODE == "strict":
+        return with_etag(await books.facets(query), response, etag)
+    return with_etag(FastJSONResponse(await books.facets_raw(query)), response, etag)
+
+@app.get("/books/suggest", response_model=List[Suggestion])
+async def suggest_books(
+    field: Literal["title", "author", "genre", "username"],
+    prefix: str = "",
+    limit: int = Query(10, ge=1, le=SUGGEST_LIMIT_MAX),
+):
+    """Distinct values of ``field`` starting with ``prefix`` (case-insensitive),
+    served from memory without a database round trip."""
+    assert books is not None
+    return FastJSONResponse(books.suggest(field, prefix, limit))
+
+@app.get("/books/recommended", response_model=List[BookSummary])
+async def recommended_books(
+    mode: Literal["top", "trending"] = "top",
+    limit: int = Query(10, ge=1, le=RECOMMENDED_LIMIT_MAX),
+):
+    """``top``: most viewed of all time. ``trending``: views decayed by age,
+    recomputed in the background every TRENDING_INTERVAL seconds."""
     assert books is not None
-    return await books.list_books()
+    return FastJSONResponse(await books.recommended(mode, limit))
+
+@app.post("/books/batch", response_model=BookBatch)
+async def get_books_batch(data: BatchIds):
+    """Books by id in request order, plus the ids that were not found. Not counted as views."""
+    assert books is not None
+    _check_batch(data.ids)
+    return await books.get_books(data.ids)
+
+@app.post("/books/import", response_model=ImportReport)
+async def import_books(request: Request, chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=10_000)):
+    """Bulk-insert books from an NDJSON request body (one BookCreate per line),
+    validated and written chunk by chunk as the body streams in."""
+    assert books is not None
+    lines = iter_lines(request.stream(), max_line_bytes=IMPORT_MAX_LINE_BYTES)
+    return await books.import_books(lines, chunk_size=chunk_size)
+
+@app.get("/books/export")
+async def export_books():
+    """Every book as NDJSON, in a shape POST /books/import accepts."""
+    assert books is not None
+    return stream_ndjson(books.export_books(batch_size=STREAM_BATCH_SIZE), batch_size=STREAM_BATCH_SIZE)
 
 @app.post("/books", response_model=BookOut, status_code=201)
 async def create_book(data: BookCreate):
@@ -80,10 +501,20 @@ async def update_book(book_id: str, data: BookUpdate):
         raise HTTPException(status_code=404, detail="Book not found")
     return updated
 
-@app.get("/books/by/{username}", response_model=List[BookOut])
-async def list_books_by_user(username: str):
+@app.get("/books/by/{username}", response_model=List[BookSummary], response_model_exclude_unset=True)
+async def list_books_by_user(request: Request, response: Response, username: str, fields: Optional[str] = None):
     assert books is not None
-    return await books.list_books_by_user(username)
+    etag = await _books_etag()
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        if BOOKS_OUTPUT_MODE == "strict":
+            return with_etag(await books.list_books_by_user(username, _parse_fields(fields)), response, etag)
+        return with_etag(
+            FastJSONResponse(await books.list_books_by_user_raw(username, _parse_fields(fields))), response, etag
+        )
+    except InvalidFieldsError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
 @app.get("/books/{book_id}", response_model=BookOut)
 async def get_book(book_id: str):
@@ -93,12 +524,38 @@ async def get_book(book_id: str):
         raise HTTPException(status_code=404, detail="Book not found")
     return updated
 
+@app.get("/books/{book_id}/similar", response_model=List[BookSummary])
+async def similar_books(book_id: str, limit: int = Query(10, ge=1, le=SIMILAR_LIMIT_MAX)):
+    """Books with the most similar title, author, genre and review text (TF-IDF
+    cosine), best first, each with its ``score``. Not counted as a view."""
+    assert books is not None
+    items = await books.similar_books(book_id, limit)
+    if items is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return FastJSONResponse(items)
+
+@app.get("/books/{book_id}/detail", response_model=BookDetail)
+async def get_book_detail(
+    book_id: str,
+    comments_limit: int = Query(COMMENTS_PAGE_DEFAULT, ge=1, le=COMMENTS_PAGE_MAX),
+):
+    """The book (counting a view, like GET /books/{book_id}) plus its newest
+    comments, fetched concurrently."""
+    assert books is not None and comments is not None
+    book, page = await asyncio.gather(
+        books.increment_and_get(book_id),
+        comments.list_comments_by_book(book_id, limit=comments_limit),
+    )
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return BookDetail(book=book, comments=page, comment_count=book.comment_count)
+
 # ----- Profiles -----
 
 @app.get("/profiles", response_model=List[ProfileOut])
-async def list_profiles():
+async def list_profiles(request: Request):
     assert profiles is not None
-    return await profiles.list_profiles()
+    return stream_documents(request, profiles.iter_profiles(batch_size=STREAM_BATCH_SIZE), batch_size=STREAM_BATCH_SIZE)
 
 @app.get("/profiles/{username}", response_model=ProfileOut)
 async def get_profile(username: str):
@@ -108,6 +565,12 @@ async def get_profile(username: str):
         raise HTTPException(status_code=404, detail="Profile not found")
     return found
 
+@app.post("/profiles/batch", response_model=ProfileBatch)
+async def get_profiles_batch(data: BatchUsernames):
+    assert profiles is not None
+    _check_batch(data.usernames)
+    return await profiles.get_profiles(data.usernames)
+
 @app.post("/profiles", response_model=ProfileOut, status_code=201)
 async def create_profile(data: ProfileCreate):
     assert profiles is not None
@@ -115,9 +578,10 @@ async def create_profile(data: ProfileCreate):
         raise HTTPException(status_code=422, detail="Invalid username")
     if len(data.password) < 8:
         raise HTTPException(status_code=422, detail="Password too short")
-    if await profiles.get_profile(data.username):
+    try:
+        return await profiles.create_profile(data)
+    except UsernameTakenError:
         raise HTTPException(status_code=409, detail="Username already taken")
-    return await profiles.create_profile(data)
 
 @app.post("/profiles/login", response_model=ProfileOut)
 async def profiles_login(body: dict):
@@ -137,25 +601,60 @@ async def update_profile(username: str, data: ProfileUpdate):
     payload = data.model_dump(exclude_unset=True, exclude_none=True)
     if not payload:
         raise HTTPException(status_code=400, detail="No fields to update")
-    updated = await profiles.update_profile(username, data)
+    try:
+        updated = await profiles.update_profile(username, data)
+    except UsernameTakenError:
+        raise HTTPException(status_code=409, detail="Username already taken")
     if not updated:
         raise HTTPException(status_code=404, detail="Profile not found")
     return updated
 
-@app.delete("/profiles/{username}", status_code=204)
-async def delete_profile(username: str):
-    assert profiles is not None
-    ok = await profiles.delete_profile(username)
-    if not ok:
+@app.delete("/profiles/{username}", status_code=202, response_model=JobOut)
+async def delete_profile(username: str, response: Response):
+    """Delete the profile, then its books and comments in a background job (see GET /jobs/{id})."""
+    assert jobs is not None
+    job = await jobs.delete_profile(username)
+    if job is None:
         raise HTTPException(status_code=404, detail="Profile not found")
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
 
 # ----- Comments -----
 
+@app.post("/comments/batch", response_model=CommentBatch)
+async def get_comments_batch(data: BatchIds):
+    assert comments is not None
+    _check_batch(data.ids)
+    return await comments.get_comments(data.ids)
+
+@app.post("/comments/import", response_model=ImportReport)
+async def import_comments(request: Request, chunk_size: int = Query(IMPORT_CHUNK_SIZE, ge=1, le=10_000)):
+    assert comments is not None
+    lines = iter_lines(request.stream(), max_line_bytes=IMPORT_MAX_LINE_BYTES)
+    return await comments.import_comments(lines, chunk_size=chunk_size)
+
+@app.get("/comments/export")
+async def export_comments():
+    assert comments is not None
+    return stream_ndjson(comments.export_comments(batch_size=STREAM_BATCH_SIZE), batch_size=STREAM_BATCH_SIZE)
+
 @app.post("/comments", response_model=CommentOut, status_code=201)
 async def create_comment(data: CommentCreate):
     assert comments is not None
     return await comments.create_comment(data)
 
+@app.get("/comments/stream/{book_id}")
+async def stream_comments(book_id: str):
+    """Server-sent events for one book's thread: ``created`` (a CommentOut) and
+    ``deleted`` ({"id", "book_id"}). An ``evicted`` event ends a stream that fell
+    too far behind; the client reconnects and should refetch the first page."""
+    assert comments is not None
+    try:
+        sub = comments.subscribe(book_id)
+    except HubFullError:
+        raise HTTPException(status_code=503, detail="Too many live streams", headers={"Retry-After": "30"})
+    return stream_events(sub, comments.unsubscribe, heartbeat=COMMENT_STREAM_HEARTBEAT)
+
 @app.get("/comments/{comment_id}", response_model=CommentOut)
 async def get_comment(comment_id: str):
     assert comments is not None
@@ -171,20 +670,71 @@ async def delete_comment(comment_id: str):
     if not ok:
         raise HTTPException(status_code=404, detail="Comment not found")
 
-@app.get("/comments/by-book/{book_id}", response_model=List[CommentOut])
-async def list_comments_by_book(book_id: str, limit: int = 100, skip: int = 0):
+@app.get("/comments/by-book/{book_id}", response_model=CommentPage)
+async def list_comments_by_book(
+    request: Request,
+    response: Response,
+    book_id: str,
+    limit: int = Query(COMMENTS_PAGE_DEFAULT, ge=1, le=COMMENTS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "desc",
+):
+    """One page of a book's comments, newest first by default, with an ETag."""
     assert comments is not None
-    return await comments.list_comments_by_book(book_id, limit=limit, skip=skip)
+    etag = await _comments_etag()
+    if if_none_match(request, etag):
+        return not_modified(etag)
+    try:
+        page = await comments.list_comments_by_book(book_id, limit=limit, cursor=cursor, newest_first=order == "desc")
+        return with_etag(page, response, etag)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@app.get("/comments/by-user/{username}", response_model=List[CommentOut])
-async def list_comments_by_user(username: str, limit: int = 100, skip: int = 0):
+@app.get("/comments/by-user/{username}", response_model=CommentPage)
+async def list_comments_by_user(
+    request: Request,
+    response: Response,
+    username: str,
+    limit: int = Query(COMMENTS_PAGE_DEFAULT, ge=1, le=COMMENTS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    order: Literal["asc", "desc"] = "desc",
+    stream: bool = False,
+):
+    """One page of a user's comments, or with ?stream=true / Accept: application/x-ndjson
+    all of them from the cursor on, streamed."""
     assert comments is not None
-    return await comments.list_comments_by_user(username, limit=limit, skip=skip)
+    try:
+        if stream or wants_ndjson(request):
+            if cursor:
+                decode_cursor(cursor)  # fail with 400 before the response starts
+            docs = comments.iter_comments_by_user(
+                username, cursor=cursor, newest_first=order == "desc", batch_size=STREAM_BATCH_SIZE
+            )
+            return stream_documents(request, docs, batch_size=STREAM_BATCH_SIZE)
+        etag = await _comments_etag()
+        if if_none_match(request, etag):
+            return not_modified(etag)
+        page = await comments.list_comments_by_user(username, limit=limit, cursor=cursor, newest_first=order == "desc")
+        return with_etag(page, response, etag)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-@app.delete("/books/{book_id}", status_code=204)
-async def delete_book(book_id: str):
-    assert books is not None and comments is not None
-    ok = await books.delete_book(book_id)
-    if not ok:
+@app.delete("/books/{book_id}", status_code=202, response_model=JobOut)
+async def delete_book(book_id: str, response: Response):
+    """Delete the book, then its comments in a background job (see GET /jobs/{id})."""
+    assert jobs is not None
+    job = await jobs.delete_book(book_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Book not found")
-    await comments.delete_comments_by_book(book_id)
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job
+
+# ----- Jobs -----
+
+@app.get("/jobs/{job_id}", response_model=JobOut)
+async def get_job(job_id: str):
+    assert jobs is not None
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,7 +1,64 @@
 # ===== managers/books_manager.py =====
-from typing import List, Optional, Dict, Any
-from models.books_model import BookCreate, BookUpdate, BookOut
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from typing import AsyncIterator, Iterable, List, Optional, Dict, Any, Sequence, Tuple
+from bson import ObjectId
+from models.books_model import BookBatch, BookCreate, BookFacets, BookUpdate, BookOut, BookPage, BookQuery, BookSummary
+from databases.mongo import MongoPool
 from databases.books_repository import BooksRepository
+from databases.pagination import InvalidCursorError, decode_cursor, encode_cursor
+from managers.bulk_io import BulkImporter
+from managers.cache import Cache, NullCache
+from databases.views_repository import BookViewsRepository
+from managers.similar_index import TEXT_FIELDS, SimilarIndex, build_merged
+from managers.suggest_index import BookSuggestions
+from managers.trending import TrendingTracker
+from managers.single_flight import SingleFlight
+from managers.view_counter import ViewCounter
+
+log = logging.getLogger(__name__)
+
+SORT_FIELDS = {"created": "_id", "title": "title", "year": "year", "views": "views"}
+
+# Cache layout: per-user lists are invalidated by key; single books embed their
+# own version (bumped on every write to the book) and list pages LIST_VERSION.
+# A read stores under the version it saw before querying, so a copy fetched
+# before a write lands where no later read looks.
+# Facet results have their own version, bumped only when a faceted field changes.
+LIST_VERSION = "books:list"
+FACETS_VERSION = "books:facets"
+FACET_FIELDS = ("author", "genre", "username", "year", "image")
+FILTER_FIELDS = {"q", "author", "genre", "username", "year_min", "year_max", "has_cover"}
+# Filters that match by prefix; username is an identity and matches exactly.
+PREFIX_FILTERS = ("author", "genre")
+
+def _book_version(book_id: str) -> str:
+    return f"books:v:{book_id}"
+
+def _book_key(book_id: str, version: int) -> str:
+    return f"books:one:{book_id}:{version}"
+
+def _user_key(username: str) -> str:
+    return f"books:user:{username}"
+
+def _page_key(version: int, query: BookQuery) -> str:
+    digest = hashlib.sha1(query.model_dump_json().encode("utf-8")).hexdigest()
+    return f"books:page:{version}:{digest}"
+
+def _facets_key(version: int, query: BookQuery) -> str:
+    digest = hashlib.sha1(query.model_dump_json(include=FILTER_FIELDS).encode("utf-8")).hexdigest()
+    return f"books:facets:{version}:{digest}"
+
+def _from_cache(d: Dict[str, Any]) -> BookOut:
+    # Cached entries were produced by BookOut.model_dump(), so skip re-validation.
+    return BookOut.model_construct(**d)
+
+def _summary_from_cache(d: Dict[str, Any]) -> BookSummary:
+    return BookSummary.model_construct(**d)
 
 def _normalize_id(doc: Dict[str, Any]) -> Dict[str, Any]:
     if not doc:
@@ -32,52 +89,621 @@ def _to_out(doc: Dict[str, Any]) -> BookOut:
     d = _coerce_types(d)
     return BookOut.model_validate(d)
 
+def _to_summary(doc: Dict[str, Any]) -> BookSummary:
+    d = _normalize_id(doc)
+    d = _coerce_types(d)
+    return BookSummary.model_validate(d)
+
+# List views never read the review body off the wire; see BookSummary.
+SUMMARY_FIELDS: Tuple[str, ...] = tuple(BookSummary.model_fields)
+
+class InvalidFieldsError(ValueError):
+    """Raised when ?fields= names something list views do not serve."""
+
+def _select_fields(fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    if not fields:
+        return SUMMARY_FIELDS
+    unknown = sorted(set(fields) - set(SUMMARY_FIELDS))
+    if unknown:
+        raise InvalidFieldsError(f"Unknown or non-list fields: {', '.join(unknown)}")
+    return tuple(f for f in SUMMARY_FIELDS if f == "id" or f in fields)
+
+def _projection(fields: Sequence[str], sort_field: str = "_id") -> Dict[str, int]:
+    """Fetch ``fields`` plus the sort key the page cursor is built from; the
+    extra key is cut again when the page is dumped. Never empty: MongoDB reads
+    ``{}`` as "every field", review included."""
+    projection = {f: 1 for f in fields if f != "id"}
+    if sort_field != "_id":
+        projection[sort_field] = 1
+    return projection or {"_id": 1}
+
+def _to_dict(doc: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+    """Trusted fast path: the shape of BookSummary.model_dump() without validating.
+
+    Used for data we wrote ourselves through BookCreate/BookUpdate; only the
+    coercions _coerce_types applies are repeated here.
+    """
+    if "id" not in doc:
+        raise KeyError("Document missing identifier ('id').")
+    out = {f: doc.get(f) for f in fields}
+    out["id"] = str(doc["id"])
+    year = out.get("year")
+    if isinstance(year, str) and year.isdigit():
+        out["year"] = int(year)
+    username = out.get("username")
+    if username is not None and not isinstance(username, str):
+        out["username"] = str(username)
+    for counter in ("views", "comment_count"):
+        if counter in out and out[counter] is None:
+            out[counter] = 0
+    return out
+
+def _facets_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    def counts(name: str) -> List[Dict[str, Any]]:
+        return [{"value": str(r["_id"]), "count": r["n"]} for r in row.get(name, [])]
+    years = (row.get("year") or [{}])[0]
+    cover = {r["_id"]: r["n"] for r in row.get("cover", [])}
+    total = row.get("total") or [{}]
+    return {
+        "total": total[0].get("n", 0),
+        "authors": counts("author"),
+        "genres": counts("genre"),
+        "usernames": counts("username"),
+        "year_min": years.get("min"),
+        "year_max": years.get("max"),
+        "with_cover": cover.get(True, 0),
+        "without_cover": cover.get(False, 0),
+    }
+
+BOOK_FIELDS: Tuple[str, ...] = tuple(BookOut.model_fields)
+
+def _import_doc(book: BookCreate, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Document for one imported row. Keeps an exported ``id`` and ``views``;
+    comment counts are rebuilt as comments are imported."""
+    doc = book.model_dump()
+    views = raw.get("views")
+    doc["views"] = views if isinstance(views, int) and views >= 0 else 0
+    doc["comment_count"] = 0
+    if raw.get("id") is not None:
+        if not ObjectId.is_valid(str(raw["id"])):
+            raise ValueError("id: not a valid ObjectId")
+        doc["_id"] = ObjectId(str(raw["id"]))
+    return doc
+
+def _build_filter(query: BookQuery, *, with_q: bool = True, collated: bool = True) -> Dict[str, Any]:
+    """Mongo filter for the list endpoint's search and filter parameters.
+
+    Author and genre match by prefix ("Tolk" finds "Tolkien"), username
+    exactly. ``with_q=False`` leaves out the substring match on ``q``, for
+    callers that resolve it through the text index instead. ``collated=False``
+    is for queries that cannot run under BOOKS_COLLATION ($text): the three
+    fields then match as anchored case-insensitive regexes, so they compare
+    the same way as on the collated list.
+    """
+    clauses: List[Dict[str, Any]] = []
+    if query.q and with_q:
+        pattern = {"$regex": re.escape(query.q.strip()), "$options": "i"}
+        clauses.append({"$or": [{f: pattern} for f in ("title", "author", "review", "username")]})
+    for field in ("author", "genre", "username"):
+        value = (getattr(query, field) or "").strip()
+        if not value:
+            continue
+        prefix = field in PREFIX_FILTERS
+        if collated and prefix:
+            # U+FFFF sorts after every character, so this range is the prefix on the collated index.
+            clauses.append({field: {"$gte": value, "$lt": value + "\uffff"}})
+        elif collated:
+            clauses.append({field: value})
+        else:
+            pattern = f"^{re.escape(value)}" if prefix else f"^{re.escape(value)}$"
+            clauses.append({field: {"$regex": pattern, "$options": "i"}})
+    year: Dict[str, int] = {}
+    if query.year_min is not None:
+        year["$gte"] = query.year_min
+    if query.year_max is not None:
+        year["$lte"] = query.year_max
+    if year:
+        clauses.append({"year": year})
+    if query.has_cover is True:
+        clauses.append({"image": {"$nin": [None, ""]}})
+    elif query.has_cover is False:
+        clauses.append({"image": {"$in": [None, ""]}})
+    if not clauses:
+        return {}
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
 class BooksManager:
-    def __init__(self, uri: str, db_name: str, collection: str):
-        self._repo = BooksRepository(uri, db_name, collection)
+    def __init__(
+        self,
+        pool: MongoPool,
+        collection: str,
+        *,
+        view_mode: str = "direct",
+        view_flush_interval: float = 2.0,
+        view_max_buffered: int = 1000,
+        cache: Optional[Cache] = None,
+        strict_output: bool = False,
+        facet_limit: int = 50,
+        views_collection: str = "book_view_buckets",
+        trending_interval: float = 60.0,
+        trending_half_life_hours: float = 24.0,
+        trending_window_hours: float = 72.0,
+        trending_max_items: int = 100,
+        similar_max_pending: int = 2000,
+        coalesce: bool = True,
+    ):
+        self._repo = BooksRepository(pool, collection)
+        self._cache = cache or NullCache()
+        # Concurrent cache misses for one book share a query.
+        self._flight = SingleFlight(enabled=coalesce)
+        self._strict = strict_output
+        self._facet_limit = facet_limit
+        self._suggest = BookSuggestions()
+        self._similar_opts = {"max_pending": similar_max_pending}
+        self._similar = SimilarIndex(**self._similar_opts)
+        self._similar_path: Optional[str] = None
+        self._similar_merge: Optional[asyncio.Task] = None
+        self._similar_lock = asyncio.Lock()
+        self._view_buckets = BookViewsRepository(
+            pool, views_collection, ttl_seconds=int(trending_window_hours * 3600) + 86400
+        )
+        self._trending = TrendingTracker(
+            self._view_buckets,
+            self._summaries_by_id,
+            interval=trending_interval,
+            half_life_hours=trending_half_life_hours,
+            window_hours=trending_window_hours,
+            max_items=trending_max_items,
+        )
+        self._views: Optional[ViewCounter] = None
+        if view_mode == "buffered":
+            self._views = ViewCounter(
+                self._flush_views,
+                flushed=self._views_flushed,
+                interval=view_flush_interval,
+                max_buffered=view_max_buffered,
+            )
 
     async def connect(self):
         await self._repo.connect()
+        await self._view_buckets.connect()
+        if self._views:
+            self._views.start()
+        self._trending.start()
 
     async def close(self):
+        if self._similar_merge is not None:
+            await asyncio.wait([self._similar_merge])
+        if self._similar_path and self._similar.dirty:
+            await asyncio.to_thread(self._similar.save, self._similar_path)
+        await self._trending.stop()
+        if self._views:
+            await self._views.stop()
+        await self._view_buckets.close()
         await self._repo.close()
 
-    async def list_books(self) -> List[BookOut]:
-        docs = await self._repo.find_all()
-        out: List[BookOut] = []
+    async def ensure_indexes(self) -> List[str]:
+        return await self._repo.ensure_indexes() + await self._view_buckets.ensure_indexes()
+
+    async def list_version(self) -> int:
+        """Bumped by every write that can change a list, search or per-user page."""
+        return await self._cache.version(LIST_VERSION)
+
+    async def facets_version(self) -> int:
+        return await self._cache.version(FACETS_VERSION)
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return self._flight.stats()
+
+    def _forget(self, book_ids: Iterable[str]):
+        ids = set(book_ids)
+        self._flight.forget(lambda key: key in ids)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+    async def build_suggestions(self):
+        """Load the autocomplete index from one $group per field."""
+        for field in BookSuggestions.FIELDS:
+            rows = await self._repo.value_counts(field)
+            self._suggest.load(field, ((r.get("value"), r["n"]) for r in rows))
+        self._suggest.ready = True
+
+    async def build_similar(self, path: Optional[str] = None, *, max_age: float = 86400, batch_size: int = 1000):
+        """Load the similar-books index from the snapshot at ``path`` if it is
+        younger than ``max_age`` seconds, else rebuild it from the collection.
+
+        A loaded snapshot is reconciled by id (new books indexed, deleted ones
+        dropped); edits made by other processes since it was written are picked
+        up only by the next rebuild. The index is saved back to ``path`` when it
+        changed, and again on close.
+        """
+        index: Optional[SimilarIndex] = None
+        if path and os.path.exists(path) and time.time() - os.path.getmtime(path) < max_age:
+            try:
+                index = await asyncio.to_thread(SimilarIndex.load, path, **self._similar_opts)
+            except (OSError, ValueError, KeyError) as exc:
+                log.warning("rebuilding similar index, snapshot %s unusable: %s", path, exc)
+        if index is not None:
+            current = {d["id"] async for d in self._repo.iter_all(projection={"_id": 1}, batch_size=10_000)}
+            known = index.ids()
+            index.remove_ids(known - current)
+            new = list(current - known)
+            for i in range(0, len(new), batch_size):
+                index.add_many(await self._repo.find_many_by_id(new[i : i + batch_size], _projection(TEXT_FIELDS)))
+        else:
+            index = SimilarIndex(**self._similar_opts)
+            batch: List[Dict[str, Any]] = []
+            async for doc in self._repo.iter_all(projection=_projection(TEXT_FIELDS), batch_size=batch_size):
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    await asyncio.to_thread(index.add_many, batch)
+                    batch = []
+            await asyncio.to_thread(index.add_many, batch)
+        await asyncio.to_thread(index.merge)
+        if path and index.dirty:
+            await asyncio.to_thread(index.save, path)
+        index.ready = True
+        self._similar = index
+        self._similar_path = path
+
+    async def _merge_similar(self):
+        """Fold the similar index's pending rows in, building the new matrix in
+        a thread; writes keep landing in ``pending`` meanwhile."""
+        async with self._similar_lock:
+            index = self._similar
+            plan = index.merge_plan()
+            if plan is not None:
+                index.install_merged(plan, await asyncio.to_thread(build_merged, plan))
+
+    def _schedule_similar_merge(self):
+        if self._similar.needs_merge() and self._similar_merge is None:
+            self._similar_merge = asyncio.create_task(self._merge_similar())
+            self._similar_merge.add_done_callback(self._similar_merged)
+
+    def _similar_merged(self, task: asyncio.Task):
+        # Nothing awaits the task: report a failure here, and let the next write retry.
+        self._similar_merge = None
+        if not task.cancelled() and task.exception() is not None:
+            log.error("similar index merge failed; retrying on the next write", exc_info=task.exception())
+
+    def similar_stats(self) -> Dict[str, Any]:
+        return self._similar.stats()
+
+    def suggest(self, field: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._suggest.suggest(field, prefix, limit)
+
+    def suggest_stats(self) -> Dict[str, Any]:
+        return self._suggest.stats()
+
+    async def _changed(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+        """Invalidate every cache entry that could hold the old or new state."""
+        self._suggest.apply(before, after)
+        self._similar.apply(before, after)
+        self._schedule_similar_merge()
+        if before and not after:
+            self._trending.forget(str(before["id"]))
+        self._forget(str(doc["id"]) for doc in (before, after) if doc)
+        await self._drop_books(str(doc["id"]) for doc in (before, after) if doc)
+        await self._cache.delete(
+            *{_user_key(str(doc["username"])) for doc in (before, after) if doc and doc.get("username")}
+        )
+        await self._cache.bump(LIST_VERSION)
+        if any((before or {}).get(f) != (after or {}).get(f) for f in FACET_FIELDS):
+            await self._cache.bump(FACETS_VERSION)
+
+    async def _flush_views(self, deltas: Dict[str, int]) -> Dict[str, int]:
+        failed = await self._repo.bulk_inc_views(deltas)
+        return {book_id: deltas[book_id] for book_id in failed}
+
+    async def _views_flushed(self, deltas: Dict[str, int]):
+        self._forget(deltas)
+        # Cached books hold persisted views only; drop them so the next read
+        # picks up the flushed counts instead of losing the delta.
+        await self._drop_books(deltas)
+
+    async def _drop_books(self, book_ids: Iterable[str]):
+        """Bump each book's version, orphaning its cached copy and any copy a
+        read already in flight is about to store."""
+        stale = []
+        for book_id in set(book_ids):
+            version = await self._cache.bump(_book_version(book_id))
+            stale.append(_book_key(book_id, version - 1))
+        await self._cache.delete(*stale)
+
+    def _dump(self, doc: Dict[str, Any], fields: Sequence[str]) -> Dict[str, Any]:
+        if self._strict:
+            return _to_summary(doc).model_dump(include=set(fields))
+        return _to_dict(doc, fields)
+
+    def _dump_all(self, docs: List[Dict[str, Any]], fields: Sequence[str]) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
         for d in docs:
             try:
-                out.append(_to_out(d))
+                out.append(self._dump(d, fields))
             except KeyError:
                 continue
         return out
 
-    async def list_books_by_user(self, username: str) -> List[BookOut]:
-        docs = await self._repo.find_by_user(username)
-        out: List[BookOut] = []
-        for d in docs:
+    def check_fields(self, fields: Optional[Sequence[str]]):
+        """Raise InvalidFieldsError up front, e.g. before a response starts streaming."""
+        _select_fields(fields)
+
+    async def _load_book(self, book_id: str, version: int) -> Optional[BookOut]:
+        doc = await self._repo.find_one(book_id)
+        if not doc:
+            return None
+        out = _to_out(doc)
+        await self._cache.set(_book_key(book_id, version), out.model_dump())
+        return out
+
+    async def _cached_book(self, book_id: str) -> Optional[BookOut]:
+        version = await self._cache.version(_book_version(book_id))
+        hit = await self._cache.get(_book_key(book_id, version))
+        if hit is not None:
+            return _from_cache(hit)
+        return await self._flight.do(book_id, lambda: self._load_book(book_id, version))
+
+    async def query_books_raw(self, query: BookQuery) -> Dict[str, Any]:
+        """Keyset-paginated, filtered and sorted slice of the catalogue as plain
+        ``{"items": [...], "next_cursor": ...}`` data, ready to encode."""
+        after = decode_cursor(query.cursor) if query.cursor else None
+        fields = _select_fields(query.fields)
+        key = _page_key(await self._cache.version(LIST_VERSION), query)
+        hit = await self._cache.get(key)
+        if hit is not None:
+            return hit
+        if query.sort == "relevance":
+            result = await self._search_page(query, after, fields)
+            await self._cache.set(key, result)
+            return result
+        field = SORT_FIELDS[query.sort]
+        direction = 1 if query.order == "asc" else -1
+        docs = await self._repo.find_page(
+            _build_filter(query),
+            sort_field=field,
+            direction=direction,
+            limit=query.limit + 1,
+            after=after,
+            projection=_projection(fields, field),
+        )
+        page = docs[: query.limit]
+        next_cursor = None
+        if len(docs) > query.limit and page:
+            last = page[-1]
+            next_cursor = encode_cursor(None if field == "_id" else last.get(field), ObjectId(last["id"]))
+        result = {"items": self._dump_all(page, fields), "next_cursor": next_cursor}
+        await self._cache.set(key, result)
+        return result
+
+    async def _search_page(
+        self, query: BookQuery, after: Optional[Tuple[Any, ObjectId]], fields: Sequence[str]
+    ) -> Dict[str, Any]:
+        if not query.q or not query.q.strip():
+            return {"items": [], "next_cursor": None}
+        if after is not None and not isinstance(after[0], (int, float)):
+            raise InvalidCursorError("Invalid cursor")
+        docs = await self._repo.search_page(
+            query.q.strip(),
+            _build_filter(query, with_q=False, collated=False),
+            limit=query.limit + 1,
+            after=after,
+            projection=_projection(fields),
+        )
+        page = docs[: query.limit]
+        next_cursor = None
+        if len(docs) > query.limit and page:
+            last = page[-1]
+            next_cursor = encode_cursor(last["score"], ObjectId(last["id"]))
+        return {"items": self._dump_all(page, fields), "next_cursor": next_cursor}
+
+    async def search_books_raw(self, query: BookQuery) -> Dict[str, Any]:
+        """Relevance-ranked text search over title, author, username and review."""
+        return await self.query_books_raw(query.model_copy(update={"sort": "relevance", "order": "desc"}))
+
+    async def search_books(self, query: BookQuery) -> BookPage:
+        return await self.query_books(query.model_copy(update={"sort": "relevance", "order": "desc"}))
+
+    async def facets_raw(self, query: BookQuery) -> Dict[str, Any]:
+        """Author/genre/user counts, year range and cover split for the books
+        matching the query's filters (sort and paging are ignored)."""
+        key = _facets_key(await self._cache.version(FACETS_VERSION), query)
+        hit = await self._cache.get(key)
+        if hit is not None:
+            return hit
+        row = await self._repo.facets(_build_filter(query), limit=self._facet_limit)
+        result = _facets_from_row(row)
+        await self._cache.set(key, result)
+        return result
+
+    async def facets(self, query: BookQuery) -> BookFacets:
+        return BookFacets.model_validate(await self.facets_raw(query))
+
+    async def query_books(self, query: BookQuery) -> BookPage:
+        data = await self.query_books_raw(query)
+        return BookPage.model_construct(
+            items=[_summary_from_cache(d) for d in data["items"]],
+            next_cursor=data["next_cursor"],
+        )
+
+    async def iter_books(self, query: BookQuery, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Every book matching the query's filters and sort, ignoring its page size."""
+        after = decode_cursor(query.cursor) if query.cursor else None
+        fields = _select_fields(query.fields)
+        field = SORT_FIELDS[query.sort]
+        docs = self._repo.iter_query(
+            _build_filter(query),
+            sort_field=field,
+            direction=1 if query.order == "asc" else -1,
+            after=after,
+            batch_size=batch_size,
+            projection=_projection(fields, field),
+        )
+        async for d in docs:
             try:
-                out.append(_to_out(d))
+                yield self._dump(d, fields)
             except KeyError:
                 continue
-        return out
+
+    async def list_books_by_user_raw(self, username: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        selected = _select_fields(fields)
+        key = _user_key(username)
+        out = await self._cache.get(key)
+        if out is None:
+            # Cache the full summary once per user; field subsets are cut from it.
+            out = self._dump_all(await self._repo.find_by_user(username, _projection(SUMMARY_FIELDS)), SUMMARY_FIELDS)
+            await self._cache.set(key, out)
+        if selected == SUMMARY_FIELDS:
+            return out
+        return [{f: d.get(f) for f in selected} for d in out]
+
+    async def list_books_by_user(self, username: str, fields: Optional[Sequence[str]] = None) -> List[BookSummary]:
+        return [_summary_from_cache(d) for d in await self.list_books_by_user_raw(username, fields)]
 
     async def get_book(self, book_id: str) -> Optional[BookOut]:
-        doc = await self._repo.find_one(book_id)
-        return _to_out(doc) if doc else None
+        return await self._cached_book(book_id)
+
+    async def get_books(self, book_ids: List[str]) -> BookBatch:
+        """Full books for ``book_ids`` in request order, from one $in query.
+
+        Not a view: counters are left alone. Malformed ids are reported missing.
+        """
+        wanted = list(dict.fromkeys(book_ids))
+        valid = [i for i in wanted if ObjectId.is_valid(i)]
+        found = {d["id"]: d for d in await self._repo.find_many_by_id(valid)}
+        return BookBatch(
+            items=[_to_out(found[i]) for i in wanted if i in found],
+            missing=[i for i in wanted if i not in found],
+        )
 
     async def create_book(self, data: BookCreate) -> BookOut:
         payload = data.model_dump()
         payload.setdefault("views", 0) 
+        payload.setdefault("comment_count", 0)
         doc = await self._repo.insert_one(payload)
+        await self._changed(None, doc)
         return _to_out(doc)
 
-    async def update_book(self, book_id: str, payload: dict):
-        payload = {k: v for k, v in payload.items() if k != "views"} 
-        return await self._repo.update_fields(book_id, payload)
+    async def update_book(self, book_id: str, payload: dict) -> Optional[BookOut]:
+        payload = {k: v for k, v in payload.items() if k not in ("views", "comment_count")} 
+        before = await self._repo.update_fields(book_id, payload)
+        if not before:
+            return None
+        after = {**before, **payload}
+        await self._changed(before, after)
+        return _to_out(after)
 
     async def delete_book(self, book_id: str) -> bool:
-        return await self._repo.delete_one(book_id)
+        if self._views:
+            self._views.discard(book_id)
+        before = await self._repo.delete_returning(book_id)
+        if not before:
+            return False
+        await self._changed(before, None)
+        await self._view_buckets.delete_by_book(book_id)
+        return True
+
+    async def book_ids_by_user(self, username: str, *, before: ObjectId, limit: int = 500) -> List[str]:
+        return await self._repo.find_ids_by_user(username, before=before, limit=limit)
+
+    async def _summaries_by_id(self, book_ids: List[str]) -> List[Dict[str, Any]]:
+        found = {d["id"]: d for d in await self._repo.find_many_by_id(book_ids, _projection(SUMMARY_FIELDS))}
+        return self._dump_all([found[i] for i in book_ids if i in found], SUMMARY_FIELDS)
+
+    async def similar_books(self, book_id: str, limit: int = 10) -> Optional[List[Dict[str, Any]]]:
+        """Summaries of the books whose text is closest to ``book_id``'s by TF-IDF
+        cosine, best first, each with its ``score``. None if the book does not exist."""
+        if not ObjectId.is_valid(book_id):
+            return None
+        book = await self._cached_book(book_id)
+        if book is None:
+            return None
+        scores = dict(self._similar.similar(book.model_dump(), limit, exclude=book_id))
+        items = await self._summaries_by_id(list(scores))
+        for d in items:
+            d["score"] = round(scores[d["id"]], 4)
+        return items
+
+    async def recommended(self, mode: str, limit: int) -> List[Dict[str, Any]]:
+        """``top``: most viewed of all time, read off the views index.
+        ``trending``: time-decayed views from the in-memory ranking, each with its ``score``."""
+        if mode == "trending":
+            return self._trending.top(limit)
+        page = await self.query_books_raw(BookQuery(sort="views", order="desc", limit=limit))
+        return page["items"]
+
+    def trending_stats(self) -> Dict[str, Any]:
+        return self._trending.stats()
+
+    async def adjust_comment_count(self, book_id: str, delta: int):
+        """Keep ``comment_count`` in step with comment writes (called by CommentsManager).
+
+        Like views, counts are not a list-wide change: the book and its
+        owner's list are dropped, but LIST_VERSION is left alone, so cached
+        list pages and /books ETags may show the old count until they expire.
+        """
+        if not ObjectId.is_valid(book_id):
+            return
+        doc = await self._repo.inc_comment_count(book_id, delta)
+        if doc:
+            self._forget([book_id])
+            await self._drop_books([book_id])
+            if doc.get("username"):
+                await self._cache.delete(_user_key(str(doc["username"])))
+
+    async def adjust_comment_counts(self, deltas: Dict[str, int]):
+        """Bulk form of adjust_comment_count for imports: one write, one read."""
+        deltas = {book_id: n for book_id, n in deltas.items() if n and ObjectId.is_valid(book_id)}
+        if not deltas:
+            return
+        await self._repo.bulk_inc_comment_count(deltas)
+        self._forget(deltas)
+        docs = await self._repo.find_many_by_id(list(deltas), {"username": 1})
+        await self._drop_books(deltas)
+        await self._cache.delete(*{_user_key(str(d["username"])) for d in docs if d.get("username")})
+
+    async def import_books(
+        self, lines: AsyncIterator[Tuple[int, Optional[bytes]]], *, chunk_size: int = 1000, max_errors: int = 100
+    ) -> Dict[str, Any]:
+        """Insert BookCreate-shaped NDJSON rows in unordered chunks; see BulkImporter."""
+        importer = BulkImporter(
+            BookCreate, self._repo.insert_many, prepare=_import_doc, chunk_size=chunk_size, max_errors=max_errors
+        )
+
+        async def inserted(docs: List[Dict[str, Any]]):
+            for d in docs:
+                self._suggest.apply(None, d)
+            if self._similar.ready:
+                self._similar.add_many(docs)
+            await self._cache.delete(*{_user_key(str(d["username"])) for d in docs if d.get("username")})
+            await self._cache.bump(LIST_VERSION)
+            await self._cache.bump(FACETS_VERSION)
+
+        report = await importer.run(lines, on_inserted=inserted)
+        if self._similar.ready:
+            await self._merge_similar()
+        return report
+
+    async def export_books(self, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Every book as full BookOut data, in insertion order; re-importable."""
+        async for d in self._repo.iter_all(batch_size=batch_size):
+            try:
+                yield _to_dict(d, BOOK_FIELDS)
+            except KeyError:
+                continue
 
-    async def increment_and_get(self, book_id: str):
-        return await self._repo.find_one_and_inc_views(book_id)
+    async def increment_and_get(self, book_id: str) -> Optional[BookOut]:
+        if self._views is None:
+            version = await self._cache.version(_book_version(book_id))
+            doc = await self._repo.find_one_and_inc_views(book_id)
+            if not doc:
+                return None
+            self._trending.record(book_id)
+            out = _to_out(doc)
+            await self._cache.set(_book_key(book_id, version), out.model_dump())
+            return out
+        out = await self._cached_book(book_id)
+        if out is None:
+            return None
+        self._trending.record(book_id)
+        return out.model_copy(update={"views": out.views + self._views.add(book_id)})
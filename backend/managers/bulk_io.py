@@ -0,0 +1,126 @@
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+
+# (index within the chunk, error message) for rows the database rejected
+InsertErrors = List[Tuple[int, str]]
+InsertMany = Callable[[List[Dict[str, Any]]], Awaitable[Tuple[List[Dict[str, Any]], InsertErrors]]]
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], *, max_line_bytes: int = 1 << 20
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """Split a byte stream into ``(line_number, line)`` pairs, 1-based.
+
+    Lines longer than ``max_line_bytes`` are skipped and yielded as ``None`` so
+    the caller can report them; memory stays bounded by that limit.
+    """
+    buf = b""
+    line_no = 0
+    overflow = False
+    async for chunk in chunks:
+        parts = (buf + chunk).split(b"\n")
+        buf = parts.pop()
+        for line in parts:
+            line_no += 1
+            if overflow:
+                overflow = False
+                yield line_no, None
+            else:
+                yield line_no, line
+        if len(buf) > max_line_bytes:
+            overflow = True
+            buf = b""
+    if overflow:
+        yield line_no + 1, None
+    elif buf.strip():
+        yield line_no + 1, buf
+
+class BulkImporter:
+    """Validate NDJSON rows with a Pydantic model and insert them in chunks.
+
+    ``prepare`` turns a validated model plus its raw row into the document to
+    store. ``insert_many`` writes one chunk unordered and returns the stored
+    documents plus per-row failures. At most ``chunk_size`` rows are held in
+    memory at once.
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        insert_many: InsertMany,
+        *,
+        prepare: Callable[[BaseModel, Dict[str, Any]], Dict[str, Any]],
+        chunk_size: int = 1000,
+        max_errors: int = 100,
+    ):
+        self._model = model
+        self._insert_many = insert_many
+        self._prepare = prepare
+        self._chunk_size = chunk_size
+        self._max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def _error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < self._max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def _parse(self, line_no: int, line: Optional[bytes]) -> Optional[Dict[str, Any]]:
+        if line is None:
+            self._error(line_no, "Line too long")
+            return None
+        try:
+            raw = json.loads(line)
+        except ValueError as exc:
+            self._error(line_no, f"Invalid JSON: {exc}")
+            return None
+        if not isinstance(raw, dict):
+            self._error(line_no, "Expected a JSON object")
+            return None
+        try:
+            return self._prepare(self._model.model_validate(raw), raw)
+        except ValidationError as exc:
+            self._error(line_no, "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()))
+        except ValueError as exc:
+            self._error(line_no, str(exc))
+        return None
+
+    async def _flush(self, rows: List[Tuple[int, Dict[str, Any]]], on_inserted):
+        if not rows:
+            return
+        stored, failures = await self._insert_many([doc for _, doc in rows])
+        for index, message in failures:
+            self._error(rows[index][0], message)
+        self.inserted += len(stored)
+        if on_inserted and stored:
+            await on_inserted(stored)
+
+    async def run(
+        self,
+        lines: AsyncIterator[Tuple[int, Optional[bytes]]],
+        *,
+        on_inserted: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    ) -> Dict[str, Any]:
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        async for line_no, line in lines:
+            if line is not None and not line.strip():
+                continue
+            doc = self._parse(line_no, line)
+            if doc is None:
+                continue
+            rows.append((line_no, doc))
+            if len(rows) >= self._chunk_size:
+                await self._flush(rows, on_inserted)
+                rows = []
+        await self._flush(rows, on_inserted)
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
@@ -0,0 +1,189 @@
+import json
+import secrets
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: only needed for CACHE_BACKEND=redis
+    aioredis = None
+
+class Cache(ABC):
+    """Async key/value cache with TTLs and named version counters.
+
+    Version counters back "generation" invalidation: callers fold the current
+    version into a key, and bumping it orphans every entry built on the old one.
+    ``epoch`` names the counters' lifetime: process-local caches get a fresh
+    one per process, so their versions are never compared across workers.
+    """
+
+    epoch = "0"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def version(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    async def bump(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+class NullCache(Cache):
+    """Caching disabled: every lookup misses and writes are dropped."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._misses = 0
+        self.epoch = secrets.token_hex(4)
+
+    async def get(self, key: str) -> Optional[Any]:
+        self._misses += 1
+        return None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    async def delete(self, *keys: str) -> None:
+        pass
+
+    async def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    async def bump(self, name: str) -> int:
+        self._versions[name] = self._versions.get(name, 0) + 1
+        return self._versions[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none", "hits": 0, "misses": self._misses, "evictions": 0}
+
+class MemoryCache(Cache):
+    """In-process LRU cache bounded by entry count, with per-entry TTLs."""
+
+    def __init__(self, *, max_entries: int = 10000, ttl: float = 60.0):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+        self.epoch = secrets.token_hex(4)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._expired += 1
+            self._misses += 1
+            return None
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._data[key] = (time.monotonic() + (ttl or self._ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_entries:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def version(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    async def bump(self, name: str) -> int:
+        self._versions[name] = self._versions.get(name, 0) + 1
+        return self._versions[name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "memory",
+            "entries": len(self._data),
+            "max_entries": self._max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "expired": self._expired,
+        }
+
+class RedisCache(Cache):
+    """Shared cache so every worker sees the same entries and versions.
+
+    Versions live in Redis, so ``epoch`` is fixed; flushing Redis resets them
+    and should be followed by a restart of the API workers.
+    """
+
+    epoch = "r"
+
+    def __init__(self, url: str, *, ttl: float = 60.0, prefix: str = "tome:"):
+        if aioredis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._redis = aioredis.from_url(url)
+        self._ttl = ttl
+        self._prefix = prefix
+        self._hits = 0
+        self._misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._redis.get(self._prefix + key)
+        if raw is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._redis.set(self._prefix + key, json.dumps(value, default=str), px=int((ttl or self._ttl) * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self._redis.delete(*(self._prefix + k for k in keys))
+
+    async def version(self, name: str) -> int:
+        raw = await self._redis.get(f"{self._prefix}v:{name}")
+        return int(raw) if raw is not None else 0
+
+    async def bump(self, name: str) -> int:
+        return await self._redis.incr(f"{self._prefix}v:{name}")
+
+    def stats(self) -> Dict[str, Any]:
+        # Evictions happen inside Redis (maxmemory policy) and are not visible here.
+        return {"backend": "redis", "hits": self._hits, "misses": self._misses, "evictions": None}
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+def build_cache(backend: str, *, redis_url: str = "", max_entries: int = 10000, ttl: float = 60.0) -> Cache:
+    if backend == "redis":
+        return RedisCache(redis_url, ttl=ttl)
+    if backend == "memory":
+        return MemoryCache(max_entries=max_entries, ttl=ttl)
+    return NullCache()
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+from bson import ObjectId
+from databases.jobs_repository import JobsRepository
+from databases.mongo import MongoPool
+from managers.books_manager import BooksManager
+from managers.comment_manager import CommentsManager
+from managers.profile_manager import ProfilesManager
+from models.job_model import JobOut
+
+log = logging.getLogger(__name__)
+
+class JobLostError(RuntimeError):
+    """Another worker took the job over after this one's lease expired."""
+
+class _Stopping(Exception):
+    pass
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def _to_out(doc: Dict[str, Any]) -> JobOut:
+    return JobOut.model_validate(doc)
+
+class CascadeDeleter:
+    """Cascading deletes (book -> comments, profile -> books -> comments) as
+    background jobs.
+
+    The request records the job as staged, removes the parent document and
+    only then makes the job claimable, so neither a crash in between nor a
+    parent that does not exist can start deleting dependents. One task
+    per process claims jobs under a lease and deletes dependents ``batch_size``
+    at a time, pausing ``pause`` seconds between batches and recording progress
+    after each one. Every step deletes "whatever is left", so a job whose
+    worker died is simply resumed by the next one once the lease runs out.
+    """
+
+    def __init__(
+        self,
+        pool: MongoPool,
+        collection: str,
+        *,
+        books: BooksManager,
+        profiles: ProfilesManager,
+        comments: CommentsManager,
+        batch_size: int = 500,
+        pause: float = 0.05,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 5.0,
+        max_attempts: int = 5,
+    ):
+        self._repo = JobsRepository(pool, collection)
+        self._books = books
+        self._profiles = profiles
+        self._comments = comments
+        self._batch_size = batch_size
+        self._pause = pause
+        self._lease = timedelta(seconds=lease_seconds)
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{ObjectId()}"
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def connect(self):
+        await self._repo.connect()
+
+    async def close(self):
+        await self.stop()
+        await self._repo.close()
+
+    async def ensure_indexes(self):
+        return await self._repo.ensure_indexes()
+
+    async def delete_book(self, book_id: str) -> Optional[JobOut]:
+        """Delete the book now and its comments in the background; None if it does not exist."""
+        if not ObjectId.is_valid(book_id):
+            return None
+        job = await self._repo.create("book", book_id, _now())
+        if not await self._books.delete_book(book_id):
+            await self._repo.discard(job["id"])
+            return None
+        return await self._activate(job)
+
+    async def delete_profile(self, username: str) -> Optional[JobOut]:
+        """Delete the profile now and the user's books and comments in the background."""
+        username = username.strip()
+        job = await self._repo.create("profile", username, _now())
+        if not await self._profiles.delete_profile(username):
+            await self._repo.discard(job["id"])
+            return None
+        return await self._activate(job)
+
+    async def _activate(self, job: Dict[str, Any]) -> JobOut:
+        job = await self._repo.activate(job["id"], _now()) or job
+        self._wake.set()
+        return _to_out(job)
+
+    async def get(self, job_id: str) -> Optional[JobOut]:
+        if not ObjectId.is_valid(job_id):
+            return None
+        doc = await self._repo.find_one(job_id)
+        return _to_out(doc) if doc else None
+
+    async def _step(self, job_id: str, deleted: Dict[str, int]):
+        if not await self._repo.progress(job_id, self._owner, deleted, _now(), _now() + self._lease):
+            raise JobLostError(job_id)
+        if self._stopping:
+            raise _Stopping()
+        await asyncio.sleep(self._pause)
+
+    async def _drain(self, job_id: str, key: str, delete_batch: Callable[[], Awaitable[int]]):
+        while True:
+            n = await delete_batch()
+            if not n:
+                return
+            await self._step(job_id, {key: n})
+
+    async def _process(self, job: Dict[str, Any]):
+        job_id, target = job["id"], job["target"]
+        if job["kind"] == "book":
+            await self._drain(
+                job_id, "comments", lambda: self._comments.delete_batch_by_book(target, limit=self._batch_size)
+            )
+            return
+        # Books and comments created after the job belong to a new account that
+        # reused the username, so both walks stop at the job's creation.
+        cutoff = ObjectId(job_id)
+        while True:
+            book_ids = await self._books.book_ids_by_user(target, before=cutoff, limit=self._batch_size)
+            if not book_ids:
+                break
+            for book_id in book_ids:
+                # Comments first: a crash in between must not orphan them.
+                await self._drain(
+                    job_id, "comments", lambda: self._comments.delete_batch_by_book(book_id, limit=self._batch_size)
+                )
+                deleted = await self._books.delete_book(book_id)
+                await self._step(job_id, {"books": int(deleted)})
+        await self._drain(
+            job_id,
+            "comments",
+            lambda: self._comments.delete_batch_by_user(
+                target, created_before=job["created_at"], limit=self._batch_size
+            ),
+        )
+
+    async def _handle(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        try:
+            await self._process(job)
+            await self._repo.finish(job_id, self._owner, _now())
+        except _Stopping:
+            await self._repo.release(job_id, self._owner, _now())
+        except JobLostError:
+            log.warning("job %s was taken over by another worker", job_id)
+        except Exception as exc:
+            log.exception("job %s failed (attempt %d)", job_id, job["attempts"])
+            if job["attempts"] >= self._max_attempts:
+                await self._repo.finish(job_id, self._owner, _now(), error=str(exc))
+            else:
+                retry_at = _now() + self._lease * job["attempts"]
+                await self._repo.release(job_id, self._owner, _now(), retry_at=retry_at, error=str(exc))
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                job = await self._repo.claim(self._owner, _now(), _now() + self._lease)
+                if job is not None:
+                    await self._handle(job)
+                    continue
+            except Exception:
+                log.exception("job worker error; retrying in %.0fs", self._poll_interval)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Same shutdown handshake as ViewCounter.stop(); a running job is released at its next batch.
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Set, Tuple
+
+from pymongo.errors import OperationFailure
+
+from databases.comment_repository import CommentsRepository
+from encoding import dumps
+
+log = logging.getLogger(__name__)
+
+# (event name, JSON-encoded data), encoded once per publish however many listeners get it
+Event = Tuple[str, bytes]
+
+# MongoDB's ChangeStreamHistoryLost: the resume token fell off the oplog.
+_HISTORY_LOST = 286
+
+class HubFullError(RuntimeError):
+    """The process already holds ``max_subscribers`` live streams."""
+
+class Subscription:
+    """One listener's queue of events for a single book."""
+
+    __slots__ = ("book_id", "evicted", "_events", "_ready")
+
+    def __init__(self, book_id: str):
+        self.book_id = book_id
+        self.evicted = False
+        self._events: Deque[Event] = deque()
+        self._ready = asyncio.Event()
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """The next event, or None after ``timeout`` idle seconds or once evicted."""
+        if not self._events and not self.evicted:
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                return None
+            self._ready.clear()
+        return self._events.popleft() if self._events else None
+
+class CommentHub:
+    """In-process fan-out of comment events to per-book subscribers.
+
+    Publishing never waits on a listener: each subscription holds at most
+    ``max_queue`` undelivered events, and one that falls that far behind is
+    evicted (its stream ends with an ``evicted`` event, after which the
+    client reconnects and refetches) instead of buffering without bound.
+    """
+
+    def __init__(self, *, max_queue: int = 100, max_subscribers: int = 10000):
+        self._max_queue = max_queue
+        self._max_subscribers = max_subscribers
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+        self._published = 0
+        self._delivered = 0
+        self._evicted = 0
+
+    def subscribe(self, book_id: str) -> Subscription:
+        if self._count >= self._max_subscribers:
+            raise HubFullError(f"{self._count} live streams")
+        sub = Subscription(book_id)
+        self._subs.setdefault(book_id, set()).add(sub)
+        self._count += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        subs = self._subs.get(sub.book_id)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        self._count -= 1
+        if not subs:
+            del self._subs[sub.book_id]
+
+    def _evict(self, sub: Subscription):
+        self.unsubscribe(sub)
+        sub.evicted = True
+        sub._events.clear()
+        sub._ready.set()
+        self._evicted += 1
+
+    def _deliver(self, subs: Set[Subscription], event: Event):
+        for sub in list(subs):
+            if len(sub._events) >= self._max_queue:
+                self._evict(sub)
+                continue
+            sub._events.append(event)
+            sub._ready.set()
+            self._delivered += 1
+
+    def publish(self, book_id: str, name: str, data: Dict[str, Any]):
+        self._published += 1
+        subs = self._subs.get(book_id)
+        if subs:
+            self._deliver(subs, (name, dumps(data)))
+
+    def broadcast(self, name: str, data: Dict[str, Any]):
+        """Send to every subscriber, for events whose book is unknown."""
+        self._published += 1
+        event = (name, dumps(data))
+        for subs in list(self._subs.values()):
+            self._deliver(subs, event)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": self._count,
+            "books": len(self._subs),
+            "published": self._published,
+            "delivered": self._delivered,
+            "evicted": self._evicted,
+        }
+
+class ChangeFeed:
+    """Feeds a CommentHub from the comments collection's change stream, so
+    every worker sees every worker's writes (needs a replica set).
+
+    Deleted comments are routed by their pre-image when the collection has
+    pre-images enabled (MongoDB 6.0+), and broadcast otherwise. After an
+    error the stream resumes from the last event seen, ``retry`` seconds later.
+    """
+
+    def __init__(
+        self,
+        repo: CommentsRepository,
+        hub: CommentHub,
+        to_json: Callable[[Dict[str, Any]], Dict[str, Any]],
+        *,
+        retry: float = 5.0,
+    ):
+        self._repo = repo
+        self._hub = hub
+        self._to_json = to_json
+        self._retry = retry
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _dispatch(self, change: Dict[str, Any]):
+        op = change.get("operationType")
+        if op == "insert":
+            doc = change["fullDocument"]
+            self._hub.publish(str(doc.get("book_id")), "created", self._to_json(doc))
+        elif op == "delete":
+            comment_id = str(change["documentKey"]["_id"])
+            before = change.get("fullDocumentBeforeChange")
+            if before and before.get("book_id"):
+                book_id = str(before["book_id"])
+                self._hub.publish(book_id, "deleted", {"id": comment_id, "book_id": book_id})
+            else:
+                self._hub.broadcast("deleted", {"id": comment_id})
+
+    async def _follow(self):
+        async with self._repo.watch(resume_after=self._resume_token) as stream:
+            while not self._stopping:
+                # try_next() returns None after max_await_time_ms, so stop() is noticed promptly.
+                change = await stream.try_next()
+                if change is not None:
+                    self._dispatch(change)
+                self._resume_token = stream.resume_token
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self._follow()
+            except OperationFailure as exc:
+                if exc.code == _HISTORY_LOST:
+                    self._resume_token = None
+                log.exception("comment change stream failed; reopening in %.0fs", self._retry)
+            except Exception:
+                log.exception("comment change stream failed; reopening in %.0fs", self._retry)
+            if self._stopping:
+                break
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._retry)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -1,7 +1,23 @@
 # managers/comment_manager.py
-from typing import List, Optional, Dict, Any
-from models.comment_model import CommentCreate, CommentOut
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from bson import ObjectId
+from models.comment_model import CommentBatch, CommentCreate, CommentOut, CommentPage
+from databases.mongo import MongoPool
 from databases.comment_repository import CommentsRepository  
+from databases.pagination import decode_cursor, encode_cursor
+from managers.books_manager import BooksManager
+from managers.bulk_io import BulkImporter
+from managers.cache import Cache, NullCache
+from managers.comment_hub import ChangeFeed, CommentHub, Subscription
+from managers.single_flight import SingleFlight
+
+log = logging.getLogger(__name__)
+
+# Bumped by every comment write; list responses derive their ETag from it.
+COMMENTS_VERSION = "comments"
 
 def _normalize_id(doc: Dict[str, Any]) -> Dict[str, Any]:
     if not doc:
@@ -26,40 +42,227 @@ def _to_out(doc: Dict[str, Any]) -> CommentOut:
     d = _normalize_id(doc)
     d = _coerce_types(d)
     return CommentOut.model_validate({
+        "id": d.get("id"),
+        "book_id": d.get("book_id"),
         "username": d.get("username"),
         "comment": d.get("comment"),
         "date_and_time": d.get("date_and_time"),
+        "created_at": d.get("created_at"),
     })
 
+def _now() -> datetime:
+    # BSON dates hold milliseconds; truncate so the returned value matches what is stored.
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def _to_json(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return _to_out(doc).model_dump(mode="json")
+
+def _import_doc(comment: CommentCreate, raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Document for one imported row; an exported ``id`` and ``created_at`` are kept."""
+    doc = comment.model_dump()
+    created = raw.get("created_at")
+    if created:
+        try:
+            parsed = datetime.fromisoformat(str(created).replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError("created_at: not an ISO 8601 timestamp")
+        doc["created_at"] = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    else:
+        doc["created_at"] = _now()
+    if raw.get("id") is not None:
+        if not ObjectId.is_valid(str(raw["id"])):
+            raise ValueError("id: not a valid ObjectId")
+        doc["_id"] = ObjectId(str(raw["id"]))
+    return doc
+
+def _page(docs: List[Dict[str, Any]], limit: int) -> CommentPage:
+    page = docs[:limit]
+    next_cursor = None
+    if len(docs) > limit and page:
+        last = page[-1]
+        next_cursor = encode_cursor(last.get("created_at"), ObjectId(last["id"]))
+    return CommentPage(items=[_to_out(d) for d in page], next_cursor=next_cursor)
+
 class CommentsManager:
-    def __init__(self, uri: str, db_name: str, collection: str = "comments"):
-        self._repo = CommentsRepository(uri, db_name, collection)
+    def __init__(
+        self,
+        pool: MongoPool,
+        collection: str = "comments",
+        *,
+        books: Optional[BooksManager] = None,
+        cache: Optional[Cache] = None,
+        hub: Optional[CommentHub] = None,
+        watch_changes: bool = False,
+        coalesce: bool = True,
+    ):
+        self._repo = CommentsRepository(pool, collection)
+        # Keeps books.comment_count in step with comment writes when set.
+        self._books = books
+        self._cache = cache or NullCache()
+        # Live updates: this process's writes go straight to the hub, unless
+        # the change stream feeds it everyone's (this process's included).
+        self._hub = hub or CommentHub()
+        self._feed = ChangeFeed(self._repo, self._hub, _to_json) if watch_changes else None
+        # Concurrent requests for the same page of a book's thread share a query.
+        self._flight = SingleFlight(enabled=coalesce)
+
+    async def connect(self):
+        await self._repo.connect()
+        if self._feed is not None:
+            try:
+                await self._repo.enable_pre_images()
+            except Exception as exc:
+                log.warning("comment pre-images unavailable (%s); deletes are broadcast to every stream", exc)
+            self._feed.start()
+
+    async def close(self):
+        if self._feed is not None:
+            await self._feed.stop()
+        await self._repo.close()
+
+    async def ensure_indexes(self) -> List[str]: return await self._repo.ensure_indexes()
+
+    async def version(self) -> int:
+        return await self._cache.version(COMMENTS_VERSION)
+
+    async def _changed(self):
+        await self._cache.bump(COMMENTS_VERSION)
+
+    def _forget(self, book_id: str):
+        # Thread reads starting after a write must not join one that predates it.
+        self._flight.forget(lambda key: key[0] == book_id)
+
+    def _notify(self, book_id: str, name: str, data: Dict[str, Any]):
+        self._forget(book_id)
+        if self._feed is None:
+            self._hub.publish(book_id, name, data)
 
-    async def connect(self): await self._repo.connect()
-    async def close(self): await self._repo.close()
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return self._flight.stats()
+
+    def subscribe(self, book_id: str) -> Subscription:
+        """Live ``created``/``deleted`` events for one book; raises HubFullError at capacity."""
+        return self._hub.subscribe(book_id)
+
+    def unsubscribe(self, sub: Subscription):
+        self._hub.unsubscribe(sub)
+
+    def live_stats(self) -> Dict[str, Any]:
+        return {"source": "changestream" if self._feed else "local", **self._hub.stats()}
 
     async def create_comment(self, data: CommentCreate) -> CommentOut:
-        doc = await self._repo.insert_one(data.model_dump())
-        return _to_out(doc)
+        payload = data.model_dump()
+        payload["created_at"] = _now()
+        doc = await self._repo.insert_one(payload)
+        await self._changed()
+        if self._books:
+            await self._books.adjust_comment_count(data.book_id, 1)
+        out = _to_out(doc)
+        self._notify(out.book_id, "created", out.model_dump(mode="json"))
+        return out
 
     async def get_comment(self, comment_id: str) -> Optional[CommentOut]:
         doc = await self._repo.find_one(comment_id)
         return _to_out(doc) if doc else None
 
+    async def get_comments(self, comment_ids: List[str]) -> CommentBatch:
+        """Comments for ``comment_ids`` in request order, from one $in query."""
+        wanted = list(dict.fromkeys(comment_ids))
+        valid = [i for i in wanted if ObjectId.is_valid(i)]
+        found = {d["id"]: d for d in await self._repo.find_many_by_id(valid)}
+        return CommentBatch(
+            items=[_to_out(found[i]) for i in wanted if i in found],
+            missing=[i for i in wanted if i not in found],
+        )
+
     async def delete_comment(self, comment_id: str) -> bool:
-        return await self._repo.delete_one(comment_id)
+        doc = await self._repo.delete_returning(comment_id)
+        if not doc:
+            return False
+        await self._changed()
+        if self._books and doc.get("book_id"):
+            await self._books.adjust_comment_count(str(doc["book_id"]), -1)
+        book_id = str(doc.get("book_id"))
+        self._notify(book_id, "deleted", {"id": str(doc["id"]), "book_id": book_id})
+        return True
 
     async def list_comments_by_book(
-        self, book_id: str, limit: int = 100, skip: int = 0, newest_first: bool = True
-    ) -> List[CommentOut]:
-        docs = await self._repo.find_by_book(book_id, limit=limit, skip=skip, newest_first=newest_first)
-        return [_to_out(d) for d in docs]
+        self, book_id: str, limit: int = 100, cursor: Optional[str] = None, newest_first: bool = True
+    ) -> CommentPage:
+        after = decode_cursor(cursor) if cursor else None
+
+        async def load() -> CommentPage:
+            docs = await self._repo.find_by_book(book_id, limit=limit + 1, after=after, newest_first=newest_first)
+            return _page(docs, limit)
+
+        return await self._flight.do((book_id, limit, cursor, newest_first), load)
 
     async def list_comments_by_user(
-        self, username: str, limit: int = 100, skip: int = 0, newest_first: bool = True
-    ) -> List[CommentOut]:
-        docs = await self._repo.find_by_user(username, limit=limit, skip=skip, newest_first=newest_first)
-        return [_to_out(d) for d in docs]
+        self, username: str, limit: int = 100, cursor: Optional[str] = None, newest_first: bool = True
+    ) -> CommentPage:
+        after = decode_cursor(cursor) if cursor else None
+        docs = await self._repo.find_by_user(username, limit=limit + 1, after=after, newest_first=newest_first)
+        return _page(docs, limit)
+
+    async def iter_comments_by_user(
+        self,
+        username: str,
+        limit: int = 0,
+        cursor: Optional[str] = None,
+        newest_first: bool = True,
+        *,
+        batch_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        after = decode_cursor(cursor) if cursor else None
+        docs = self._repo.iter_by_user(username, limit=limit, after=after, newest_first=newest_first, batch_size=batch_size)
+        async for d in docs:
+            yield _to_out(d).model_dump(mode="json")
+
+    async def import_comments(
+        self, lines: AsyncIterator[Tuple[int, Optional[bytes]]], *, chunk_size: int = 1000, max_errors: int = 100
+    ) -> Dict[str, Any]:
+        """Insert CommentCreate-shaped NDJSON rows in unordered chunks; see BulkImporter."""
+        importer = BulkImporter(
+            CommentCreate, self._repo.insert_many, prepare=_import_doc, chunk_size=chunk_size, max_errors=max_errors
+        )
+
+        async def inserted(docs: List[Dict[str, Any]]):
+            await self._changed()
+            if self._books:
+                await self._books.adjust_comment_counts(Counter(str(d["book_id"]) for d in docs))
+            for d in docs:
+                self._notify(str(d["book_id"]), "created", _to_json(d))
+
+        return await importer.run(lines, on_inserted=inserted)
+
+    async def export_comments(self, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        async for d in self._repo.iter_all(batch_size=batch_size):
+            yield _to_out(d).model_dump(mode="json")
 
     async def delete_comments_by_book(self, book_id: str) -> int:
-        return await self._repo.delete_by_book(book_id)
+        n = await self._repo.delete_by_book(book_id)
+        self._forget(book_id)
+        if n:
+            await self._changed()
+        return n
+
+    async def delete_batch_by_book(self, book_id: str, *, limit: int = 500) -> int:
+        n = await self._repo.delete_batch_by_book(book_id, limit=limit)
+        self._forget(book_id)
+        if n:
+            await self._changed()
+        return n
+
+    async def delete_batch_by_user(self, username: str, *, created_before: datetime, limit: int = 500) -> int:
+        """Delete one batch of a user's comments and decrement the affected books' counts."""
+        docs = await self._repo.delete_batch_by_user(username, created_before=created_before, limit=limit)
+        if docs:
+            await self._changed()
+        if self._books and docs:
+            counts = Counter(str(d["book_id"]) for d in docs if d.get("book_id"))
+            await self._books.adjust_comment_counts({book_id: -n for book_id, n in counts.items()})
+        for d in docs:
+            book_id = str(d.get("book_id"))
+            self._notify(book_id, "deleted", {"id": str(d["id"]), "book_id": book_id})
+        return len(docs)
@@ -1,8 +1,14 @@
-from typing import List, Optional, Dict, Any
+import logging
+from typing import AsyncIterator, List, Optional, Dict, Any
 from pydantic import BaseModel
-from models.profile_model import ProfileCreate, ProfileUpdate, ProfileOut
+from pymongo.errors import DuplicateKeyError
+from models.profile_model import ProfileBatch, ProfileCreate, ProfileUpdate, ProfileOut
+from databases.mongo import MongoPool
 from databases.profile_repository import ProfilesRepository
-from security import verify_password, hash_password
+from managers.single_flight import SingleFlight
+from security import PasswordHasher
+
+log = logging.getLogger(__name__)
 
 def _normalize_id(doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not doc:
@@ -25,9 +31,22 @@ def _to_out(doc: Optional[Dict[str, Any]]) -> Optional[ProfileOut]:
     d.pop("password_hash", None)
     return ProfileOut.model_validate(d)
 
+class UsernameTakenError(RuntimeError):
+    """Raised when the unique profiles.username index rejects a write."""
+
 class ProfilesManager:
-    def __init__(self, uri: str, db_name: str, collection: str = "profiles"):
-        self._repo = ProfilesRepository(uri, db_name, collection)
+    def __init__(
+        self,
+        pool: MongoPool,
+        collection: str = "profiles",
+        *,
+        hasher: Optional[PasswordHasher] = None,
+        coalesce: bool = True,
+    ):
+        self._repo = ProfilesRepository(pool, collection)
+        self._hasher = hasher or PasswordHasher()
+        # Concurrent get_profile calls for one username share a query.
+        self._flight = SingleFlight(enabled=coalesce)
 
     async def connect(self):
         await self._repo.connect()
@@ -35,51 +54,58 @@ class ProfilesManager:
     async def close(self):
         await self._repo.close()
 
-    async def list_profiles(self) -> List[ProfileOut]:
-        docs = await self._repo.find_all()
-        out: List[ProfileOut] = []
-        for d in docs:
+    async def ensure_indexes(self) -> List[str]:
+        return await self._repo.ensure_indexes()
+
+    async def iter_profiles(self, *, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        async for d in self._repo.iter_all(batch_size=batch_size):
             o = _to_out(d)
             if o:
-                out.append(o)
-        return out
+                yield o.model_dump()
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return self._flight.stats()
+
+    def _forget(self, *usernames: str):
+        self._flight.forget(lambda key: key in usernames)
+
+    async def _load_profile(self, username: str) -> Optional[ProfileOut]:
+        return _to_out(await self._repo.find_by_username(username))
 
     async def get_profile(self, username: str) -> Optional[ProfileOut]:
-        doc = await self._repo.find_by_username(username.strip())
-        return _to_out(doc)
+        username = username.strip()
+        return await self._flight.do(username, lambda: self._load_profile(username))
+
+    async def get_profiles(self, usernames: List[str]) -> ProfileBatch:
+        """Profiles for ``usernames`` in request order, from one $in query."""
+        wanted = list(dict.fromkeys(u.strip() for u in usernames if u.strip()))
+        found = {d["username"]: d for d in await self._repo.find_by_usernames(wanted)}
+        return ProfileBatch(
+            items=[_to_out(found[u]) for u in wanted if u in found],
+            missing=[u for u in wanted if u not in found],
+        )
 
     async def create_profile(self, data: ProfileCreate | Dict[str, Any]) -> ProfileOut:
         payload = data.model_dump() if isinstance(data, BaseModel) else dict(data)
-        print(f"[DEBUG] create_profile: incoming payload (raw) = {payload}")
 
         username = (payload.get("username") or "").strip()
         if not username:
             raise RuntimeError("Username required")
-
-        existing = await self._repo.find_by_username(username)
-        print(f"[DEBUG] create_profile: existing for '{username}' = {existing}")
-        if existing:
-            raise RuntimeError("Username already exists")
+        payload["username"] = username
 
         if payload.get("password"):
-            payload["password_hash"] = hash_password(payload["password"])
-            debug_payload_before_insert = dict(payload)
+            payload["password_hash"] = await self._hasher.hash(payload["password"])
             payload.pop("password", None)
-        else:
-            debug_payload_before_insert = dict(payload)
-
-        print(f"[DEBUG] create_profile: about to insert payload = {debug_payload_before_insert}")
-
-        ins = await self._repo.insert_one(payload)
-        print(f"[DEBUG] create_profile: insert_one result type={type(ins).__name__}, value={ins}")
-
-        created = await self._repo.find_by_username(username)
-        print(f"[DEBUG] create_profile: re-fetched by username='{username}' -> {created}")
 
-        if not created:
-            raise RuntimeError(f"Failed to retrieve created profile for username: {username}")
+        try:
+            ins = await self._repo.insert_one(payload)
+        except DuplicateKeyError:
+            raise UsernameTakenError("Username already exists")
+        self._forget(username)
+        # Never the payload: it carries the password hash.
+        log.debug("created profile %s (%s)", username, ins.get("id") if ins else None)
 
-        out = _to_out(created)
+        out = _to_out(ins)
         if not out:
             raise RuntimeError("Failed to convert profile to output format")
         return out
@@ -95,19 +121,25 @@ class ProfilesManager:
         if not payload:
             return await self.get_profile(username)
         if payload.get("password"):
-            payload["password_hash"] = hash_password(payload["password"])
+            payload["password_hash"] = await self._hasher.hash(payload["password"])
             payload.pop("password", None)
-        doc = await self._repo.update_by_username(username.strip(), payload)
+        try:
+            doc = await self._repo.update_by_username(username.strip(), payload)
+        except DuplicateKeyError:
+            raise UsernameTakenError("Username already exists")
+        self._forget(username.strip(), str(payload.get("username", "")).strip())
         return _to_out(doc)
 
     async def delete_profile(self, username: str) -> bool:
-        return await self._repo.delete_by_username(username.strip())
+        deleted = await self._repo.delete_by_username(username.strip())
+        self._forget(username.strip())
+        return deleted
 
     async def authenticate(self, username: str, plain_password: str) -> Optional[ProfileOut]:
         doc = await self._repo.find_by_username((username or "").strip())
         if not doc:
             return None
         hashed = doc.get("password_hash") or doc.get("password")
-        if not hashed or not verify_password(plain_password, hashed):
+        if not hashed or not await self._hasher.verify(plain_password, hashed):
             return None
         return _to_out(doc)
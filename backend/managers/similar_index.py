@@ -0,0 +1,376 @@
+import math
+import os
+import re
+import tempfile
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from scipy import sparse
+
+# Bumped whenever the on-disk layout or the tokenizer changes, so old snapshots are rebuilt.
+FORMAT_VERSION = 1
+
+TEXT_FIELDS = ("title", "author", "genre", "review")
+
+# (field, token prefix, weight). Author and genre are matched as whole values;
+# the prefix keeps them apart from the same word in a title or review.
+FIELD_WEIGHTS = (("title", "", 3.0), ("author", "a:", 2.0), ("genre", "g:", 2.0), ("review", "", 1.0))
+
+STOP_WORDS = frozenset(
+    "a about after all also an and any are as at be been but by can could did do does for from had has have he "
+    "her him his how i if in into is it its just me more most my no not of on one or our out she so some than "
+    "that the their them then there these they this to too up was we were what when which who will with would "
+    "you your".split()
+)
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+Row = Tuple[np.ndarray, np.ndarray]
+
+def _text(doc: Optional[Dict[str, Any]]) -> Tuple[Any, ...]:
+    return tuple((doc or {}).get(f) for f in TEXT_FIELDS)
+
+def weighted_terms(doc: Dict[str, Any]) -> Dict[str, float]:
+    """Sublinear term frequencies (1 + log tf) of a book's text fields, field-weighted."""
+    counts: Dict[str, float] = {}
+    for field, prefix, weight in FIELD_WEIGHTS:
+        value = doc.get(field)
+        if not isinstance(value, str):
+            continue
+        if prefix:
+            value = " ".join(value.casefold().split())
+            if value:
+                counts[prefix + value] = counts.get(prefix + value, 0.0) + weight
+            continue
+        for token in _TOKEN.findall(value.casefold()):
+            if len(token) > 1 and token not in STOP_WORDS:
+                counts[token] = counts.get(token, 0.0) + weight
+    return {t: 1.0 + math.log(c) for t, c in counts.items()}
+
+def _join(values: List[str]) -> np.ndarray:
+    return np.frombuffer("\n".join(values).encode(), dtype=np.uint8)
+
+def _split(blob: np.ndarray) -> List[str]:
+    text = blob.tobytes().decode()
+    return text.split("\n") if text else []
+
+class MergePlan(NamedTuple):
+    """What ``SimilarIndex.merge_plan`` captured; read-only from then on."""
+
+    ids: List[str]
+    main: sparse.csc_matrix
+    keep: np.ndarray
+    pending: Optional[sparse.csr_matrix]
+    rows: Dict[str, Row]
+    width: int
+    idf: np.ndarray
+
+def build_merged(plan: MergePlan) -> Tuple[sparse.csc_matrix, np.ndarray]:
+    """The merged matrix and its row norms; touches nothing but ``plan``."""
+    parts = []
+    if len(plan.keep):
+        kept = plan.main.tocsr()[plan.keep]
+        kept.resize((len(plan.keep), plan.width))
+        parts.append(kept)
+    if plan.pending is not None:
+        parts.append(plan.pending)
+    if parts:
+        matrix = sparse.vstack(parts, format="csr", dtype=np.float32)
+    else:
+        matrix = sparse.csr_matrix((0, plan.width), dtype=np.float32)
+    return matrix.tocsc(), np.sqrt(matrix.multiply(matrix) @ (plan.idf**2)).astype(np.float32)
+
+class SimilarIndex:
+    """TF-IDF vectors of every book for "more like this" lookups.
+
+    Term frequencies live in one CSC matrix (a row per book, a column per
+    term), with IDF applied at query time, so a lookup is a single sparse
+    product over the postings of the query's strongest terms. Writes go to a
+    small ``pending`` set of rows and a dead-row mask; both are folded into
+    the matrix by ``merge()`` once ``needs_merge()`` says they grew past
+    ``max_pending``.
+    """
+
+    def __init__(self, *, max_pending: int = 2000, max_query_terms: int = 64):
+        self._max_pending = max_pending
+        self._max_query_terms = max_query_terms
+        self._vocab: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._df = np.zeros(1024, dtype=np.int32)
+        self._n = 0
+        self._main = sparse.csc_matrix((0, 0), dtype=np.float32)
+        self._main_ids: List[str] = []
+        self._row_of: Dict[str, int] = {}
+        self._alive = np.zeros(0, dtype=bool)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._dead = 0
+        self._pending: Dict[str, Row] = {}
+        self._pending_view: Optional[Tuple[List[str], sparse.csr_matrix, np.ndarray]] = None
+        self.ready = False
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _row(self, doc: Dict[str, Any], *, register: bool) -> Row:
+        cols: List[int] = []
+        vals: List[float] = []
+        for term, weight in weighted_terms(doc).items():
+            col = self._vocab.get(term)
+            if col is None:
+                if not register:
+                    continue
+                col = len(self._terms)
+                self._vocab[term] = col
+                self._terms.append(term)
+                if col >= len(self._df):
+                    self._df = np.concatenate([self._df, np.zeros(len(self._df), dtype=np.int32)])
+            cols.append(col)
+            vals.append(weight)
+        idx = np.asarray(cols, dtype=np.int32)
+        order = np.argsort(idx)
+        return idx[order], np.asarray(vals, dtype=np.float32)[order]
+
+    def _idf(self, cols: Optional[np.ndarray] = None) -> np.ndarray:
+        df = self._df[: len(self._terms)] if cols is None else self._df[cols]
+        return (np.log((1.0 + self._n) / (1.0 + df)) + 1.0).astype(np.float32)
+
+    def _add(self, book_id: str, doc: Dict[str, Any]):
+        row = self._row(doc, register=True)
+        self._df[row[0]] += 1
+        self._n += 1
+        self._pending[book_id] = row
+        self._pending_view = None
+
+    def _remove(self, book_id: str, doc: Optional[Dict[str, Any]]):
+        if book_id in self._pending:
+            cols = self._pending.pop(book_id)[0]
+            self._pending_view = None
+        elif book_id in self._row_of:
+            row = self._row_of.pop(book_id)
+            self._alive[row] = False
+            self._dead += 1
+            if doc is not None:
+                cols = self._row(doc, register=False)[0]
+            else:
+                cols = self._main.getrow(row).indices
+        else:
+            return
+        self._df[cols] -= 1
+        self._n -= 1
+
+    def add_many(self, docs: Iterable[Dict[str, Any]]):
+        """Index documents without merging; call ``merge()`` when done."""
+        for doc in docs:
+            book_id = str(doc["id"])
+            self._remove(book_id, None)
+            self._add(book_id, doc)
+        self.dirty = True
+
+    def remove_ids(self, book_ids: Iterable[str]):
+        for book_id in book_ids:
+            self._remove(book_id, None)
+        self.dirty = True
+
+    def apply(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+        """Re-index a book whose text fields changed between ``before`` and ``after``."""
+        if not self.ready or _text(before) == _text(after):
+            return
+        book_id = str((after or before or {})["id"])
+        if before:
+            self._remove(book_id, before)
+        if after:
+            self._add(book_id, after)
+        self.dirty = True
+
+    def needs_merge(self) -> bool:
+        """True once pending or dead rows have grown past ``max_pending``."""
+        return self.ready and (
+            len(self._pending) >= self._max_pending or self._dead >= max(self._max_pending, len(self._main_ids) // 10)
+        )
+
+    def _pending_matrix(self) -> Tuple[List[str], sparse.csr_matrix, np.ndarray]:
+        if self._pending_view is None:
+            ids = list(self._pending)
+            rows = [self._pending[i] for i in ids]
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            np.cumsum([len(r[0]) for r in rows], out=indptr[1:])
+            matrix = sparse.csr_matrix(
+                (
+                    np.concatenate([r[1] for r in rows]) if rows else np.zeros(0, np.float32),
+                    np.concatenate([r[0] for r in rows]) if rows else np.zeros(0, np.int32),
+                    indptr,
+                ),
+                shape=(len(rows), len(self._terms)),
+            )
+            norms = np.sqrt(matrix.multiply(matrix) @ (self._idf() ** 2)).astype(np.float32)
+            self._pending_view = (ids, matrix, norms)
+        return self._pending_view
+
+    def merge(self):
+        """Fold pending rows into the matrix, drop dead rows and refresh the norms."""
+        plan = self.merge_plan()
+        if plan is not None:
+            self.install_merged(plan, build_merged(plan))
+
+    def merge_plan(self) -> Optional["MergePlan"]:
+        """Snapshot what ``merge()`` would fold in, or None if there is nothing to do.
+
+        Cheap enough for the event loop: the heavy part, ``build_merged(plan)``,
+        reads only the snapshot and can run in a thread while writes continue;
+        ``install_merged`` then swaps the result in on the loop.
+        """
+        if not self._pending and not self._dead and self._main.shape[1] == len(self._terms):
+            return None
+        keep = np.flatnonzero(self._alive)
+        pending_ids, pending, _ = self._pending_matrix() if self._pending else ([], None, None)
+        return MergePlan(
+            ids=[self._main_ids[i] for i in keep] + pending_ids,
+            main=self._main,
+            keep=keep,
+            pending=pending,
+            rows={book_id: self._pending[book_id] for book_id in pending_ids},
+            width=len(self._terms),
+            idf=self._idf(),
+        )
+
+    def install_merged(self, plan: "MergePlan", built: Tuple[sparse.csc_matrix, np.ndarray]):
+        """Swap in a matrix built from ``plan``. Rows written since the snapshot
+        are reconciled: books removed or re-indexed in the meantime become dead
+        rows, and pending rows added meanwhile stay pending."""
+        if plan.main is not self._main:
+            return  # another merge got there first
+        matrix, norms = built
+        alive = np.ones(len(plan.ids), dtype=bool)
+        for i, book_id in enumerate(plan.ids):
+            row = plan.rows.get(book_id)
+            if row is None:
+                alive[i] = book_id in self._row_of
+            elif self._pending.get(book_id) is row:
+                del self._pending[book_id]
+            else:
+                alive[i] = False
+        self._install(plan.ids, matrix, norms)
+        for i in np.flatnonzero(~alive):
+            del self._row_of[plan.ids[i]]
+        self._alive = alive
+        self._dead = len(alive) - int(alive.sum())
+        self._pending_view = None
+
+    def _install(self, ids: List[str], matrix: sparse.csc_matrix, norms: np.ndarray):
+        matrix.indices = matrix.indices.astype(np.int32, copy=False)
+        self._main = matrix
+        self._main_ids = ids
+        self._row_of = {book_id: i for i, book_id in enumerate(ids)}
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._norms = norms
+        self._dead = 0
+
+    def ids(self) -> Set[str]:
+        return set(self._row_of) | set(self._pending)
+
+    def similar(self, doc: Dict[str, Any], limit: int = 10, *, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """``(book_id, cosine)`` of the ``limit`` books closest to ``doc``, best first."""
+        idx, tf = self._row(doc, register=False)
+        if not len(idx):
+            return []
+        idf = self._idf(idx)
+        weights = tf * idf
+        if len(idx) > self._max_query_terms:
+            top = np.argpartition(weights, -self._max_query_terms)[-self._max_query_terms:]
+            idx, weights, idf = idx[top], weights[top], idf[top]
+        q_norm = float(np.linalg.norm(weights))
+        # A row's tf-idf weight is tf * idf, so its dot product with the query is tf @ (weights * idf).
+        q = weights * idf
+
+        candidates: List[Tuple[List[str], np.ndarray]] = []
+        if self._main.shape[0]:
+            in_main = idx < self._main.shape[1]
+            scores = self._main[:, idx[in_main]] @ q[in_main]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = scores / (self._norms * q_norm)
+            scores[~self._alive] = 0.0
+            if exclude in self._row_of:
+                scores[self._row_of[exclude]] = 0.0
+            candidates.append((self._main_ids, scores))
+        if self._pending:
+            pending_ids, pending, norms = self._pending_matrix()
+            with np.errstate(divide="ignore", invalid="ignore"):
+                scores = (pending[:, idx] @ q) / (norms * q_norm)
+            if exclude in self._pending:
+                scores[pending_ids.index(exclude)] = 0.0
+            candidates.append((pending_ids, scores))
+
+        best: List[Tuple[str, float]] = []
+        for ids, scores in candidates:
+            scores = np.nan_to_num(scores, nan=0.0, posinf=0.0)
+            k = min(limit, len(scores))
+            top = np.argpartition(scores, -k)[-k:]
+            best += [(ids[i], float(scores[i])) for i in top if scores[i] > 0]
+        best.sort(key=lambda pair: -pair[1])
+        return best[:limit]
+
+    def save(self, path: str):
+        """Merge and write the index to ``path`` atomically (a .npz file)."""
+        self.merge()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # A temp file per writer: several workers may save the same snapshot at startup.
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(
+                    f,
+                    version=np.array(FORMAT_VERSION),
+                    data=self._main.data,
+                    indices=self._main.indices,
+                    indptr=self._main.indptr,
+                    shape=np.array(self._main.shape),
+                    norms=self._norms,
+                    ids=_join(self._main_ids),
+                    terms=_join(self._terms),
+                    df=self._df[: len(self._terms)],
+                )
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "SimilarIndex":
+        """Read a snapshot written by ``save``; raises ValueError if it is from another format."""
+        index = cls(**kwargs)
+        with np.load(path, allow_pickle=False) as z:
+            if int(z["version"]) != FORMAT_VERSION:
+                raise ValueError(f"similar index snapshot has format {int(z['version'])}, expected {FORMAT_VERSION}")
+            matrix = sparse.csc_matrix((z["data"], z["indices"], z["indptr"]), shape=tuple(z["shape"]))
+            ids = _split(z["ids"])
+            index._terms = _split(z["terms"])
+            df = z["df"].astype(np.int32)
+            norms = z["norms"]
+        if len(ids) != matrix.shape[0] or len(index._terms) != len(df):
+            raise ValueError("similar index snapshot is inconsistent")
+        index._vocab = {t: i for i, t in enumerate(index._terms)}
+        index._df = np.concatenate([df, np.zeros(max(1024, len(df)), dtype=np.int32)])
+        index._n = len(ids)
+        index._install(ids, matrix, norms)
+        return index
+
+    def memory_bytes(self) -> int:
+        """Approximate heap size of the matrices and vectors (not the vocabulary dict)."""
+        size = self._main.data.nbytes + self._main.indices.nbytes + self._main.indptr.nbytes
+        size += self._df.nbytes + self._norms.nbytes + self._alive.nbytes
+        size += sum(r[0].nbytes + r[1].nbytes for r in self._pending.values())
+        return size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "books": self._n,
+            "terms": len(self._terms),
+            "nnz": int(self._main.nnz),
+            "pending": len(self._pending),
+            "dead": self._dead,
+            "bytes": self.memory_bytes(),
+        }
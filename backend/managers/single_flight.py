@@ -0,0 +1,83 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _Call(Generic[T]):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[T]"):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Coalesces concurrent identical reads into one in-flight call.
+
+    The first caller for a key starts ``fn`` as its own task; callers arriving
+    while it runs wait on the same task and get the same result or exception.
+    Each waits through ``asyncio.shield``, so one caller being cancelled (its
+    client went away) does not cancel the read for the others; the read is
+    only cancelled once every caller has left. Results are shared objects and
+    must be treated as read-only.
+
+    Nothing is cached: a key is forgotten as soon as its call finishes, and
+    writers call ``forget`` so that callers arriving after a write never join a
+    read that started before it.
+    """
+
+    def __init__(self, *, enabled: bool = True):
+        self._enabled = enabled
+        self._calls: Dict[Hashable, _Call] = {}
+        self._started = 0
+        self._coalesced = 0
+        self._cancelled = 0
+
+    def _done(self, key: Hashable, call: _Call, task: asyncio.Task):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here, so an unawaited failure is not logged as lost
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        if not self._enabled:
+            self._started += 1
+            return await fn()
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task, key=key, call=call: self._done(key, call, task))
+            self._started += 1
+        else:
+            self._coalesced += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Last one out: detach first so a newcomer starts afresh instead
+                # of joining a task that is about to raise CancelledError.
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+                self._cancelled += 1
+            raise
+        finally:
+            call.waiters -= 1
+
+    def forget(self, match: Callable[[Hashable], bool]):
+        """Detach in-flight calls whose key matches; their current waiters still
+        get the result, later callers start a new call."""
+        for key in [k for k in self._calls if match(k)]:
+            del self._calls[key]
+
+    def stats(self) -> Dict[str, Any]:
+        total = self._started + self._coalesced
+        return {
+            "enabled": self._enabled,
+            "inflight": len(self._calls),
+            "started": self._started,
+            "coalesced": self._coalesced,
+            "cancelled": self._cancelled,
+            "coalesced_ratio": round(self._coalesced / total, 4) if total else 0.0,
+        }
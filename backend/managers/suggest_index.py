@@ -0,0 +1,125 @@
+import sys
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+class PrefixIndex:
+    """Case-insensitive sorted index of distinct values with reference counts.
+
+    ``_keys`` holds each value casefolded, sorted, with ``_values`` parallel to
+    it, so a prefix lookup is a bisect plus a short forward scan. Parallel
+    lists rather than a list of tuples save a tuple object per value.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._values: List[str] = []
+        self._counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_counts(cls, counts: Dict[str, int]) -> "PrefixIndex":
+        index = cls()
+        entries = sorted((v.casefold(), v) for v, n in counts.items() if n > 0)
+        index._keys = [k for k, _ in entries]
+        index._values = [v for _, v in entries]
+        index._counts = {v: counts[v] for v in index._values}
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _position(self, key: str, value: str) -> int:
+        i = bisect_left(self._keys, key)
+        while i < len(self._keys) and self._keys[i] == key and self._values[i] < value:
+            i += 1
+        return i
+
+    def add(self, value: str, n: int = 1):
+        count = self._counts.get(value, 0)
+        if count == 0:
+            key = value.casefold()
+            i = self._position(key, value)
+            self._keys.insert(i, key)
+            self._values.insert(i, value)
+        self._counts[value] = count + n
+
+    def remove(self, value: str, n: int = 1):
+        count = self._counts.get(value, 0)
+        if count == 0:
+            return
+        if count > n:
+            self._counts[value] = count - n
+            return
+        del self._counts[value]
+        i = self._position(value.casefold(), value)
+        if i < len(self._values) and self._values[i] == value:
+            del self._keys[i]
+            del self._values[i]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Up to ``limit`` values starting with ``prefix``, alphabetically."""
+        folded = prefix.casefold()
+        out: List[Dict[str, Any]] = []
+        i = bisect_left(self._keys, folded)
+        while i < len(self._keys) and len(out) < limit:
+            if not self._keys[i].startswith(folded):
+                break
+            value = self._values[i]
+            out.append({"value": value, "count": self._counts[value]})
+            i += 1
+        return out
+
+    def memory_bytes(self) -> int:
+        """Approximate heap size of the index (lists, dict and strings)."""
+        size = sys.getsizeof(self._keys) + sys.getsizeof(self._values) + sys.getsizeof(self._counts)
+        for key, value in zip(self._keys, self._values):
+            size += sys.getsizeof(value)
+            if key != value:
+                size += sys.getsizeof(key)
+        return size
+
+class BookSuggestions:
+    """One PrefixIndex per suggestable book field, kept in step with writes."""
+
+    FIELDS = ("title", "author", "genre", "username")
+
+    def __init__(self):
+        self._indexes = {f: PrefixIndex() for f in self.FIELDS}
+        self.ready = False
+
+    @staticmethod
+    def _value(doc: Optional[Dict[str, Any]], field: str) -> Optional[str]:
+        value = (doc or {}).get(field)
+        if not isinstance(value, str):
+            return None
+        value = value.strip()
+        return value or None
+
+    def load(self, field: str, counts: Iterable[Tuple[Any, int]]):
+        merged: Dict[str, int] = {}
+        for value, n in counts:
+            value = self._value({field: value}, field)
+            if value is not None:
+                merged[value] = merged.get(value, 0) + n
+        self._indexes[field] = PrefixIndex.from_counts(merged)
+
+    def apply(self, before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]]):
+        """Move counts from a document's old field values to its new ones."""
+        for field, index in self._indexes.items():
+            old, new = self._value(before, field), self._value(after, field)
+            if old == new:
+                continue
+            if old is not None:
+                index.remove(old)
+            if new is not None:
+                index.add(new)
+
+    def suggest(self, field: str, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        return self._indexes[field].suggest(prefix.strip(), limit)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "fields": {
+                f: {"values": len(i), "bytes": i.memory_bytes()} for f, i in self._indexes.items()
+            },
+        }
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from databases.views_repository import BookViewsRepository
+
+log = logging.getLogger(__name__)
+
+# Resolves ranked book ids to list-view summaries, dropping ones that no longer exist.
+ResolveFn = Callable[[List[str]], Awaitable[List[Dict[str, Any]]]]
+
+class TrendingTracker:
+    """Time-decayed "trending" ranking built from bucketed view events.
+
+    Views are counted in memory per (book, bucket) and written as one bulk
+    upsert per flush. A background task flushes and then recomputes the top
+    ``max_items`` books every ``interval`` seconds; between recomputes the
+    ranking is served from memory, so reads cost only the page they return.
+    """
+
+    def __init__(
+        self,
+        repo: BookViewsRepository,
+        resolve: ResolveFn,
+        *,
+        interval: float = 60.0,
+        bucket_seconds: int = 3600,
+        half_life_hours: float = 24.0,
+        window_hours: float = 72.0,
+        max_items: int = 100,
+    ):
+        self._repo = repo
+        self._resolve = resolve
+        self._interval = interval
+        self._bucket_seconds = bucket_seconds
+        self._half_life = half_life_hours * 3600
+        self._window = timedelta(hours=window_hours)
+        self._max_items = max_items
+        self._pending: Dict[Tuple[str, datetime], int] = {}
+        self._items: List[Dict[str, Any]] = []
+        self._computed_at: Optional[datetime] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._lock = asyncio.Lock()
+
+    def _bucket(self, now: datetime) -> datetime:
+        ts = int(now.timestamp()) // self._bucket_seconds * self._bucket_seconds
+        return datetime.fromtimestamp(ts, timezone.utc)
+
+    def record(self, book_id: str, n: int = 1):
+        key = (book_id, self._bucket(datetime.now(timezone.utc)))
+        self._pending[key] = self._pending.get(key, 0) + n
+
+    def forget(self, book_id: str):
+        """Drop a deleted book from the pending counts and the current ranking."""
+        self._pending = {k: n for k, n in self._pending.items() if k[0] != book_id}
+        self._items = [d for d in self._items if d.get("id") != book_id]
+
+    def top(self, limit: int) -> List[Dict[str, Any]]:
+        return self._items[:limit]
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._repo.bulk_add(batch)
+        except Exception:
+            log.exception("trending flush failed; keeping %d buckets pending", len(batch))
+            for key, n in batch.items():
+                self._pending[key] = self._pending.get(key, 0) + n
+
+    async def recompute(self):
+        async with self._lock:
+            await self.flush()
+            now = datetime.now(timezone.utc)
+            rows = await self._repo.top_scores(
+                since=now - self._window, now=now, half_life_seconds=self._half_life, limit=self._max_items
+            )
+            scores = {r["id"]: r["score"] for r in rows}
+            items = await self._resolve(list(scores))
+            for d in items:
+                d["score"] = round(scores[d["id"]], 4)
+            self._items = items
+            self._computed_at = now
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await self.recompute()
+            except Exception:
+                log.exception("trending recompute failed; serving the previous ranking")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Same shutdown handshake as ViewCounter.stop().
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending_buckets": len(self._pending),
+            "ranked": len(self._items),
+            "computed_at": self._computed_at.isoformat() if self._computed_at else None,
+        }
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+# Writes a batch of deltas; returns the part the store rejected.
+FlushFn = Callable[[Dict[str, int]], Awaitable[Dict[str, int]]]
+FlushedFn = Callable[[Dict[str, int]], Awaitable[None]]
+
+class ViewCounter:
+    """Write-behind buffer for book view increments.
+
+    Views are counted in memory per worker and written periodically as one
+    bulk ``$inc`` per book, so a hot review no longer costs a write per read.
+    A flush is also triggered early once ``max_buffered`` views are pending,
+    and once more on shutdown. Rejected deltas are buffered again; the rest
+    stop counting as pending before ``flushed`` (cache invalidation) runs.
+    """
+
+    def __init__(
+        self,
+        flush: FlushFn,
+        *,
+        flushed: Optional[FlushedFn] = None,
+        interval: float = 2.0,
+        max_buffered: int = 1000,
+    ):
+        self._flush_fn = flush
+        self._flushed_fn = flushed
+        self._interval = interval
+        self._max_buffered = max_buffered
+        self._buffered: Dict[str, int] = {}
+        self._inflight: Dict[str, int] = {}
+        self._total = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._lock = asyncio.Lock()
+
+    def add(self, book_id: str, n: int = 1) -> int:
+        """Record n views and return everything not yet persisted for the book."""
+        self._buffered[book_id] = self._buffered.get(book_id, 0) + n
+        self._total += n
+        if self._total >= self._max_buffered:
+            self._wake.set()
+        return self.pending(book_id)
+
+    def pending(self, book_id: str) -> int:
+        return self._buffered.get(book_id, 0) + self._inflight.get(book_id, 0)
+
+    def discard(self, book_id: str):
+        """Forget buffered views for a deleted book."""
+        self._total -= self._buffered.pop(book_id, 0)
+
+    async def flush(self):
+        async with self._lock:
+            if not self._buffered:
+                return
+            batch, self._buffered, self._total = self._buffered, {}, 0
+            self._inflight = batch
+            try:
+                failed = await self._flush_fn(batch)
+            except Exception:
+                log.exception("view counter flush failed; keeping %d books buffered", len(batch))
+                failed = batch
+            else:
+                if failed:
+                    log.warning("view counter flush rejected %d books; keeping them buffered", len(failed))
+            finally:
+                self._inflight = {}
+            for book_id, n in failed.items():
+                self._buffered[book_id] = self._buffered.get(book_id, 0) + n
+                self._total += n
+            written = {book_id: n for book_id, n in batch.items() if book_id not in failed}
+            if written and self._flushed_fn is not None:
+                await self._flushed_fn(written)
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # Signal rather than cancel: wait_for() can swallow a cancellation that
+        # races with the wake event, which would leave stop() hanging.
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        return {"buffered_views": self._total, "buffered_books": len(self._buffered)}
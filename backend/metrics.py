@@ -0,0 +1,222 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from pymongo import monitoring
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED = "<unmatched>"
+
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+StatsFn = Callable[[], Dict[str, Any]]
+
+class _Instrument:
+    """Counts, times and tracks in-flight HTTP requests per route template.
+
+    Requests are labelled with the route's path ("/books/{book_id}"), never
+    the raw URL, so ids do not multiply series; paths no route matches share
+    ``<unmatched>``. Streams stay in flight (and keep timing) until they close.
+    """
+
+    def __init__(self, app: ASGIApp, *, metrics: "Metrics"):
+        self.app = app
+        self.metrics = metrics
+        self._routes: Optional[List[Tuple[Pattern[str], str]]] = None
+
+    def _route(self, scope: Scope) -> str:
+        if self._routes is None:
+            # Built on the first request, once every route is registered.
+            self._routes = [(r.path_regex, r.path) for r in scope["app"].router.routes if hasattr(r, "path_regex")]
+        path = scope["path"]
+        for regex, template in self._routes:
+            if regex.match(path):
+                return template
+        return UNMATCHED
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        m = self.metrics
+        method, route = scope["method"], self._route(scope)
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = m.http_in_progress.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            m.http_duration.labels(method, route).observe(time.perf_counter() - start)
+            m.http_requests.labels(method, route, str(status)).inc()
+            in_progress.dec()
+
+class _CommandMetrics(monitoring.CommandListener):
+    """Per-command, per-collection MongoDB counts and latencies.
+
+    pymongo calls listeners from Motor's worker threads; the started event's
+    collection is parked under its request id until the reply arrives.
+    """
+
+    def __init__(self, commands: Counter, duration: Histogram):
+        self._commands = commands
+        self._duration = duration
+        self._collections: Dict[Tuple[int, Any], str] = {}
+
+    @staticmethod
+    def _collection(event) -> str:
+        target = event.command.get(event.command_name)
+        if event.command_name == "getMore":
+            target = event.command.get("collection")
+        return target if isinstance(target, str) else ""
+
+    def started(self, event):
+        self._collections[(event.request_id, event.connection_id)] = self._collection(event)
+
+    def _finished(self, event, outcome: str):
+        collection = self._collections.pop((event.request_id, event.connection_id), "")
+        self._commands.labels(event.command_name, collection, outcome).inc()
+        self._duration.labels(event.command_name, collection).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+class _StatsCollector:
+    """Publishes the ``/stats/*`` snapshots as gauges at scrape time."""
+
+    def __init__(self, prefix: str):
+        self._prefix = prefix
+        self._sources: Dict[Tuple[str, Optional[str]], StatsFn] = {}
+
+    def add(self, name: str, fn: StatsFn, label: Optional[str] = None):
+        self._sources[(name, label)] = fn
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        for (name, label), fn in list(self._sources.items()):
+            rows = fn().items() if label else [(None, fn())]
+            families: Dict[str, GaugeMetricFamily] = {}
+            for label_value, stats in rows:
+                for key, value in stats.items():
+                    # Only numbers become samples; modes and nested maps are skipped.
+                    if not isinstance(value, (int, float)):
+                        continue
+                    metric = f"{self._prefix}_{name}_{key}"
+                    family = families.get(metric)
+                    if family is None:
+                        family = families[metric] = GaugeMetricFamily(
+                            metric, f"{name} {key}", labels=[label] if label else None
+                        )
+                    family.add_metric([label_value] if label else [], float(value))
+            yield from families.values()
+
+class _LoopLag:
+    """Samples event-loop lag: how late a timer due every ``interval`` fires."""
+
+    def __init__(self, histogram: Histogram, *, interval: float = 0.5):
+        self._histogram = histogram
+        self._interval = interval
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            start = loop.time()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                self._histogram.observe(max(loop.time() - start - self._interval, 0.0))
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            # Metrics outlives an app's lifespan; each start may be on a new loop.
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+class Metrics:
+    """Prometheus metrics for one process, in a registry of their own.
+
+    ``instrument`` adds the HTTP middleware, ``mongo`` is a CommandListener for
+    MongoPool, ``add_stats`` publishes a stats() dict and ``render`` returns
+    the exposition text. Each worker reports only itself.
+    """
+
+    def __init__(self, *, prefix: str = "tome", lag_interval: float = 0.5):
+        self.registry = CollectorRegistry()
+        self.http_requests = Counter(
+            "http_requests_total", "HTTP requests", ["method", "route", "status"], registry=self.registry
+        )
+        self.http_duration = Histogram(
+            "http_request_duration_seconds",
+            "HTTP request latency, first byte in to last byte out",
+            ["method", "route"],
+            registry=self.registry,
+        )
+        self.http_in_progress = Gauge(
+            "http_requests_in_progress", "HTTP requests being served", ["method", "route"], registry=self.registry
+        )
+        self.mongo = _CommandMetrics(
+            Counter(
+                "mongodb_commands_total",
+                "MongoDB commands",
+                ["command", "collection", "outcome"],
+                registry=self.registry,
+            ),
+            Histogram(
+                "mongodb_command_duration_seconds",
+                "MongoDB command latency as seen by the driver",
+                ["command", "collection"],
+                buckets=MONGO_BUCKETS,
+                registry=self.registry,
+            ),
+        )
+        self._loop_lag = _LoopLag(
+            Histogram(
+                "event_loop_lag_seconds",
+                "How late a periodic event-loop timer fired",
+                buckets=LAG_BUCKETS,
+                registry=self.registry,
+            ),
+            interval=lag_interval,
+        )
+        self._stats = _StatsCollector(prefix)
+        self.registry.register(self._stats)
+
+    def instrument(self, app: Any):
+        app.add_middleware(_Instrument, metrics=self)
+
+    def add_stats(self, name: str, fn: StatsFn, *, label: Optional[str] = None):
+        """Publish ``fn()``'s numeric values as ``<prefix>_<name>_<key>`` gauges.
+        With ``label``, ``fn`` returns ``{label value: stats}`` instead."""
+        self._stats.add(name, fn, label)
+
+    def start(self):
+        self._loop_lag.start()
+
+    async def stop(self):
+        await self._loop_lag.stop()
+
+    def render(self) -> bytes:
+        return generate_latest(self.registry)
@@ -0,0 +1,52 @@
+"""Backfill books.comment_count from the comments collection.
+
+CommentsManager keeps the count current from then on. Recomputes every book's
+count with one $group over comments, so it is also the repair tool if counts
+ever drift. Safe to re-run.
+
+    MONGO_URI=mongodb://localhost:27017 python -m migrations.books_comment_count
+"""
+import argparse
+import asyncio
+import os
+
+from bson import ObjectId
+from pymongo import UpdateMany, UpdateOne
+
+from databases.mongo import MongoPool
+
+async def backfill(books, comments, *, batch_size: int) -> int:
+    ops = [UpdateMany({}, {"$set": {"comment_count": 0}})]
+    updated = 0
+    async for row in comments.aggregate([{"$group": {"_id": "$book_id", "n": {"$sum": 1}}}]):
+        if not isinstance(row["_id"], str) or not ObjectId.is_valid(row["_id"]):
+            continue
+        ops.append(UpdateOne({"_id": ObjectId(row["_id"])}, {"$set": {"comment_count": row["n"]}}))
+        if len(ops) >= batch_size:
+            await books.bulk_write(ops, ordered=True)
+            updated += len(ops)
+            ops = []
+    if ops:
+        await books.bulk_write(ops, ordered=True)
+        updated += len(ops)
+    return updated
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb"))
+    ap.add_argument("--books", default=os.environ.get("MONGO_COLLECTION", "books"))
+    ap.add_argument("--comments", default=os.environ.get("MONGO_COMMENTS", "comments"))
+    ap.add_argument("--batch-size", type=int, default=1000)
+    args = ap.parse_args()
+
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    try:
+        n = await backfill(pool.collection(args.books), pool.collection(args.comments), batch_size=args.batch_size)
+        print(f"comment_count: {n} write(s) applied")
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
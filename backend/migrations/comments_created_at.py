@@ -0,0 +1,128 @@
+"""Backfill comments.created_at and move threads onto the (created_at, _id) indexes.
+
+Comments used to carry only the client-supplied ``date_and_time`` string. This
+migration gives every comment a native BSON ``created_at``: parsed from that
+string when it is in a known format, else the creation time embedded in the
+ObjectId. It then drops the old string-keyed indexes, creates the new ones and
+checks with explain() that a thread page is served from the index without an
+in-memory sort. Safe to re-run.
+
+    MONGO_URI=mongodb://localhost:27017 python -m migrations.comments_created_at [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from pymongo import UpdateOne
+
+from databases.comment_repository import CommentsRepository
+from databases.mongo import MongoPool
+
+# Formats produced by the SPA's Date.toLocaleString() in common locales, and ISO.
+DATE_FORMATS = (
+    "%m/%d/%Y, %I:%M:%S %p",
+    "%d/%m/%Y, %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d.%m.%Y, %H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+)
+
+def parse_date_and_time(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip().replace("\u202f", " ")  # newer browsers put a narrow space before AM/PM
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            # Browser-local time with no offset recorded; treated as UTC.
+            return datetime.strptime(text, fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+def _walk(plan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield plan
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            yield from _walk(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _walk(child)
+
+def _check_plan(explain: Dict[str, Any], index_name: str) -> bool:
+    winning = explain.get("queryPlanner", {}).get("winningPlan", {})
+    stages = list(_walk(winning))
+    uses_index = any(s.get("stage") == "IXSCAN" and s.get("indexName") == index_name for s in stages)
+    sorts = any(s.get("stage") == "SORT" for s in stages)
+    return uses_index and not sorts
+
+async def backfill(coll, *, batch_size: int, dry_run: bool) -> Dict[str, int]:
+    counts = {"parsed": 0, "from_object_id": 0}
+    ops = []
+    cursor = coll.find({"created_at": {"$exists": False}}, {"date_and_time": 1}, batch_size=batch_size)
+    async for doc in cursor:
+        created = parse_date_and_time(doc.get("date_and_time"))
+        if created is None:
+            created = doc["_id"].generation_time
+            counts["from_object_id"] += 1
+        else:
+            counts["parsed"] += 1
+        ops.append(UpdateOne({"_id": doc["_id"], "created_at": {"$exists": False}}, {"$set": {"created_at": created}}))
+        if len(ops) >= batch_size:
+            if not dry_run:
+                await coll.bulk_write(ops, ordered=False)
+            ops = []
+    if ops and not dry_run:
+        await coll.bulk_write(ops, ordered=False)
+    return counts
+
+async def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--uri", default=os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+    ap.add_argument("--db", default=os.environ.get("MONGO_DB_NAME", "booksdb"))
+    ap.add_argument("--collection", default=os.environ.get("MONGO_COMMENTS", "comments"))
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    pool = MongoPool(args.uri, args.db)
+    await pool.connect()
+    try:
+        coll = pool.collection(args.collection)
+        counts = await backfill(coll, batch_size=args.batch_size, dry_run=args.dry_run)
+        print(f"created_at backfill: {counts['parsed']} parsed, {counts['from_object_id']} from ObjectId time"
+              + (" (dry run)" if args.dry_run else ""))
+        if args.dry_run:
+            return
+
+        existing = await coll.index_information()
+        for name in CommentsRepository.LEGACY_INDEXES:
+            if name in existing:
+                await coll.drop_index(name)
+                print(f"dropped index {name}")
+        await coll.create_indexes(CommentsRepository.INDEXES)
+
+        ok = True
+        for field, index_name in (("book_id", "book_id_created_at"), ("username", "username_created_at")):
+            sample = await coll.find_one({field: {"$exists": True}}, {field: 1})
+            if not sample:
+                continue
+            cursor = coll.find({field: sample[field]}).sort([("created_at", -1), ("_id", -1)]).limit(20)
+            good = _check_plan(await cursor.explain(), index_name)
+            ok = ok and good
+            print(f"explain {field} thread page: {'index scan, no sort' if good else 'NOT COVERED'}")
+        if not ok:
+            raise SystemExit(1)
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
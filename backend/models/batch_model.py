@@ -0,0 +1,21 @@
+# ===== batch_model.py =====
+from typing import List
+from pydantic import BaseModel, Field
+
+# Incoming bodies for the POST /<collection>/batch lookups
+class BatchIds(BaseModel):
+    ids: List[str] = Field(..., min_length=1)
+
+class BatchUsernames(BaseModel):
+    usernames: List[str] = Field(..., min_length=1)
+
+# Outcome of an NDJSON bulk import; line numbers are 1-based
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportReport(BaseModel):
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
@@ -1,6 +1,7 @@
 # ===== books_model.py =====
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, ConfigDict
+from models.comment_model import CommentPage
 
 # Shared fields
 class BookBase(BaseModel):
@@ -28,4 +29,68 @@ class BookUpdate(BaseModel):
 class BookOut(BookBase):
     id: str = Field(..., description="Stringified ObjectId")
     views: int = 0
+    comment_count: int = 0
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+# List views: everything but the review body
+class BookSummary(BaseModel):
+    id: str = Field(..., description="Stringified ObjectId")
+    username: Optional[str] = None
+    title: Optional[str] = None
+    author: Optional[str] = None
+    year: Optional[int] = None
+    genre: Optional[str] = None
+    image: Optional[str] = None
+    views: Optional[int] = None
+    comment_count: Optional[int] = None
+    # Only set by /books/recommended?mode=trending (decayed views) and /books/{id}/similar (cosine)
+    score: Optional[float] = None
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+# Query for the paged list endpoint
+class BookQuery(BaseModel):
+    q: Optional[str] = None
+    author: Optional[str] = None
+    genre: Optional[str] = None
+    username: Optional[str] = None
+    year_min: Optional[int] = Field(default=None, ge=0)
+    year_max: Optional[int] = Field(default=None, ge=0)
+    has_cover: Optional[bool] = None
+    # "relevance" ranks text-search matches; only /books/search uses it
+    sort: Literal["created", "title", "year", "views", "relevance"] = "created"
+    order: Literal["asc", "desc"] = "asc"
+    limit: int = Field(default=24, ge=1)
+    cursor: Optional[str] = None
+    fields: Optional[List[str]] = None
+
+class Suggestion(BaseModel):
+    value: str
+    count: int
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class BookFacets(BaseModel):
+    total: int = 0
+    authors: List[FacetCount] = []
+    genres: List[FacetCount] = []
+    usernames: List[FacetCount] = []
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    with_cover: int = 0
+    without_cover: int = 0
+
+# Book page in one response: the book, its first comments and their total
+class BookDetail(BaseModel):
+    book: BookOut
+    comments: CommentPage
+    comment_count: int = 0
+
+class BookBatch(BaseModel):
+    items: List[BookOut]
+    missing: List[str] = []
+
+class BookPage(BaseModel):
+    items: List[BookSummary]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as ?cursor= to fetch the next page")
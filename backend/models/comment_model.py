@@ -1,5 +1,7 @@
 # ===== models/comment_model.py =====
-from pydantic import BaseModel, ConfigDict
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 class CommentBase(BaseModel):
     username: str
@@ -11,7 +13,19 @@ class CommentCreate(CommentBase):
     pass
 
 class CommentOut(BaseModel):
+    id: str = Field(..., description="Stringified ObjectId")
+    book_id: Optional[str] = None
     username: str
     comment: str
     date_and_time: str
+    # Server-assigned; comment threads are ordered by (created_at, id)
+    created_at: Optional[datetime] = None
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+class CommentPage(BaseModel):
+    items: List[CommentOut]
+    next_cursor: Optional[str] = Field(default=None, description="Pass as ?cursor= to fetch the next page")
+
+class CommentBatch(BaseModel):
+    items: List[CommentOut]
+    missing: List[str] = []
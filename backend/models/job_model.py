@@ -0,0 +1,20 @@
+# ===== job_model.py =====
+from datetime import datetime
+from typing import Dict, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+# Background cascade delete, returned by DELETE /books/{id}, DELETE /profiles/{username} and GET /jobs/{id}
+class JobOut(BaseModel):
+    id: str = Field(..., description="Stringified ObjectId")
+    kind: Literal["book", "profile"]
+    target: str = Field(..., description="Book id or username being deleted")
+    # "staged" until the parent document is gone; only left behind by a crash in between
+    status: Literal["staged", "pending", "running", "done", "failed"]
+    # Documents removed so far, e.g. {"books": 3, "comments": 1200}
+    deleted: Dict[str, int] = {}
+    attempts: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
@@ -1,5 +1,5 @@
 # ===== profile_model.py =====
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field, ConfigDict
 
 class ProfileBase(BaseModel):
@@ -19,3 +19,7 @@ class ProfileOut(BaseModel):
     username: str
     google_auth_id: Optional[str] = None  
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+class ProfileBatch(BaseModel):
+    items: List[ProfileOut]
+    missing: List[str] = []
@@ -0,0 +1,79 @@
+from typing import Any, AsyncIterator, Callable, Dict
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from encoding import dumps
+from managers.comment_hub import Subscription
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+
+def wants_ndjson(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return NDJSON_MEDIA_TYPE in accept or "application/jsonl" in accept
+
+async def _ndjson(docs: AsyncIterator[Dict[str, Any]], batch_size: int) -> AsyncIterator[bytes]:
+    lines = []
+    async for doc in docs:
+        lines.append(dumps(doc))
+        if len(lines) >= batch_size:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+async def _json_array(docs: AsyncIterator[Dict[str, Any]], batch_size: int) -> AsyncIterator[bytes]:
+    parts = [b"["]
+    first = True
+    async for doc in docs:
+        parts.append(dumps(doc) if first else b"," + dumps(doc))
+        first = False
+        if len(parts) >= batch_size:
+            yield b"".join(parts)
+            parts = []
+    parts.append(b"]")
+    yield b"".join(parts)
+
+def stream_ndjson(docs: AsyncIterator[Dict[str, Any]], *, batch_size: int = 500) -> StreamingResponse:
+    """Always NDJSON, e.g. for exports meant to be fed back into an import."""
+    return StreamingResponse(_ndjson(docs, batch_size), media_type=NDJSON_MEDIA_TYPE)
+
+def stream_documents(request: Request, docs: AsyncIterator[Dict[str, Any]], *, batch_size: int = 500) -> StreamingResponse:
+    """Serialize documents as they come off the cursor.
+
+    Writes NDJSON when the client asks for it in Accept, otherwise a JSON
+    array; either way only one batch of encoded documents is held in memory.
+    """
+    if wants_ndjson(request):
+        return StreamingResponse(_ndjson(docs, batch_size), media_type=NDJSON_MEDIA_TYPE)
+    return StreamingResponse(_json_array(docs, batch_size), media_type="application/json")
+
+def _sse(name: str, data: bytes) -> bytes:
+    return b"event: " + name.encode() + b"\ndata: " + data + b"\n\n"
+
+async def _events(
+    sub: Subscription, heartbeat: float, retry_ms: int, close: Callable[[Subscription], None]
+) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: %d\n\n" % retry_ms
+        while True:
+            event = await sub.next(heartbeat)
+            if sub.evicted:
+                yield _sse("evicted", b"{}")
+                return
+            # The heartbeat comment keeps proxies from timing the stream out and
+            # surfaces dead clients as failed writes.
+            yield b": ping\n\n" if event is None else _sse(*event)
+    finally:
+        # Also runs when Starlette cancels the stream on client disconnect.
+        close(sub)
+
+def stream_events(
+    sub: Subscription, close: Callable[[Subscription], None], *, heartbeat: float = 15.0, retry_ms: int = 3000
+) -> StreamingResponse:
+    """Server-sent events from a hub subscription until the client leaves or is evicted."""
+    return StreamingResponse(
+        _events(sub, heartbeat, retry_ms, close),
+        media_type=SSE_MEDIA_TYPE,
+        # X-Accel-Buffering stops NGINX holding events back in its proxy buffer.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
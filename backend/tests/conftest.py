@@ -0,0 +1,57 @@
+"""Fixtures shared by the tests: a fresh in-memory MongoDB (mongomock-motor)
+behind every MongoPool, a counter of the commands sent to it, and a runner
+for ``async def`` tests."""
+import asyncio
+import inspect
+import os
+from collections import Counter
+
+import pytest
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+# main reads its settings at import: no similar-index snapshot on disk.
+os.environ.setdefault("SIMILAR_INDEX_PATH", "")
+os.environ.setdefault("MONGO_DB_NAME", "booksdb_test")
+
+import databases.mongo as mongo
+from databases.mongo import MongoPool
+
+# Motor collection methods that each send one MongoDB command
+MOTOR_COMMANDS = [
+    "find", "find_one", "aggregate", "count_documents", "distinct", "insert_one", "insert_many",
+    "update_one", "update_many", "replace_one", "delete_one", "delete_many", "find_one_and_update",
+    "find_one_and_delete", "find_one_and_replace", "bulk_write", "create_indexes",
+]
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem):
+    if inspect.iscoroutinefunction(pyfuncitem.obj):
+        args = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+        asyncio.run(pyfuncitem.obj(**args))
+        return True
+    return None
+
+@pytest.fixture(autouse=True)
+def memory_client(monkeypatch):
+    """One in-memory server per test, shared by every MongoPool it connects."""
+    client = mongomock_motor.AsyncMongoMockClient(tz_aware=True)
+    monkeypatch.setattr(mongo, "AsyncIOMotorClient", lambda uri, **options: client)
+    return client
+
+@pytest.fixture
+def pool() -> MongoPool:
+    """Unconnected; tests ``await pool.connect()`` on their own loop."""
+    return MongoPool("mongodb://memory", "booksdb_test")
+
+@pytest.fixture
+def ops(monkeypatch) -> Counter:
+    """Commands sent so far, by Motor method name."""
+    counts: Counter = Counter()
+    collection = mongomock_motor.AsyncMongoMockCollection
+    for name in MOTOR_COMMANDS:
+        def counted(self, *args, _name=name, _method=getattr(collection, name), **kwargs):
+            counts[_name] += 1
+            return _method(self, *args, **kwargs)
+        monkeypatch.setattr(collection, name, counted)
+    return counts
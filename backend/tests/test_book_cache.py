@@ -0,0 +1,51 @@
+import asyncio
+
+from managers.books_manager import BooksManager
+from managers.cache import MemoryCache
+from models.books_model import BookCreate
+
+async def _manager(pool) -> BooksManager:
+    await pool.connect()
+    books = BooksManager(pool, "books", view_mode="buffered", cache=MemoryCache())
+    await books.connect()
+    return books
+
+async def test_read_in_flight_during_a_write_does_not_cache_the_old_book(pool):
+    books = await _manager(pool)
+    try:
+        book = await books.create_book(BookCreate(username="alice", title="Old title"))
+        fetched, written = asyncio.Event(), asyncio.Event()
+        find_one = books._repo.find_one
+
+        async def slow_find_one(book_id):
+            doc = await find_one(book_id)
+            fetched.set()
+            await written.wait()  # the update commits and invalidates meanwhile
+            return doc
+
+        books._repo.find_one = slow_find_one
+        reader = asyncio.create_task(books.get_book(book.id))
+        await fetched.wait()
+        books._repo.find_one = find_one
+        await books.update_book(book.id, {"title": "New title"})
+        written.set()
+        assert (await reader).title == "Old title"  # it read before the write
+
+        assert (await books.get_book(book.id)).title == "New title"
+        assert (await books.get_book(book.id)).title == "New title"
+    finally:
+        await books.close()
+
+async def test_cached_book_is_served_until_written(pool, ops):
+    books = await _manager(pool)
+    try:
+        book = await books.create_book(BookCreate(username="alice", title="Cached"))
+        await books.get_book(book.id)
+        reads = ops["find_one"]
+        await books.get_book(book.id)
+        assert ops["find_one"] == reads
+        await books.update_book(book.id, {"title": "Renamed"})
+        assert (await books.get_book(book.id)).title == "Renamed"
+        assert ops["find_one"] == reads + 1
+    finally:
+        await books.close()
@@ -0,0 +1,31 @@
+from managers.books_manager import _build_filter
+from models.books_model import BookQuery
+
+AUTHORS = ["Ann Leckie", "ann leckie", "ANN LECKIE", "Anne Leckie", "Annxleckie"]
+
+async def _matching(pool, query: BookQuery, **options):
+    await pool.connect()
+    coll = pool.collection("books")
+    if not await coll.count_documents({}):
+        await coll.insert_many([{"author": a, "genre": "Sci-Fi", "username": "Bob"} for a in AUTHORS])
+    return sorted([d["author"] async for d in coll.find(_build_filter(query, **options))])
+
+async def test_uncollated_filters_match_case_insensitively(pool):
+    # /books/search cannot use BOOKS_COLLATION, so its filters must fold case themselves.
+    found = await _matching(pool, BookQuery(author=" ann leckie ", genre="sci-fi", username="BOB"), collated=False)
+    assert found == sorted(["Ann Leckie", "ann leckie", "ANN LECKIE"])
+
+async def test_uncollated_author_and_genre_match_by_prefix(pool):
+    found = await _matching(pool, BookQuery(author="ann", genre="SCI"), collated=False)
+    assert found == sorted(AUTHORS)
+    assert await _matching(pool, BookQuery(author="anne"), collated=False) == ["Anne Leckie"]
+    assert await _matching(pool, BookQuery(author="leckie"), collated=False) == []  # anchored
+
+async def test_uncollated_filters_are_escaped_and_username_exact(pool):
+    assert await _matching(pool, BookQuery(author="Ann.leckie"), collated=False) == []
+    assert await _matching(pool, BookQuery(username="bo"), collated=False) == []
+
+def test_collated_filters_are_a_prefix_range_and_username_equality():
+    assert _build_filter(BookQuery(author=" Tolk ", username=" Bob ")) == {
+        "$and": [{"author": {"$gte": "Tolk", "$lt": "Tolk\uffff"}}, {"username": "Bob"}]
+    }
@@ -0,0 +1,62 @@
+from managers.books_manager import BooksManager
+from models.books_model import BookCreate, BookQuery
+
+TITLES = ["Ember", "Anvil", "Dune", "Cinder", "Blaze"]
+
+async def _books(pool) -> BooksManager:
+    await pool.connect()
+    books = BooksManager(pool, "books")
+    await books.connect()
+    for i, title in enumerate(TITLES):
+        await books.create_book(BookCreate(username="alice", title=title, year=2000 + i, review="long " * 50))
+    return books
+
+async def _all_pages(books: BooksManager, **params):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = await books.query_books_raw(BookQuery(limit=2, cursor=cursor, **params))
+        items += page["items"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None or pages > len(TITLES):
+            return items, pages
+
+async def test_pages_sorted_on_a_field_not_selected_still_advance(pool):
+    books = await _books(pool)
+    try:
+        items, pages = await _all_pages(books, sort="title", fields=["year"])
+        assert pages == 3
+        assert [d["year"] for d in items] == [2001, 2004, 2003, 2002, 2000]  # by title
+        assert all(set(d) == {"id", "year"} for d in items)
+    finally:
+        await books.close()
+
+async def test_streamed_books_keep_only_selected_fields(pool):
+    books = await _books(pool)
+    try:
+        items = [d async for d in books.iter_books(BookQuery(sort="title", order="desc", fields=["year"]))]
+        assert [d["year"] for d in items] == [2000, 2002, 2003, 2004, 2001]
+        assert all(set(d) == {"id", "year"} for d in items)
+    finally:
+        await books.close()
+
+async def test_id_only_pages_never_fetch_whole_documents(pool):
+    books = await _books(pool)
+    projections = []
+    find_page = books._repo.find_page
+
+    async def recording(*args, **kwargs):
+        projections.append(dict(kwargs["projection"]))
+        return await find_page(*args, **kwargs)
+
+    books._repo.find_page = recording
+    try:
+        items, _ = await _all_pages(books, fields=["id"])
+        assert len(items) == len(TITLES) and all(set(d) == {"id"} for d in items)
+        assert projections and all(p == {"_id": 1} for p in projections)
+
+        projections.clear()
+        await books.query_books_raw(BookQuery(sort="views", fields=["id"]))
+        assert projections == [{"views": 1}]
+    finally:
+        await books.close()
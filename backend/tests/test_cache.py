@@ -0,0 +1,30 @@
+import pytest
+
+from managers.cache import Cache, MemoryCache, NullCache
+
+def test_backend_missing_a_method_fails_at_construction():
+    class NoStats(Cache):
+        async def get(self, key): return None
+        async def set(self, key, value, ttl=None): pass
+        async def delete(self, *keys): pass
+        async def version(self, name): return 0
+        async def bump(self, name): return 1
+
+    with pytest.raises(TypeError, match="stats"):
+        NoStats()
+
+def test_shipped_backends_are_complete():
+    assert isinstance(MemoryCache(), Cache)
+    assert isinstance(NullCache(), Cache)
+
+async def test_memory_cache_versions_and_expiry():
+    cache = MemoryCache(max_entries=2, ttl=60)
+    await cache.set("a", {"n": 1})
+    assert await cache.get("a") == {"n": 1}
+    assert await cache.bump("v") == 1
+    assert await cache.version("v") == 1
+    await cache.set("b", 2)
+    await cache.set("c", 3)
+    assert await cache.get("a") is None  # least recently used, evicted
+    await cache.set("d", 4, ttl=-1)
+    assert await cache.get("d") is None
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+
+from managers.books_manager import BooksManager
+from managers.cascade import CascadeDeleter, _now
+from managers.comment_manager import CommentsManager
+from managers.profile_manager import ProfilesManager
+from models.books_model import BookCreate
+from models.comment_model import CommentCreate
+from models.profile_model import ProfileCreate
+
+LEASE = 60
+
+@pytest.fixture
+def deleter(pool):
+    books = BooksManager(pool, "books")
+    profiles = ProfilesManager(pool, "profiles")
+    comments = CommentsManager(pool, "comments", books=books)
+    return CascadeDeleter(
+        pool, "jobs", books=books, profiles=profiles, comments=comments, batch_size=2, pause=0, lease_seconds=LEASE
+    )
+
+async def _connect(pool, deleter: CascadeDeleter):
+    await pool.connect()
+    for part in (deleter._books, deleter._profiles, deleter._comments, deleter):
+        await part.connect()
+
+async def _close(deleter: CascadeDeleter):
+    for part in (deleter, deleter._comments, deleter._profiles, deleter._books):
+        await part.close()
+
+async def _book_with_comments(deleter: CascadeDeleter, n: int, username: str = "alice") -> str:
+    book = await deleter._books.create_book(BookCreate(username=username, title="Doomed"))
+    for i in range(n):
+        await deleter._comments.create_comment(
+            CommentCreate(book_id=book.id, username="bob", comment=f"comment {i}", date_and_time="now")
+        )
+    return book.id
+
+async def test_missing_parent_discards_the_job(pool, deleter):
+    await _connect(pool, deleter)
+    try:
+        assert await deleter.delete_book("0123456789abcdef01234567") is None
+        # Books can name a username that never had a profile; they must survive.
+        await deleter._books.create_book(BookCreate(username="ghost", title="Orphan"))
+        assert await deleter.delete_profile("ghost") is None
+        assert await pool.collection("jobs").count_documents({}) == 0
+        assert await pool.collection("books").count_documents({}) == 1
+    finally:
+        await _close(deleter)
+
+async def test_job_is_not_claimable_until_the_parent_is_gone(pool, deleter):
+    await _connect(pool, deleter)
+    try:
+        book_id = await _book_with_comments(deleter, 3)
+
+        async def crash(book_id):
+            raise ConnectionError("process died")
+
+        delete_book = deleter._books.delete_book
+        deleter._books.delete_book = crash
+        with pytest.raises(ConnectionError):
+            await deleter.delete_book(book_id)
+        deleter._books.delete_book = delete_book
+
+        now = _now() + timedelta(days=1)
+        assert await deleter._repo.claim("worker", now, now + timedelta(seconds=LEASE)) is None
+        assert await deleter._books.get_book(book_id) is not None
+        assert await pool.collection("comments").count_documents({}) == 3
+    finally:
+        await _close(deleter)
+
+async def test_expired_lease_is_claimed_and_resumed(pool, deleter):
+    await _connect(pool, deleter)
+    try:
+        book_id = await _book_with_comments(deleter, 5)
+        job = await deleter.delete_book(book_id)
+        assert job.status == "pending"
+
+        # A worker claims the job and dies after one batch.
+        now = _now()
+        claimed = await deleter._repo.claim("dead", now, now + timedelta(seconds=LEASE))
+        assert claimed["id"] == job.id and claimed["attempts"] == 1
+        await deleter._comments.delete_batch_by_book(book_id, limit=2)
+        assert await deleter._repo.claim("worker", now, now + timedelta(seconds=LEASE)) is None
+
+        later = now + timedelta(seconds=LEASE + 1)
+        claimed = await deleter._repo.claim(deleter._owner, later, later + timedelta(seconds=LEASE))
+        assert claimed["id"] == job.id and claimed["attempts"] == 2
+        assert not await deleter._repo.progress(job.id, "dead", {"comments": 1}, later, later)
+
+        await deleter._handle(claimed)
+        done = await deleter.get(job.id)
+        assert done.status == "done"
+        assert done.deleted == {"comments": 3}
+        assert await pool.collection("comments").count_documents({}) == 0
+    finally:
+        await _close(deleter)
+
+async def test_profile_job_deletes_books_and_comments(pool, deleter):
+    await _connect(pool, deleter)
+    try:
+        await deleter._profiles.create_profile(ProfileCreate(username="alice", password="correct horse"))
+        await _book_with_comments(deleter, 3)
+        job = await deleter.delete_profile("alice")
+        claimed = await deleter._repo.claim(deleter._owner, _now(), _now() + timedelta(seconds=LEASE))
+        assert claimed["id"] == job.id
+        await deleter._handle(claimed)
+        assert (await deleter.get(job.id)).deleted == {"books": 1, "comments": 3}
+        assert await pool.collection("books").count_documents({}) == 0
+    finally:
+        await _close(deleter)
@@ -0,0 +1,34 @@
+from managers.books_manager import BooksManager
+from managers.cache import MemoryCache
+from managers.comment_manager import CommentsManager
+from models.books_model import BookCreate, BookQuery
+from models.comment_model import CommentCreate
+
+async def test_comment_writes_refresh_the_book_but_not_every_list_page(pool):
+    await pool.connect()
+    cache = MemoryCache()
+    books = BooksManager(pool, "books", view_mode="buffered", cache=cache)
+    comments = CommentsManager(pool, "comments", books=books, cache=cache)
+    await books.connect()
+    await comments.connect()
+    try:
+        book = await books.create_book(BookCreate(username="alice", title="Talked about"))
+        await books.get_book(book.id)
+        await books.list_books_by_user("alice")
+        page = await books.query_books_raw(BookQuery())
+        version = await books.list_version()
+
+        comment = await comments.create_comment(
+            CommentCreate(book_id=book.id, username="bob", comment="Great", date_and_time="now")
+        )
+        assert await books.list_version() == version
+        assert (await books.query_books_raw(BookQuery())) == page  # still cached, count may lag
+        assert (await books.get_book(book.id)).comment_count == 1
+        assert [b.comment_count for b in await books.list_books_by_user("alice")] == [1]
+
+        await comments.delete_comment(comment.id)
+        assert await books.list_version() == version
+        assert (await books.get_book(book.id)).comment_count == 0
+    finally:
+        await comments.close()
+        await books.close()
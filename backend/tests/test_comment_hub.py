@@ -0,0 +1,141 @@
+import asyncio
+import json
+
+import pytest
+
+from managers.comment_hub import ChangeFeed, CommentHub, HubFullError
+
+async def _drain(sub):
+    events = []
+    while (event := await sub.next(timeout=0)) is not None:
+        events.append((event[0], json.loads(event[1])))
+    return events
+
+async def test_events_reach_only_the_books_subscribers():
+    hub = CommentHub()
+    a, b = hub.subscribe("a"), hub.subscribe("b")
+    hub.publish("a", "created", {"id": "1"})
+    hub.publish("c", "created", {"id": "2"})
+    assert await _drain(a) == [("created", {"id": "1"})]
+    assert await _drain(b) == []
+    assert hub.stats()["published"] == 2 and hub.stats()["delivered"] == 1
+
+async def test_slow_subscriber_is_evicted_without_holding_back_the_rest():
+    hub = CommentHub(max_queue=3)
+    slow, fast = hub.subscribe("a"), hub.subscribe("a")
+    for i in range(4):
+        hub.publish("a", "created", {"id": str(i)})
+        assert len(await _drain(fast)) == 1
+    assert slow.evicted
+    hub.publish("a", "created", {"id": "4"})
+    assert await slow.next(timeout=1) is None  # returns at once, nothing buffered
+    assert not fast.evicted
+    assert await _drain(fast) == [("created", {"id": "4"})]
+    assert hub.stats() == {"subscribers": 1, "books": 1, "published": 5, "delivered": 8, "evicted": 1}
+
+async def test_queue_never_exceeds_max_queue():
+    hub = CommentHub(max_queue=2)
+    sub = hub.subscribe("a")
+    hub.publish("a", "created", {"id": "1"})
+    hub.publish("a", "created", {"id": "2"})
+    assert not sub.evicted
+    hub.broadcast("deleted", {"id": "1"})
+    assert sub.evicted
+    assert await _drain(sub) == []
+
+async def test_subscriber_cap():
+    hub = CommentHub(max_subscribers=2)
+    first = hub.subscribe("a")
+    hub.subscribe("b")
+    with pytest.raises(HubFullError):
+        hub.subscribe("c")
+    hub.unsubscribe(first)
+    hub.unsubscribe(first)  # twice is harmless
+    hub.subscribe("c")
+    assert hub.stats()["subscribers"] == 2
+
+async def test_idle_subscriber_times_out():
+    sub = CommentHub().subscribe("a")
+    assert await sub.next(timeout=0.01) is None
+    assert not sub.evicted
+
+class FakeStream:
+    def __init__(self, changes, fail_after=None):
+        self._changes = list(changes)
+        self._fail_after = fail_after
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        if self._fail_after is not None and self._fail_after == 0:
+            raise ConnectionError("stream dropped")
+        if not self._changes:
+            await asyncio.sleep(0.001)
+            return None
+        if self._fail_after is not None:
+            self._fail_after -= 1
+        change = self._changes.pop(0)
+        self.resume_token = change["_id"]
+        return change
+
+class FakeRepo:
+    """Stands in for CommentsRepository.watch(); each call opens the next stream."""
+
+    def __init__(self, *streams):
+        self._streams = list(streams)
+        self.resumed_after = []
+
+    def watch(self, *, resume_after=None):
+        self.resumed_after.append(resume_after)
+        return self._streams.pop(0) if self._streams else FakeStream([])
+
+def _insert(n, book_id):
+    return {"_id": {"t": n}, "operationType": "insert", "fullDocument": {"_id": str(n), "book_id": book_id}}
+
+def _delete(n, book_id=None):
+    change = {"_id": {"t": n}, "operationType": "delete", "documentKey": {"_id": str(n)}}
+    if book_id:
+        change["fullDocumentBeforeChange"] = {"_id": str(n), "book_id": book_id}
+    return change
+
+async def _until(predicate):
+    for _ in range(500):
+        if predicate():
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError("timed out")
+
+async def test_change_feed_routes_inserts_and_deletes():
+    hub = CommentHub()
+    a, b = hub.subscribe("a"), hub.subscribe("b")
+    repo = FakeRepo(FakeStream([_insert(1, "a"), _delete(1, "a"), _delete(2)]))
+    feed = ChangeFeed(repo, hub, lambda doc: {"id": doc["_id"]}, retry=0.01)
+    feed.start()
+    try:
+        await _until(lambda: hub.stats()["published"] == 3)
+    finally:
+        await feed.stop()
+    assert await _drain(a) == [
+        ("created", {"id": "1"}),
+        ("deleted", {"id": "1", "book_id": "a"}),
+        ("deleted", {"id": "2"}),
+    ]
+    assert await _drain(b) == [("deleted", {"id": "2"})]  # no pre-image: broadcast
+
+async def test_change_feed_resumes_after_an_error():
+    hub = CommentHub()
+    sub = hub.subscribe("a")
+    repo = FakeRepo(FakeStream([_insert(1, "a"), _insert(2, "a")], fail_after=1), FakeStream([_insert(2, "a")]))
+    feed = ChangeFeed(repo, hub, lambda doc: {"id": doc["_id"]}, retry=0.01)
+    feed.start()
+    try:
+        await _until(lambda: hub.stats()["published"] == 2)
+    finally:
+        await feed.stop()
+    assert repo.resumed_after[:2] == [None, {"t": 1}]
+    assert [data["id"] for _, data in await _drain(sub)] == ["1", "2"]
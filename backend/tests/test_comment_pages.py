@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from managers.comment_manager import CommentsManager
+
+BOOK = "0123456789abcdef01234567"
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+def _created_at():
+    """Old rows the comments_created_at migration left undated (null or no
+    field), runs of equal timestamps, and distinct ones, in shuffled order."""
+    pattern = [None, T0, "missing", T0 + timedelta(hours=1), T0, None, T0 + timedelta(hours=1), T0, "missing", None]
+    return pattern + [T0 + timedelta(minutes=i) for i in (30, 5, 5, 90, 0)]
+
+async def _thread(pool):
+    await pool.connect()
+    docs = []
+    for i, created_at in enumerate(_created_at()):
+        doc = {"_id": ObjectId(), "book_id": BOOK, "username": "alice", "comment": f"c{i}", "date_and_time": "then"}
+        if created_at != "missing":
+            doc["created_at"] = created_at
+        docs.append(doc)
+    await pool.collection("comments").insert_many(docs)
+    comments = CommentsManager(pool, "comments")
+    await comments.connect()
+    return comments, docs
+
+def _expected(docs, newest_first):
+    # MongoDB sorts null and missing before every date.
+    def key(d):
+        created_at = d.get("created_at")
+        return (created_at is not None, created_at or T0, d["_id"])
+
+    return [str(d["_id"]) for d in sorted(docs, key=key, reverse=newest_first)]
+
+@pytest.mark.parametrize("newest_first", [True, False])
+@pytest.mark.parametrize("limit", [1, 2, 3, 4])
+async def test_thread_pages_have_no_gaps_or_duplicates(pool, newest_first, limit):
+    comments, docs = await _thread(pool)
+    try:
+        seen, cursor = [], None
+        for _ in range(len(docs) + 1):
+            page = await comments.list_comments_by_book(BOOK, limit=limit, cursor=cursor, newest_first=newest_first)
+            assert len(page.items) <= limit
+            seen += [c.id for c in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == _expected(docs, newest_first)
+    finally:
+        await comments.close()
+
+@pytest.mark.parametrize("newest_first", [True, False])
+async def test_user_pages_and_stream_agree(pool, newest_first):
+    comments, docs = await _thread(pool)
+    try:
+        seen, cursor = [], None
+        while True:
+            page = await comments.list_comments_by_user("alice", limit=4, cursor=cursor, newest_first=newest_first)
+            seen += [c.id for c in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == _expected(docs, newest_first)
+
+        # A stream resumed from the first page's cursor picks up exactly where it ended.
+        first = await comments.list_comments_by_user("alice", limit=4, newest_first=newest_first)
+        rest = comments.iter_comments_by_user("alice", cursor=first.next_cursor, newest_first=newest_first, batch_size=3)
+        assert [c.id for c in first.items] + [d["id"] async for d in rest] == seen
+    finally:
+        await comments.close()
@@ -0,0 +1,71 @@
+import gzip
+import json
+
+import pytest
+
+import main
+from benchmarks.asgi import request
+
+@pytest.fixture
+def app(monkeypatch):
+    # A list ETag also rolls over every LIST_ETAG_WINDOW seconds; keep it still.
+    monkeypatch.setattr(main, "LIST_ETAG_WINDOW", 1e9)
+    return main.app
+
+async def test_book_list_revalidates_without_mongo(app, ops):
+    async with app.router.lifespan_context(app):
+        status, _, _ = await request(app, "POST", "/books", json={"username": "alice", "title": "First"})
+        assert status == 201
+        status, headers, body = await request(app, "GET", "/books")
+        assert status == 200 and body
+        etag = headers["etag"]
+
+        before = sum(ops.values())
+        status, headers, body = await request(app, "GET", "/books", headers={"If-None-Match": etag})
+        assert status == 304
+        assert body == b""
+        assert headers["etag"] == etag
+        assert sum(ops.values()) == before
+
+        await request(app, "POST", "/books", json={"username": "alice", "title": "Second"})
+        status, headers, _ = await request(app, "GET", "/books", headers={"If-None-Match": etag})
+        assert status == 200
+        assert headers["etag"] != etag
+
+async def test_book_update_changes_the_list_etag(app):
+    async with app.router.lifespan_context(app):
+        _, _, body = await request(app, "POST", "/books", json={"username": "alice", "title": "Draft"})
+        book_id = json.loads(body)["id"]
+        _, headers, _ = await request(app, "GET", "/books")
+        status, _, _ = await request(app, "PUT", f"/books/{book_id}", json={"title": "Final"})
+        assert status == 200
+        _, after, _ = await request(app, "GET", "/books", headers={"If-None-Match": headers["etag"]})
+        assert after["etag"] != headers["etag"]
+
+async def test_comment_page_revalidates_without_mongo(app, ops):
+    async with app.router.lifespan_context(app):
+        _, _, body = await request(app, "POST", "/books", json={"username": "alice", "title": "Discussed"})
+        book_id = json.loads(body)["id"]
+        path = f"/comments/by-book/{book_id}"
+        _, headers, _ = await request(app, "GET", path)
+        before = sum(ops.values())
+        status, _, body = await request(app, "GET", path, headers={"If-None-Match": headers["etag"]})
+        assert (status, body) == (304, b"")
+        assert sum(ops.values()) == before
+
+async def test_large_responses_are_gzipped(app):
+    async with app.router.lifespan_context(app):
+        for i in range(40):
+            book = {"username": "alice", "title": f"Book number {i}", "review": "x" * 40}
+            await request(app, "POST", "/books", json=book)
+        _, plain, raw = await request(app, "GET", "/books?limit=40")
+        assert len(raw) > main.COMPRESSION_MIN_SIZE
+        assert "content-encoding" not in plain
+
+        status, headers, body = await request(app, "GET", "/books?limit=40", headers={"Accept-Encoding": "gzip"})
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert gzip.decompress(body) == raw
+
+        _, headers, _ = await request(app, "GET", "/books?limit=1", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in headers  # below COMPRESSION_MIN_SIZE
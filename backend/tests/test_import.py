@@ -0,0 +1,83 @@
+import json
+
+import pytest
+from bson import ObjectId
+
+import main
+from benchmarks.asgi import request
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(main, "IMPORT_MAX_LINE_BYTES", 200)
+    return main.app
+
+def _row(title, **extra):
+    return json.dumps({"username": "alice", "title": title, **extra}).encode()
+
+async def _import(app, content, **params):
+    status, _, body = await request(app, "POST", "/books/import", params=params or None, content=content)
+    assert status == 200, body
+    return json.loads(body)
+
+async def _titles(app):
+    _, _, body = await request(app, "GET", "/books?sort=title&limit=100")
+    return [b["title"] for b in json.loads(body)["items"]]
+
+async def test_lines_split_across_chunks_and_no_trailing_newline(app):
+    async with app.router.lifespan_context(app):
+        body = b"\n".join([_row("One"), b"", _row("Two"), _row("Three")])  # no final newline
+        chunks = [body[i : i + 7] for i in range(0, len(body), 7)]
+        report = await _import(app, chunks)
+        assert report == {"inserted": 3, "failed": 0, "errors": [], "errors_truncated": False}
+        assert await _titles(app) == ["One", "Three", "Two"]
+
+async def test_over_long_line_is_reported_and_skipped(app):
+    async with app.router.lifespan_context(app):
+        long_row = _row("Long", review="x" * 500)
+        body = b"\n".join([_row("Before"), long_row, _row("After")]) + b"\n"
+        report = await _import(app, [body[i : i + 64] for i in range(0, len(body), 64)])
+        assert report["inserted"] == 2
+        assert report["errors"] == [{"line": 2, "error": "Line too long"}]
+        assert await _titles(app) == ["After", "Before"]
+
+async def test_over_long_final_line_without_newline(app):
+    async with app.router.lifespan_context(app):
+        report = await _import(app, _row("Kept") + b"\n" + _row("Long", review="x" * 500))
+        assert report["inserted"] == 1
+        assert report["errors"] == [{"line": 2, "error": "Line too long"}]
+
+async def test_invalid_rows_are_reported_per_line(app):
+    async with app.router.lifespan_context(app):
+        body = b"\n".join([
+            _row("Good"),
+            b"{not json",
+            b"[1, 2]",
+            json.dumps({"title": "No user"}).encode(),
+            _row("Bad id", id="zz"),
+            _row("Also good"),
+        ])
+        report = await _import(app, body)
+        assert report["inserted"] == 2 and report["failed"] == 4
+        lines = {e["line"]: e["error"] for e in report["errors"]}
+        assert sorted(lines) == [2, 3, 4, 5]
+        assert lines[2].startswith("Invalid JSON")
+        assert lines[3] == "Expected a JSON object"
+        assert lines[4].startswith("username:")
+        assert lines[5] == "id: not a valid ObjectId"
+
+async def test_duplicate_ids_fail_only_their_rows(app):
+    async with app.router.lifespan_context(app):
+        taken = str(ObjectId())
+        assert (await _import(app, _row("Original", id=taken)))["inserted"] == 1
+        body = b"\n".join([_row("Fresh"), _row("Clash", id=taken), _row("Also fresh")])
+        report = await _import(app, body, chunk_size=2)
+        assert report["inserted"] == 2 and report["failed"] == 1
+        assert [e["line"] for e in report["errors"]] == [2]
+        assert "duplicate key" in report["errors"][0]["error"].lower()
+        assert await _titles(app) == ["Also fresh", "Fresh", "Original"]
+
+async def test_error_list_is_truncated(app):
+    async with app.router.lifespan_context(app):
+        report = await _import(app, b"\n".join(b"{bad" for _ in range(120)))
+        assert report["failed"] == 120
+        assert len(report["errors"]) == 100 and report["errors_truncated"]
@@ -0,0 +1,80 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from databases.books_repository import BooksRepository
+from databases.comment_repository import CommentsRepository
+from databases.jobs_repository import JobsRepository
+from databases.profile_repository import ProfilesRepository
+from databases.views_repository import BookViewsRepository
+
+# name -> (keys, unique): the indexes the queries in each repository rely on
+EXPECTED = {
+    "books": {
+        "username": ([("username", 1)], False),
+        "username_ci": ([("username", 1), ("_id", 1)], False),
+        "author_ci": ([("author", 1), ("_id", 1)], False),
+        "genre_ci": ([("genre", 1), ("_id", 1)], False),
+        "title_ci": ([("title", 1), ("_id", 1)], False),
+        "year_ci": ([("year", 1), ("_id", 1)], False),
+        "views_ci": ([("views", 1), ("_id", 1)], False),
+        "books_text": ([("title", "text"), ("author", "text"), ("username", "text"), ("review", "text")], False),
+    },
+    "profiles": {
+        "username_unique": ([("username", 1)], True),
+    },
+    "comments": {
+        "book_id_created_at": ([("book_id", 1), ("created_at", 1), ("_id", 1)], False),
+        "username_created_at": ([("username", 1), ("created_at", 1), ("_id", 1)], False),
+    },
+    "jobs": {
+        "status_lease": ([("status", 1), ("lease_until", 1)], False),
+    },
+    "book_view_buckets": {
+        "book_id_bucket": ([("book_id", 1), ("bucket", 1)], True),
+        "bucket_ttl": ([("bucket", 1)], False),
+    },
+}
+
+def _repositories(pool):
+    return {
+        "books": BooksRepository(pool, "books"),
+        "profiles": ProfilesRepository(pool, "profiles"),
+        "comments": CommentsRepository(pool, "comments"),
+        "jobs": JobsRepository(pool, "jobs"),
+        "book_view_buckets": BookViewsRepository(pool, "book_view_buckets"),
+    }
+
+def _declared(info):
+    return {
+        name: (list(spec["key"]), bool(spec.get("unique")))
+        for name, spec in info.items()
+        if name != "_id_"
+    }
+
+async def test_ensure_indexes_creates_the_declared_set(pool):
+    await pool.connect()
+    for collection, repo in _repositories(pool).items():
+        await repo.connect()
+        created = await repo.ensure_indexes()
+        assert sorted(created) == sorted(EXPECTED[collection]), collection
+        info = await pool.collection(collection).index_information()
+        assert _declared(info) == EXPECTED[collection], collection
+
+async def test_ensure_indexes_twice_changes_nothing(pool):
+    await pool.connect()
+    for collection, repo in _repositories(pool).items():
+        await repo.connect()
+        await repo.ensure_indexes()
+        before = _declared(await pool.collection(collection).index_information())
+        await repo.ensure_indexes()
+        after = _declared(await pool.collection(collection).index_information())
+        assert after == before, collection
+
+async def test_unique_username_is_enforced(pool):
+    await pool.connect()
+    repo = ProfilesRepository(pool, "profiles")
+    await repo.connect()
+    await repo.ensure_indexes()
+    await repo.insert_one({"username": "alice"})
+    with pytest.raises(DuplicateKeyError):
+        await repo.insert_one({"username": "alice"})
@@ -0,0 +1,15 @@
+import asyncio
+
+from metrics import Metrics
+
+def test_restarts_on_a_new_event_loop():
+    metrics = Metrics(lag_interval=0.001)
+
+    async def cycle():
+        metrics.start()
+        await asyncio.sleep(0.01)
+        await metrics.stop()
+
+    asyncio.run(cycle())
+    asyncio.run(cycle())  # the app's lifespan can run again, e.g. once per test
+    assert b"event_loop_lag_seconds_count" in metrics.render()
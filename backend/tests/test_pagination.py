@@ -0,0 +1,36 @@
+import base64
+
+import pytest
+from bson import ObjectId
+
+import main
+from benchmarks.asgi import request
+from databases.pagination import InvalidCursorError, decode_cursor, encode_cursor
+
+def _token(raw: str) -> str:
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+BAD_CURSORS = [
+    "not base64!",
+    _token("not json"),
+    _token('[1, "not an oid"]'),
+    _token('[1, {"$oid": "zz"}]'),
+    _token('{"$date": "yesterday"}'),
+]
+
+def test_cursor_round_trips():
+    oid = ObjectId()
+    assert decode_cursor(encode_cursor("Dune", oid)) == ("Dune", oid)
+
+@pytest.mark.parametrize("token", BAD_CURSORS)
+def test_invalid_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+@pytest.mark.parametrize("path", ["/books", "/books/search?q=dune", "/comments/by-user/alice"])
+async def test_invalid_cursor_is_a_400(path):
+    app = main.app
+    async with app.router.lifespan_context(app):
+        for token in BAD_CURSORS:
+            status, _, _ = await request(app, "GET", path, params={"cursor": token})
+            assert status == 400, token
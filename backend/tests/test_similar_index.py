@@ -0,0 +1,121 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+import managers.books_manager as books_manager
+from managers.books_manager import BooksManager
+from managers.similar_index import SimilarIndex, build_merged
+from models.books_model import BookCreate
+
+def _book(book_id, title, genre="fiction"):
+    return {"id": book_id, "title": title, "author": "Anon", "genre": genre, "review": ""}
+
+def _index(*docs) -> SimilarIndex:
+    index = SimilarIndex(max_pending=100)
+    index.add_many(docs)
+    index.merge()
+    index.ready = True
+    return index
+
+def test_writes_during_a_merge_survive_the_swap():
+    index = _index(_book("a", "dragons of the north"), _book("b", "dragons of the south"), _book("c", "kitchen garden"))
+    index.apply(None, _book("d", "dragons at sea"))
+    plan = index.merge_plan()
+    built = build_merged(plan)  # in a thread, while these writes land on the loop:
+    index.apply(_book("b", "dragons of the south"), None)
+    index.apply(_book("d", "dragons at sea"), _book("d", "kitchen herbs"))
+    index.apply(None, _book("e", "dragons in winter"))
+    index.install_merged(plan, built)
+
+    assert index.ids() == {"a", "c", "d", "e"}
+    assert index.stats()["pending"] == 2  # the re-indexed d and the new e
+    assert index.stats()["dead"] == 2  # b and d's merged row
+    assert {i for i, _ in index.similar({"title": "dragons"}, 10)} == {"a", "e"}
+    assert {i for i, _ in index.similar({"title": "kitchen"}, 10)} == {"c", "d"}
+
+    index.merge()
+    assert index.ids() == {"a", "c", "d", "e"}
+    assert index.stats()["pending"] == 0 and index.stats()["dead"] == 0
+
+def test_a_stale_plan_is_not_installed():
+    index = _index(_book("a", "dragons"))
+    index.apply(None, _book("b", "dragons again"))
+    plan = index.merge_plan()
+    index.merge()
+    index.install_merged(plan, build_merged(plan))
+    assert index.ids() == {"a", "b"}
+    assert index.stats()["pending"] == 0
+
+async def test_write_past_max_pending_merges_off_the_loop(pool, monkeypatch):
+    threads = []
+
+    def spy(plan):
+        threads.append(threading.current_thread())
+        return build_merged(plan)
+
+    monkeypatch.setattr(books_manager, "build_merged", spy)
+    await pool.connect()
+    books = BooksManager(pool, "books", similar_max_pending=3)
+    await books.connect()
+    try:
+        await books.build_similar()
+        created = [await books.create_book(BookCreate(username="alice", title=f"dragon tale {i}")) for i in range(3)]
+        assert books._similar_merge is not None
+        await books._similar_merge
+        assert threads and threading.main_thread() not in threads
+        assert books.similar_stats()["pending"] == 0
+        similar = await books.similar_books(created[0].id)
+        assert {d["id"] for d in similar} == {b.id for b in created[1:]}
+    finally:
+        await books.close()
+
+def test_concurrent_saves_each_write_a_whole_snapshot(tmp_path):
+    path = str(tmp_path / "similar.npz")
+    indexes = [_index(_book(str(i), f"book {i}")) for i in range(8)]
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda index: index.save(path), indexes))
+    assert len(SimilarIndex.load(path).ids()) == 1
+    assert os.listdir(tmp_path) == ["similar.npz"]
+
+def test_failed_save_leaves_no_temp_file(tmp_path, monkeypatch):
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(np, "savez", broken)
+    with pytest.raises(OSError):
+        _index(_book("a", "dragons")).save(str(tmp_path / "similar.npz"))
+    assert os.listdir(tmp_path) == []
+
+async def test_failed_merge_is_logged_and_retried(pool, monkeypatch, caplog):
+    calls = []
+
+    def flaky(plan):
+        calls.append(plan)
+        if len(calls) == 1:
+            raise MemoryError("no room")
+        return build_merged(plan)
+
+    monkeypatch.setattr(books_manager, "build_merged", flaky)
+    await pool.connect()
+    books = BooksManager(pool, "books", similar_max_pending=2)
+    await books.connect()
+    try:
+        await books.build_similar()
+        for i in range(2):
+            await books.create_book(BookCreate(username="alice", title=f"dragon tale {i}"))
+        await asyncio.wait([books._similar_merge])
+        await asyncio.sleep(0)  # the done-callback
+        assert books._similar_merge is None
+        assert "similar index merge failed" in caplog.text
+        assert books.similar_stats()["pending"] == 2
+
+        await books.create_book(BookCreate(username="alice", title="dragon tale 2"))
+        await asyncio.wait([books._similar_merge])
+        assert len(calls) == 2
+        assert books.similar_stats()["pending"] == 0
+    finally:
+        await books.close()
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from managers.single_flight import SingleFlight
+
+class Read:
+    """A read that blocks until released; counts how often it was started."""
+
+    def __init__(self, result="doc"):
+        self.result = result
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.cancelled = False
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+async def _tick():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+async def test_waiters_share_one_result():
+    flight, read = SingleFlight(), Read({"id": "a"})
+    waiters = [asyncio.create_task(flight.do("a", read)) for _ in range(5)]
+    await read.started.wait()
+    read.release.set()
+    results = await asyncio.gather(*waiters)
+    assert read.calls == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats()["started"] == 1 and flight.stats()["coalesced"] == 4
+    assert flight.stats()["inflight"] == 0
+
+async def test_waiters_share_one_exception():
+    flight, read = SingleFlight(), Read(LookupError("gone"))
+    waiters = [asyncio.create_task(flight.do("a", read)) for _ in range(3)]
+    await read.started.wait()
+    read.release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert read.calls == 1
+    assert all(isinstance(r, LookupError) for r in results)
+
+async def test_one_cancelled_waiter_leaves_the_read_running():
+    flight, read = SingleFlight(), Read()
+    first = asyncio.create_task(flight.do("a", read))
+    second = asyncio.create_task(flight.do("a", read))
+    await read.started.wait()
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    read.release.set()
+    assert await second == "doc"
+    assert not read.cancelled
+    assert flight.stats()["cancelled"] == 0
+
+async def test_last_waiter_leaving_cancels_the_read():
+    flight, read = SingleFlight(), Read()
+    waiters = [asyncio.create_task(flight.do("a", read)) for _ in range(2)]
+    await read.started.wait()
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await _tick()
+    assert read.cancelled
+    assert flight.stats()["cancelled"] == 1
+    assert flight.stats()["inflight"] == 0
+
+    # A newcomer starts afresh rather than joining the cancelled read.
+    fresh = Read("new")
+    fresh.release.set()
+    assert await flight.do("a", fresh) == "new"
+
+async def test_call_after_forget_starts_a_new_read():
+    flight, old, new = SingleFlight(), Read("old"), Read("new")
+    before = asyncio.create_task(flight.do("a", old))
+    await old.started.wait()
+    flight.forget(lambda key: key == "a")  # a write landed
+    after = asyncio.create_task(flight.do("a", new))
+    await new.started.wait()
+    old.release.set()
+    new.release.set()
+    assert await before == "old"
+    assert await after == "new"
+    assert flight.stats()["coalesced"] == 0
+
+async def test_disabled_runs_every_call():
+    flight, read = SingleFlight(enabled=False), Read()
+    read.release.set()
+    await asyncio.gather(flight.do("a", read), flight.do("a", read))
+    assert read.calls == 2
@@ -0,0 +1,127 @@
+import asyncio
+
+from pymongo.errors import BulkWriteError
+
+from managers.books_manager import BooksManager
+from managers.view_counter import ViewCounter
+from models.books_model import BookCreate
+
+class Store:
+    """Fake flush target: records batches and rejects the ids in ``reject``."""
+
+    def __init__(self, reject=(), error=None):
+        self.batches = []
+        self.flushed = []
+        self.reject = set(reject)
+        self.error = error
+
+    async def write(self, deltas):
+        self.batches.append(dict(deltas))
+        if self.error:
+            raise self.error
+        return {book_id: n for book_id, n in deltas.items() if book_id in self.reject}
+
+    async def done(self, deltas):
+        self.flushed.append(dict(deltas))
+
+async def test_flush_writes_the_buffer_once():
+    store = Store()
+    views = ViewCounter(store.write, flushed=store.done)
+    views.add("a")
+    views.add("a")
+    assert views.add("b") == 1
+    await views.flush()
+    assert store.batches == [{"a": 2, "b": 1}]
+    assert store.flushed == [{"a": 2, "b": 1}]
+    assert views.pending("a") == 0
+    assert views.stats() == {"buffered_views": 0, "buffered_books": 0}
+    await views.flush()
+    assert len(store.batches) == 1
+
+async def test_failed_write_requeues_the_whole_batch():
+    store = Store(error=ConnectionError("down"))
+    views = ViewCounter(store.write, flushed=store.done)
+    views.add("a", 3)
+    await views.flush()
+    assert views.pending("a") == 3
+    assert store.flushed == []
+    store.error = None
+    await views.flush()
+    assert store.batches[-1] == {"a": 3}
+
+async def test_partial_write_requeues_only_the_rejected_books():
+    store = Store(reject={"b"})
+    views = ViewCounter(store.write, flushed=store.done)
+    views.add("a", 2)
+    views.add("b", 5)
+    await views.flush()
+    assert views.pending("a") == 0
+    assert views.pending("b") == 5
+    assert store.flushed == [{"a": 2}]
+    assert views.stats() == {"buffered_views": 5, "buffered_books": 1}
+
+async def test_reads_overlay_views_in_flight_until_they_are_written():
+    written, release = asyncio.Event(), asyncio.Event()
+    seen = {}
+
+    async def write(deltas):
+        written.set()
+        await release.wait()
+        return {}
+
+    async def flushed(deltas):
+        seen["pending"] = views.pending("a")
+
+    views = ViewCounter(write, flushed=flushed)
+    views.add("a", 2)
+    flush = asyncio.create_task(views.flush())
+    await written.wait()
+    assert views.add("a") == 3  # in flight + newly buffered
+    release.set()
+    await flush
+    # Once written, only the new view is pending, before the caches are dropped.
+    assert seen["pending"] == 1
+
+async def _books(pool) -> BooksManager:
+    await pool.connect()
+    books = BooksManager(pool, "books", view_mode="buffered", view_flush_interval=3600)
+    await books.connect()
+    return books
+
+async def test_buffered_views_are_counted_once(pool):
+    books = await _books(pool)
+    try:
+        book = await books.create_book(BookCreate(username="alice", title="Popular"))
+        for _ in range(3):
+            out = await books.increment_and_get(book.id)
+        assert out.views == 3
+        await books._views.flush()
+        assert (await books.get_book(book.id)).views == 3
+        assert (await books.increment_and_get(book.id)).views == 4
+    finally:
+        await books.close()
+
+async def test_bulk_write_error_requeues_only_failed_books(pool):
+    books = await _books(pool)
+    try:
+        first = await books.create_book(BookCreate(username="alice", title="One"))
+        second = await books.create_book(BookCreate(username="alice", title="Two"))
+        bulk_write = books._repo._mongo.bulk_write
+
+        async def partly_failing(ops, ordered=False):
+            await bulk_write(ops[:1], ordered=ordered)
+            raise BulkWriteError({"writeErrors": [{"index": 1, "code": 2, "errmsg": "rejected"}]})
+
+        await books.increment_and_get(first.id)
+        await books.increment_and_get(second.id)
+        books._repo._mongo.bulk_write = partly_failing
+        await books._views.flush()
+        books._repo._mongo.bulk_write = bulk_write
+        assert books._views.pending(first.id) == 0
+        assert books._views.pending(second.id) == 1
+
+        await books._views.flush()
+        assert (await books.get_book(first.id)).views == 1
+        assert (await books.get_book(second.id)).views == 1
+    finally:
+        await books.close()
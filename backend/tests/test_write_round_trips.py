@@ -0,0 +1,45 @@
+from managers.books_manager import BooksManager
+from managers.profile_manager import ProfilesManager
+from models.books_model import BookCreate
+from models.profile_model import ProfileCreate
+
+def _sent(ops, before):
+    return {name: n - before.get(name, 0) for name, n in ops.items() if n != before.get(name, 0)}
+
+async def test_book_writes_are_one_round_trip(pool, ops):
+    await pool.connect()
+    books = BooksManager(pool, "books")
+    await books.connect()
+    try:
+        book = await books.create_book(BookCreate(username="alice", title="Round trips"))
+
+        before = dict(ops)
+        created = await books.create_book(BookCreate(username="alice", title="Another"))
+        assert _sent(ops, before) == {"insert_one": 1}
+        assert created.id and created.title == "Another" and created.views == 0
+
+        before = dict(ops)
+        updated = await books.update_book(book.id, {"title": "Renamed"})
+        assert _sent(ops, before) == {"find_one_and_update": 1}
+        assert updated.title == "Renamed" and updated.id == book.id
+    finally:
+        await books.close()
+
+async def test_profile_writes_are_one_round_trip(pool, ops):
+    await pool.connect()
+    profiles = ProfilesManager(pool, "profiles")
+    await profiles.connect()
+    try:
+        await profiles.ensure_indexes()
+
+        before = dict(ops)
+        profile = await profiles.create_profile(ProfileCreate(username=" bob ", password="password1"))
+        assert _sent(ops, before) == {"insert_one": 1}
+        assert profile.username == "bob"
+
+        before = dict(ops)
+        updated = await profiles.update_profile("bob", {"google_auth_id": "g-1"})
+        assert _sent(ops, before) == {"find_one_and_update": 1}
+        assert updated.google_auth_id == "g-1"
+    finally:
+        await profiles.close()
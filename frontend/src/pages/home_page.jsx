@@ -25,6 +25,29 @@ const getBookId = (bk, fallbackId) => {
 };
 const norm = (s) => String(s ?? "").trim().toLowerCase();
 
+// Autocomplete values for a filter field, served from the backend's in-memory index.
+function useSuggestions(field, prefix, enabled) {
+  const [items, setItems] = useState([]);
+  useEffect(() => {
+    if (!enabled) return;
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const params = new URLSearchParams({ field, prefix: prefix.trim(), limit: "10" });
+        const res = await fetch(`${API_BASE}/books/suggest?${params}`);
+        if (res.ok && !cancelled) setItems(await res.json());
+      } catch {
+        // Suggestions are best-effort; the filter still works without them.
+      }
+    }, 150);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [field, prefix, enabled]);
+  return items;
+}
+
 const DEFAULT_FILTERS = {
   q: "",
   author: "",
@@ -104,9 +127,31 @@ export default function App() {
 
   const [recommendOn, setRecommendOn] = useState(false);
 
+  const authorSuggestions = useSuggestions("author", filterDraft.author, filterOpen);
+  const genreSuggestions = useSuggestions("genre", filterDraft.genre, filterOpen);
+  const userSuggestions = useSuggestions("username", filterDraft.username, filterOpen);
+
+  const [yearRange, setYearRange] = useState({ min: null, max: null });
+  useEffect(() => {
+    if (!filterOpen) return;
+    let cancelled = false;
+    (async () => {
+      try {
+        const res = await fetch(`${API_BASE}/books/facets`);
+        if (!res.ok) return;
+        const data = await res.json();
+        if (!cancelled) setYearRange({ min: data?.year_min ?? null, max: data?.year_max ?? null });
+      } catch {
+        // Placeholders only; ignore failures.
+      }
+    })();
+    return () => { cancelled = true; };
+  }, [filterOpen]);
+
   const [comments, setComments] = useState([]);
   const [commentsLoading, setCommentsLoading] = useState(false);
   const [commentsError, setCommentsError] = useState("");
+  const [commentsCursor, setCommentsCursor] = useState(null);
   const [newComment, setNewComment] = useState("");
   const [postingComment, setPostingComment] = useState(false);
 
@@ -118,16 +163,54 @@ export default function App() {
     return norm(book.username) === norm(currentUser);
   }, [book, currentUser]);
 
+  const [showMineOnly, setShowMineOnly] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  const listQuery = useMemo(() => {
+    const params = new URLSearchParams();
+    const f = filters;
+    if (f.q.trim()) params.set("q", f.q.trim());
+    if (f.author.trim()) params.set("author", f.author.trim());
+    if (f.genre.trim()) params.set("genre", f.genre.trim());
+    const user = showMineOnly && currentUser ? currentUser : f.username.trim();
+    if (user) params.set("username", user);
+    if (f.yearMin !== "") params.set("year_min", f.yearMin);
+    if (f.yearMax !== "") params.set("year_max", f.yearMax);
+    if (f.hasImage === "yes") params.set("has_cover", "true");
+    if (f.hasImage === "no") params.set("has_cover", "false");
+    if (recommendOn) {
+      params.set("sort", "views");
+      params.set("order", "desc");
+    } else if (f.sort) {
+      const [field, dir] = f.sort.split("-");
+      params.set("sort", field);
+      params.set("order", dir);
+    }
+    return params;
+  }, [filters, recommendOn, showMineOnly, currentUser]);
+
+  async function fetchBooksPage(cursor) {
+    const params = new URLSearchParams(listQuery);
+    if (cursor) params.set("cursor", cursor);
+    // A search without an explicit sort is ranked by relevance server-side.
+    const path = params.has("q") && !params.has("sort") ? "/books/search" : "/books";
+    const res = await fetch(`${API_BASE}${path}?${params}`);
+    if (!res.ok) throw new Error(`List fetch failed: ${res.status}`);
+    return res.json();
+  }
+
   useEffect(() => {
     let cancelled = false;
     (async () => {
       try {
         setListLoading(true);
         setListError("");
-        const res = await fetch(`${API_BASE}/books`);
-        if (!res.ok) throw new Error(`List fetch failed: ${res.status}`);
-        const data = await res.json();
-        if (!cancelled) setBooks(data);
+        const data = await fetchBooksPage(null);
+        if (!cancelled) {
+          setBooks(Array.isArray(data?.items) ? data.items : []);
+          setNextCursor(data?.next_cursor ?? null);
+        }
       } catch (err) {
         if (!cancelled) setListError(err?.message || "Failed to load books.");
       } finally {
@@ -135,7 +218,21 @@ export default function App() {
       }
     })();
     return () => { cancelled = true; };
-  }, []);
+  }, [listQuery]);
+
+  async function loadMoreBooks() {
+    if (!nextCursor || loadingMore) return;
+    try {
+      setLoadingMore(true);
+      const data = await fetchBooksPage(nextCursor);
+      setBooks((list) => [...list, ...(Array.isArray(data?.items) ? data.items : [])]);
+      setNextCursor(data?.next_cursor ?? null);
+    } catch (err) {
+      setListError(err?.message || "Failed to load books.");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
 
   useEffect(() => {
     if (!selectedId) {
@@ -143,6 +240,7 @@ export default function App() {
       setBookError("");
       setEditMode(false);
       setComments([]);
+      setCommentsCursor(null);
       setCommentsError("");
       setNewComment("");
       return;
@@ -153,14 +251,17 @@ export default function App() {
       try {
         setBookLoading(true);
         setBookError("");
-        const res = await fetch(`${API_BASE}/books/${encodeURIComponent(selectedId)}`);
+        // Book, first comment page and count in one request.
+        const res = await fetch(`${API_BASE}/books/${encodeURIComponent(selectedId)}/detail`);
         if (!res.ok) throw new Error(`Detail fetch failed: ${res.status}`);
         const data = await res.json();
         if (!cancelled) {
-          setBook(data);
+          setBook(data.book);
           setEditMode(false);
           setEditError("");
-          refreshComments(data);
+          setComments(Array.isArray(data?.comments?.items) ? data.comments.items : []);
+          setCommentsCursor(data?.comments?.next_cursor ?? null);
+          setCommentsError("");
         }
       } catch (err) {
         if (!cancelled) {
@@ -175,20 +276,49 @@ export default function App() {
     return () => { cancelled = true; };
   }, [selectedId]);
 
-  async function refreshComments(bookLike) {
-    const bid = getBookId(bookLike || book, selectedId);
-    if (bid === null) {
-      setComments([]);
-      setCommentsError("Book ID missing.");
-      return;
-    }
+  // Live thread: comments posted or deleted by anyone arrive over server-sent events.
+  useEffect(() => {
+    if (!selectedId || typeof EventSource === "undefined") return;
+    const es = new EventSource(`${API_BASE}/comments/stream/${encodeURIComponent(selectedId)}`);
+    let connected = false;
+    es.addEventListener("open", async () => {
+      if (!connected) {
+        connected = true;
+        return;
+      }
+      // Reconnected (dropped, or evicted for falling behind): events may have been missed.
+      try {
+        const res = await fetch(`${API_BASE}/comments/by-book/${encodeURIComponent(selectedId)}`);
+        if (!res.ok) return;
+        const data = await res.json();
+        setComments(Array.isArray(data?.items) ? data.items : []);
+        setCommentsCursor(data?.next_cursor ?? null);
+      } catch {
+        // Keep what is shown; the next reconnect tries again.
+      }
+    });
+    es.addEventListener("created", (e) => {
+      const c = JSON.parse(e.data);
+      setComments((list) => (list.some((x) => x.id === c.id) ? list : [c, ...list]));
+    });
+    es.addEventListener("deleted", (e) => {
+      const { id } = JSON.parse(e.data);
+      setComments((list) => list.filter((x) => x.id !== id));
+    });
+    return () => es.close();
+  }, [selectedId]);
+
+  async function loadOlderComments() {
+    const bid = getBookId(book, selectedId);
+    if (bid === null || !commentsCursor || commentsLoading) return;
     try {
       setCommentsLoading(true);
-      setCommentsError("");
-      const res = await fetch(`${API_BASE}/comments/by-book/${encodeURIComponent(bid)}`);
+      const params = new URLSearchParams({ cursor: commentsCursor });
+      const res = await fetch(`${API_BASE}/comments/by-book/${encodeURIComponent(bid)}?${params}`);
       if (!res.ok) throw new Error(`Comments fetch failed: ${res.status}`);
       const data = await res.json();
-      setComments(Array.isArray(data) ? data : []);
+      setComments((list) => [...list, ...(Array.isArray(data?.items) ? data.items : [])]);
+      setCommentsCursor(data?.next_cursor ?? null);
     } catch (err) {
       setCommentsError(err?.message || "Failed to load comments.");
     } finally {
@@ -227,7 +357,8 @@ export default function App() {
       if (!res.ok) throw new Error(`Create comment failed: ${res.status}`);
       const created = await res.json();
       setNewComment("");
-      setComments((list) => [created, ...list]);
+      // The live stream may have delivered it already.
+      setComments((list) => (list.some((x) => x.id === created.id) ? list : [created, ...list]));
     } catch (err) {
       setCommentsError(err?.message || "Failed to post comment.");
     } finally {
@@ -235,72 +366,8 @@ export default function App() {
     }
   }
 
-  const filteredBooks = useMemo(() => {
-    let list = Array.isArray(books) ? [...books] : [];
-    const txt = (s) => (s ?? "").toString().toLowerCase();
-    const inRange = (y) => {
-      if (!y && y !== 0) return true;
-      const num = Number(y);
-      const min = filterDraft.yearMin !== "" ? Number(filterDraft.yearMin) : null;
-      const max = filterDraft.yearMax !== "" ? Number(filterDraft.yearMax) : null;
-      if (min !== null && num < min) return false;
-      if (max !== null && num > max) return false;
-      return true;
-    };
-
-    const f = filters;
-    list = list.filter((b) => {
-      const username = txt(b.username);
-      const title = txt(b.title);
-      const author = txt(b.author);
-      const genre = txt(b.genre);
-      const review = txt(b.review);
-      const q = txt(f.q);
-
-      if (q && !(title.includes(q) || author.includes(q) || review.includes(q) || username.includes(q))) return false;
-      if (f.author && !author.includes(txt(f.author))) return false;
-      if (f.genre && !genre.includes(txt(f.genre))) return false;
-      if (f.username && !username.includes(txt(f.username))) return false;
-      if (!inRange(b.year)) return false;
-
-      if (f.hasImage === "yes" && !b.image) return false;
-      if (f.hasImage === "no" && !!b.image) return false;
-
-      return true;
-    });
-
-    if (recommendOn) {
-      list.sort((a, b) => (b.views ?? 0) - (a.views ?? 0));
-      return list;
-    }
-
-    switch (f.sort) {
-      case "title-asc":
-        list.sort((a, b) => txt(a.title).localeCompare(txt(b.title)));
-        break;
-      case "title-desc":
-        list.sort((a, b) => txt(b.title).localeCompare(txt(a.title)));
-        break;
-      case "year-asc":
-        list.sort((a, b) => (a.year ?? 0) - (b.year ?? 0));
-        break;
-      case "year-desc":
-        list.sort((a, b) => (b.year ?? 0) - (a.year ?? 0));
-        break;
-      default:
-        break;
-    }
-
-    return list;
-  }, [books, filters, filterDraft.yearMin, filterDraft.yearMax, recommendOn]);
-
-  const [showMineOnly, setShowMineOnly] = useState(false);
-
-  const visibleBooks = useMemo(() => {
-    const base = Array.isArray(filteredBooks) ? filteredBooks : [];
-    if (!showMineOnly || !currentUser) return base;
-    return base.filter(b => norm(b?.username) === norm(currentUser));
-  }, [filteredBooks, showMineOnly, currentUser]);
+  // Search, filters and sorting run server-side; see listQuery.
+  const visibleBooks = books;
 
   const hasBooks = useMemo(
     () => Array.isArray(visibleBooks) && visibleBooks.length > 0,
@@ -420,6 +487,7 @@ export default function App() {
       setBook(null);
       setEditMode(false);
       setComments([]);
+      setCommentsCursor(null);
       setCommentsError("");
     } catch (err) {
       alert(err?.message || "Failed to delete.");
@@ -716,25 +784,46 @@ export default function App() {
                 <div className="filter-row">
                   <label>Author</label>
                   <input
+                    list="author-suggestions"
+                    placeholder="Starts with…"
                     value={filterDraft.author}
                     onChange={(e) => setFilterDraft({ ...filterDraft, author: e.target.value })}
                   />
+                  <datalist id="author-suggestions">
+                    {authorSuggestions.map((s) => (
+                      <option key={s.value} value={s.value}>{s.count}</option>
+                    ))}
+                  </datalist>
                 </div>
 
                 <div className="filter-row">
                   <label>Genre</label>
                   <input
+                    list="genre-suggestions"
+                    placeholder="Starts with…"
                     value={filterDraft.genre}
                     onChange={(e) => setFilterDraft({ ...filterDraft, genre: e.target.value })}
                   />
+                  <datalist id="genre-suggestions">
+                    {genreSuggestions.map((s) => (
+                      <option key={s.value} value={s.value}>{s.count}</option>
+                    ))}
+                  </datalist>
                 </div>
 
                 <div className="filter-row">
                   <label>User</label>
                   <input
+                    list="user-suggestions"
+                    placeholder="Exact username"
                     value={filterDraft.username}
                     onChange={(e) => setFilterDraft({ ...filterDraft, username: e.target.value })}
                   />
+                  <datalist id="user-suggestions">
+                    {userSuggestions.map((s) => (
+                      <option key={s.value} value={s.value}>{s.count}</option>
+                    ))}
+                  </datalist>
                 </div>
 
                 <div className="filter-row">
@@ -742,13 +831,13 @@ export default function App() {
                   <div className="two">
                     <input
                       type="number"
-                      placeholder="Min"
+                      placeholder={yearRange.min != null ? `Min (${yearRange.min})` : "Min"}
                       value={filterDraft.yearMin}
                       onChange={(e) => setFilterDraft({ ...filterDraft, yearMin: e.target.value })}
                     />
                     <input
                       type="number"
-                      placeholder="Max"
+                      placeholder={yearRange.max != null ? `Max (${yearRange.max})` : "Max"}
                       value={filterDraft.yearMax}
                       onChange={(e) => setFilterDraft({ ...filterDraft, yearMax: e.target.value })}
                     />
@@ -808,12 +897,20 @@ export default function App() {
                     <span className="book-title">{b.title}</span>
                     <span className="book-meta">
                       {b.username ? <span className="book-user">by {b.username}</span> : null}
+                      {b.comment_count ? (
+                        <span style={{ marginLeft: 8, opacity: 0.7 }}>• {b.comment_count} {b.comment_count === 1 ? "comment" : "comments"}</span>
+                      ) : null}
                     </span>
                   </button>
                 </li>
               );
             })}
           </ul>
+          {nextCursor && (
+            <button type="button" className="btn btn-confirm" onClick={loadMoreBooks} disabled={loadingMore}>
+              {loadingMore ? "Loading…" : "Load more"}
+            </button>
+          )}
         </section>
 
         <section className="panel">
@@ -917,7 +1014,7 @@ export default function App() {
                       {comments.map((c, i) => {
                         const mine = c.username && c.username === currentUser;
                         return (
-                          <li key={i} className={"comment-item " + (mine ? "mine" : "other")}>
+                          <li key={c.id || i} className={"comment-item " + (mine ? "mine" : "other")}>
                             <div className="comment-bubble">
                               <div className="comment-text">{c.comment}</div>
                               <div className="comment-meta">
@@ -938,6 +1035,12 @@ export default function App() {
                       })}
                     </ul>
 
+                    {commentsCursor && (
+                      <button type="button" className="btn" onClick={loadOlderComments} disabled={commentsLoading}>
+                        Load older comments
+                      </button>
+                    )}
+
                     <form className="comment-form" onSubmit={submitComment}>
                       <input
                         className="comment-input"